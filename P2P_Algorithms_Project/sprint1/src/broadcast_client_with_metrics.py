@@ -1,25 +1,55 @@
+import argparse
+import os
+import time
 import zmq
-import datetime
-from dateutil import parser
+from clocksync import ClockSync, format_clock
+from histogram import LatencyHistogram, format_snapshot
+from protocol import decode_frame
 
-def broadcast_client():
+REPORTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'reports'))
+
+def broadcast_client(verbose=False, report_interval=10.0, dump_path=None, time_server="tcp://localhost:5567",
+                     sync_interval=10.0):
     context = zmq.Context()
     socket = context.socket(zmq.SUB)
     socket.connect("tcp://localhost:5557")
     socket.setsockopt_string(zmq.SUBSCRIBE, "")
+    # El timestamp de la cabecera es del reloj del servidor: se pasa al reloj
+    # local con el desfase estimado. Sin estimación se resta tal cual, lo que
+    # solo es válido en el mismo host.
+    clock_sync = ClockSync(time_server, context, interval=sync_interval).start()
+    clock = clock_sync.clock
 
+    dump_path = dump_path or os.path.join(REPORTS_DIR, f"broadcast_client_{os.getpid()}.hist")
+    histogram = LatencyHistogram()
+    next_report = time.monotonic() + report_interval
     while True:
-        message = socket.recv_string()
-        print(f"Received broadcast: {message}")
-        # Parse the message to extract time and calculate latency
+        raw = socket.recv()
+        recv_ns = time.monotonic_ns()
+        # Decodificar la cabecera binaria y calcular la latencia sin parsear fechas
         try:
-            send_time_str = message.split()[-1]
-            send_time = parser.parse(send_time_str)
-            recv_time = datetime.datetime.now()
-            latency = (recv_time - send_time).total_seconds()
-            print(f"Latency: {latency:.6f} seconds")
-        except Exception as e:
-            print(f"Error parsing time from message: {e}, full message: {message}")
+            frame = decode_frame(raw)
+        except ValueError as e:
+            print(f"Error decoding frame: {e}, {len(raw)} bytes")
+            continue
+        sent_ns = clock.to_local(frame.timestamp_ns) if clock.synced() else frame.timestamp_ns
+        latency_ns = recv_ns - sent_ns
+        histogram.record(latency_ns)
+        if verbose:
+            print(f"Received broadcast from node {frame.node_id}: seq={frame.seq}")
+            print(f"Latency: {latency_ns / 1e9:.6f} seconds")
+        if time.monotonic() >= next_report:
+            print(f"Latency: {format_snapshot(histogram.snapshot())}")
+            print(f"Server clock: {format_clock(clock.snapshot())}")
+            histogram.dump(dump_path)
+            next_report = time.monotonic() + report_interval
 
 if __name__ == "__main__":
-    broadcast_client()
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--verbose", action="store_true", help="print every message")
+    arg_parser.add_argument("--report-interval", type=float, default=10.0)
+    arg_parser.add_argument("--dump", help="histogram file (default: reports/broadcast_client_<pid>.hist)")
+    arg_parser.add_argument("--time-server", default="tcp://localhost:5567", help="server clock sync endpoint")
+    arg_parser.add_argument("--sync-interval", type=float, default=10.0, help="seconds between clock sync rounds")
+    args = arg_parser.parse_args()
+    broadcast_client(args.verbose, args.report_interval, args.dump, args.time_server, args.sync_interval)
@@ -1,19 +1,26 @@
+import argparse
 import zmq
 import time
-import datetime
+from clocksync import TimeServer
+from protocol import encode_frame
 
-def broadcast_server():
+def broadcast_server(node_id=0, time_endpoint="tcp://*:5567"):
     context = zmq.Context()
     socket = context.socket(zmq.PUB)
     socket.bind("tcp://*:5557")
+    # Los clientes estiman el desfase de su reloj respecto a este para corregir la latencia
+    TimeServer(time_endpoint, context).start()
 
+    payload = b"Broadcast message"
+    seq = 0
     while True:
-        send_time = datetime.datetime.now()
-        message = f"Broadcast message {send_time.strftime('%Y-%m-%d %H:%M:%S.%f')}"
-        socket.send_string(message)
-        print(f"Broadcasting: {message}")
+        socket.send(encode_frame(node_id, seq, payload))
+        print(f"Broadcasting: seq={seq}")
+        seq += 1
         time.sleep(1)  # Adjust the sleep time as necessary
 
 if __name__ == "__main__":
-    broadcast_server()
-
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--time-endpoint", default="tcp://*:5567", help="clock sync endpoint to bind")
+    args = arg_parser.parse_args()
+    broadcast_server(time_endpoint=args.time_endpoint)
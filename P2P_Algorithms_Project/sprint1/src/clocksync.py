@@ -0,0 +1,220 @@
+import collections
+import struct
+import threading
+import time
+import zmq
+
+# Estimación del desfase entre el reloj de un par y el local (algoritmo de
+# Cristian). El par atiende sondas con TimeServer; el cliente anota t0 al
+# enviar y t1 al recibir, y el par responde con su reloj tp, leído en algún
+# instante entre t0 y t1:
+#   desfase = tp - (t0 + t1) / 2        incertidumbre = (t1 - t0) / 2
+# De cada ráfaga se queda la sonda de menor RTT (la que menos ha esperado en
+# colas). La deriva sale de una regresión lineal del desfase sobre las últimas
+# rondas, así entre dos rondas el desfase se extrapola; la incertidumbre crece
+# con el tiempo desde la última ronda según el error de la deriva (con una
+# sola ronda se supone MAX_DRIFT). Los relojes son los
+# time.monotonic_ns() de cada proceso, los mismos que lleva la cabecera de
+# protocol.py: entre máquinas distintas no comparten origen y sin corregir la
+# latencia no tiene sentido.
+#   sonda:      [t0 (Q)]        -> [t0 (Q), tp (Q)]
+#   estimación: ref (Q), desfase (q), deriva (d), incertidumbre (Q), error de la deriva (d)
+PROBE = struct.Struct("!Q")
+PROBE_REPLY = struct.Struct("!QQ")
+ESTIMATE = struct.Struct("!QqdQd")
+# Dos osciladores de cuarzo de ±100 ppm
+MAX_DRIFT = 200e-6
+
+class ClockOffset:
+    # reloj_par ≈ reloj_local + offset(reloj_local)
+    def __init__(self, window=16):
+        self.samples = collections.deque(maxlen=window)
+        # (ref_ns, offset_ns, drift, uncertainty_ns): se sustituye de una vez
+        # para que otro hilo nunca lea un modelo a medio actualizar
+        self.model = None
+
+    def add_sample(self, local_ns, offset_ns, uncertainty_ns):
+        self.samples.append((local_ns, offset_ns, uncertainty_ns))
+        self.fit()
+
+    def fit(self):
+        ref_ns, offset_ns, _ = self.samples[-1]
+        drift = 0.0
+        drift_error = MAX_DRIFT
+        best_ns = min(u for _, _, u in self.samples)
+        if len(self.samples) > 1:
+            # Mínimos cuadrados con el tiempo relativo a la última muestra
+            xs = [local_ns - ref_ns for local_ns, _, _ in self.samples]
+            ys = [offset for _, offset, _ in self.samples]
+            mean_x = sum(xs) / len(xs)
+            mean_y = sum(ys) / len(ys)
+            variance = sum((x - mean_x) ** 2 for x in xs)
+            if variance:
+                drift = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / variance
+                offset_ns = round(mean_y - drift * mean_x)
+                # Error típico de la pendiente, y como mínimo lo que permiten
+                # las incertidumbres de las sondas en el intervalo observado
+                squares = sum((y - offset_ns - drift * x) ** 2 for x, y in zip(xs, ys))
+                stderr = (squares / (len(xs) - 2) / variance) ** 0.5 if len(xs) > 2 else 0.0
+                drift_error = min(max(stderr, 2 * best_ns / (max(xs) - min(xs))), MAX_DRIFT)
+        # La mejor sonda acota el error de una ronda; la dispersión respecto a
+        # la recta añade el ruido que la regresión no explica
+        residual = max(abs(y - offset_ns - drift * (x - ref_ns)) for x, y, _ in self.samples)
+        uncertainty_ns = best_ns + round(residual)
+        self.model = (ref_ns, offset_ns, drift, uncertainty_ns, drift_error)
+
+    def synced(self):
+        return self.model is not None
+
+    def offset(self, local_ns):
+        ref_ns, offset_ns, drift, _, _ = self.model
+        return offset_ns + round(drift * (local_ns - ref_ns))
+
+    def uncertainty(self, local_ns=None):
+        # Cota del error de offset(local_ns): por defecto, ahora
+        ref_ns, _, _, uncertainty_ns, drift_error = self.model
+        if local_ns is None:
+            local_ns = time.monotonic_ns()
+        return uncertainty_ns + round(drift_error * abs(local_ns - ref_ns))
+
+    def to_peer(self, local_ns):
+        return local_ns + self.offset(local_ns)
+
+    def to_local(self, peer_ns):
+        # offset() se evalúa en tiempo local; basta una aproximación del instante
+        return peer_ns - self.offset(peer_ns - self.model[1])
+
+    def encode(self):
+        return ESTIMATE.pack(*self.model)
+
+    @classmethod
+    def decode(cls, data):
+        if len(data) != ESTIMATE.size:
+            raise ValueError(f"Invalid clock estimate: {len(data)} bytes")
+        clock = cls()
+        clock.model = ESTIMATE.unpack(data)
+        return clock
+
+    def snapshot(self, local_ns=None):
+        if self.model is None:
+            return {"synced": False}
+        if local_ns is None:
+            local_ns = time.monotonic_ns()
+        _, _, drift, _, drift_error = self.model
+        return {
+            "synced": True,
+            "offset_ms": self.offset(local_ns) / 1e6,
+            "uncertainty_ms": self.uncertainty(local_ns) / 1e6,
+            "drift_ppm": drift * 1e6,
+            "drift_error_ppm": drift_error * 1e6,
+            "samples": len(self.samples),
+        }
+
+def format_clock(snapshot):
+    if not snapshot["synced"]:
+        return "clock not synced"
+    return (f"offset={snapshot['offset_ms']:+.3f} ms ±{snapshot['uncertainty_ms']:.3f} ms "
+            f"drift={snapshot['drift_ppm']:+.2f} ±{snapshot['drift_error_ppm']:.2f} ppm")
+
+class TimeServer:
+    # Hilo que responde a las sondas con el reloj local (`clock`, en ns)
+    def __init__(self, endpoint, context=None, clock=time.monotonic_ns):
+        self.context = context or zmq.Context.instance()
+        self.clock = clock
+        self.socket = self.context.socket(zmq.REP)
+        self.socket.setsockopt(zmq.LINGER, 0)
+        self.socket.bind(endpoint)
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+        return self
+
+    def _run(self):
+        while not self.stopped.is_set():
+            if not self.socket.poll(100, zmq.POLLIN):
+                continue
+            request = self.socket.recv()
+            try:
+                (t0,) = PROBE.unpack(request)
+            except struct.error:
+                # El puerto es público: una sonda mal formada se responde con
+                # un error (un REP siempre debe responder) y se sigue atendiendo
+                print(f"Error decoding clock probe: {len(request)} bytes")
+                self.socket.send(b"ERR probe")
+                continue
+            # El reloj se lee justo antes de responder
+            self.socket.send(PROBE_REPLY.pack(t0, self.clock()))
+
+    def close(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+        self.socket.close()
+
+class ClockSync:
+    # Cliente de un TimeServer: cada `interval` segundos lanza una ráfaga de
+    # `probes` sondas y añade la mejor a la estimación (self.clock)
+    def __init__(self, endpoint, context=None, probes=8, interval=10.0, timeout=1.0, window=16):
+        self.endpoint = endpoint
+        self.context = context or zmq.Context.instance()
+        self.probes = probes
+        self.interval = interval
+        self.timeout_ms = int(timeout * 1000)
+        self.clock = ClockOffset(window)
+        self.socket = None
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def probe(self):
+        # (instante local, desfase, incertidumbre) de una sonda, o None si no hay respuesta
+        if self.socket is None:
+            self.socket = self.context.socket(zmq.REQ)
+            self.socket.setsockopt(zmq.LINGER, 0)
+            self.socket.connect(self.endpoint)
+        t0 = time.monotonic_ns()
+        self.socket.send(PROBE.pack(t0))
+        if not self.socket.poll(self.timeout_ms, zmq.POLLIN):
+            # Un REQ sin respuesta queda bloqueado: se abre otro en la siguiente sonda
+            self.socket.close()
+            self.socket = None
+            return None
+        reply = self.socket.recv()
+        t1 = time.monotonic_ns()
+        if len(reply) != PROBE_REPLY.size:
+            return None
+        echoed, peer_ns = PROBE_REPLY.unpack(reply)
+        if echoed != t0:
+            return None
+        midpoint = (t0 + t1) // 2
+        return midpoint, peer_ns - midpoint, (t1 - t0 + 1) // 2
+
+    def sync(self):
+        # Devuelve True si al menos una sonda de la ráfaga tuvo respuesta
+        samples = [sample for sample in (self.probe() for _ in range(self.probes)) if sample is not None]
+        if not samples:
+            return False
+        self.clock.add_sample(*min(samples, key=lambda sample: sample[2]))
+        return True
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+        return self
+
+    def _run(self):
+        while not self.stopped.is_set():
+            if not self.sync():
+                print(f"Clock sync with {self.endpoint} failed: no reply")
+            self.stopped.wait(self.interval)
+
+    def close(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+        if self.socket is not None:
+            self.socket.close()
@@ -1,19 +1,33 @@
+import argparse
 import zmq
-import datetime
 import time
+from clocksync import ClockSync
+from protocol import FLAG_CLOCK, encode_frame
 
-def gather_client():
-    node_id = input("Enter node ID: ")
+def gather_client(time_server="tcp://localhost:5568", sync_interval=10.0):
+    node_id = int(input("Enter node ID: "))
     context = zmq.Context()
     socket = context.socket(zmq.PUSH)
     socket.connect("tcp://localhost:5558")
+    # El servidor corrige la latencia con el desfase que estima este cliente:
+    # se envía tras cada ronda, antes de los datos a los que se aplica
+    clock_sync = ClockSync(time_server, context)
+    next_sync = time.monotonic()
 
     for i in range(10):
-        send_time = datetime.datetime.now()
-        message = f"Data from node {node_id}: {i} {send_time.strftime('%Y-%m-%d %H:%M:%S.%f')}"
-        print(f"Sending: {message}")
-        socket.send_string(message)
+        if time.monotonic() >= next_sync:
+            if clock_sync.sync():
+                socket.send(encode_frame(node_id, i, clock_sync.clock.encode(), flags=FLAG_CLOCK))
+            next_sync = time.monotonic() + sync_interval
+        payload = str(i).encode()
+        print(f"Sending: node {node_id} seq={i}")
+        socket.send(encode_frame(node_id, i, payload))
         time.sleep(1)
+    clock_sync.close()
 
 if __name__ == "__main__":
-    gather_client()
\ No newline at end of file
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--time-server", default="tcp://localhost:5568", help="server clock sync endpoint")
+    arg_parser.add_argument("--sync-interval", type=float, default=10.0, help="seconds between clock sync rounds")
+    args = arg_parser.parse_args()
+    gather_client(args.time_server, args.sync_interval)
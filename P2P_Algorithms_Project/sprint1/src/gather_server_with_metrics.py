@@ -1,22 +1,61 @@
+import argparse
+import os
+import time
 import zmq
-import datetime
-from dateutil import parser
+from clocksync import ClockOffset, TimeServer, format_clock
+from histogram import LatencyHistogram, format_snapshot
+from protocol import FLAG_CLOCK, decode_frame
 
-def gather_server():
+REPORTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'reports'))
+
+def gather_server(verbose=False, report_interval=10.0, dump_path=None, time_endpoint="tcp://*:5568"):
     context = zmq.Context()
     socket = context.socket(zmq.PULL)
     socket.bind("tcp://*:5558")
+    # Cada cliente estima el desfase de su reloj respecto a este y lo envía en
+    # un mensaje con FLAG_CLOCK; sus timestamps se pasan al reloj local con él
+    TimeServer(time_endpoint, context).start()
+    clocks = {}
 
+    dump_path = dump_path or os.path.join(REPORTS_DIR, "gather_server.hist")
+    histogram = LatencyHistogram()
+    next_report = time.monotonic() + report_interval
     while True:
-        message = socket.recv_string()
+        raw = socket.recv()
+        recv_ns = time.monotonic_ns()
         try:
-            _, send_time_str = message.rsplit(' ', 1)
-            send_time = parser.parse(send_time_str)
-            recv_time = datetime.datetime.now()
-            latency = (recv_time - send_time).total_seconds() * 1000  # Convertir a milisegundos
-            print(f"Received: {message}, Latency: {latency:.2f} ms")
+            frame = decode_frame(raw)
         except ValueError as e:
-            print(f"Error parsing time from message: {e}, full message: {message}")
+            print(f"Error decoding frame: {e}, {len(raw)} bytes")
+            continue
+        if frame.flags & FLAG_CLOCK:
+            try:
+                clocks[frame.node_id] = ClockOffset.decode(frame.payload)
+            except ValueError as e:
+                print(f"Error decoding clock estimate from node {frame.node_id}: {e}")
+            continue
+        clock = clocks.get(frame.node_id)
+        # La estimación es del cliente (reloj del servidor = reloj del cliente + desfase)
+        sent_ns = clock.to_peer(frame.timestamp_ns) if clock is not None else frame.timestamp_ns
+        latency_ns = recv_ns - sent_ns
+        histogram.record(latency_ns)
+        if verbose:
+            print(f"Received from node {frame.node_id}: seq={frame.seq} {frame.payload!r}, "
+                  f"Latency: {latency_ns / 1e6:.2f} ms")
+        if time.monotonic() >= next_report:
+            print(f"Latency: {format_snapshot(histogram.snapshot())}")
+            for node_id, clock in sorted(clocks.items()):
+                # La estimación se evalúa en el reloj del cliente
+                client_ns = clock.to_local(time.monotonic_ns())
+                print(f"Node {node_id} clock: {format_clock(clock.snapshot(client_ns))}")
+            histogram.dump(dump_path)
+            next_report = time.monotonic() + report_interval
 
 if __name__ == "__main__":
-    gather_server()
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--verbose", action="store_true", help="print every message")
+    arg_parser.add_argument("--report-interval", type=float, default=10.0)
+    arg_parser.add_argument("--dump", help="histogram file (default: reports/gather_server.hist)")
+    arg_parser.add_argument("--time-endpoint", default="tcp://*:5568", help="clock sync endpoint to bind")
+    args = arg_parser.parse_args()
+    gather_server(args.verbose, args.report_interval, args.dump, args.time_endpoint)
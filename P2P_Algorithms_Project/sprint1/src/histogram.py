@@ -0,0 +1,131 @@
+import sys
+import array
+import struct
+import zlib
+
+# Histograma de latencias estilo HDR: cada potencia de 2 se divide en
+# SUB_COUNT cubos lineales, así el error relativo es menor que 1 / SUB_COUNT
+# (~0.8%) en todo el rango. record() solo calcula un índice con operaciones
+# de bits e incrementa un contador de un array preasignado.
+SUB_BITS = 7
+SUB_COUNT = 1 << SUB_BITS
+MAX_VALUE = 1 << 42  # ~73 minutos en nanosegundos
+DUMP_ENTRY = struct.Struct("!IQ")
+
+def bucket_index(value):
+    if value < SUB_COUNT:
+        return value
+    shift = value.bit_length() - SUB_BITS - 1
+    return (shift + 1) * SUB_COUNT + (value >> shift) - SUB_COUNT
+
+def bucket_value(index):
+    # Punto medio del cubo
+    if index < SUB_COUNT:
+        return index
+    shift = index // SUB_COUNT - 1
+    lower = (index % SUB_COUNT + SUB_COUNT) << shift
+    return lower + (1 << shift) // 2
+
+class LatencyHistogram:
+    def __init__(self):
+        self.size = bucket_index(MAX_VALUE - 1) + 1
+        self.counts = array.array("Q", bytes(8 * self.size))
+        self.count = 0
+        self.total = 0
+        self.min = MAX_VALUE
+        self.max = 0
+
+    def record(self, value):
+        value = int(value)
+        if value < 0:
+            value = 0
+        elif value >= MAX_VALUE:
+            value = MAX_VALUE - 1
+        self.counts[bucket_index(value)] += 1
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        counts = self.counts
+        for index, count in enumerate(other.counts):
+            if count:
+                counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def percentile(self, q):
+        if not self.count:
+            return 0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                return min(max(bucket_value(index), self.min), self.max)
+        return self.max
+
+    def snapshot(self):
+        # Percentiles en milisegundos (los valores se registran en ns)
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "min": self.min / 1e6,
+            "mean": self.total / self.count / 1e6,
+            "p50": self.percentile(0.5) / 1e6,
+            "p90": self.percentile(0.9) / 1e6,
+            "p99": self.percentile(0.99) / 1e6,
+            "p999": self.percentile(0.999) / 1e6,
+            "max": self.max / 1e6,
+        }
+
+    def reset(self):
+        self.counts = array.array("Q", bytes(8 * self.size))
+        self.count = 0
+        self.total = 0
+        self.min = MAX_VALUE
+        self.max = 0
+
+    def encode(self):
+        # Solo los cubos no vacíos, comprimidos: apto para enviar entre nodos
+        header = struct.pack("!QQQQ", self.count, self.total, self.min, self.max)
+        entries = b"".join(DUMP_ENTRY.pack(index, count) for index, count in enumerate(self.counts) if count)
+        return zlib.compress(header + entries)
+
+    @classmethod
+    def decode(cls, data):
+        data = zlib.decompress(data)
+        histogram = cls()
+        histogram.count, histogram.total, histogram.min, histogram.max = struct.unpack_from("!QQQQ", data)
+        for index, count in DUMP_ENTRY.iter_unpack(data[32:]):
+            histogram.counts[index] = count
+        return histogram
+
+    def dump(self, path):
+        with open(path, "wb") as f:
+            f.write(self.encode())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.decode(f.read())
+
+def format_snapshot(snapshot):
+    if not snapshot["count"]:
+        return "count=0"
+    return (f"count={snapshot['count']} p50={snapshot['p50']:.3f} ms p90={snapshot['p90']:.3f} ms "
+            f"p99={snapshot['p99']:.3f} ms p999={snapshot['p999']:.3f} ms max={snapshot['max']:.3f} ms")
+
+if __name__ == "__main__":
+    # Combinar los histogramas volcados por varios nodos:
+    #   python histogram.py ../reports/*.hist
+    merged = LatencyHistogram()
+    for path in sys.argv[1:]:
+        merged.merge(LatencyHistogram.load(path))
+    print(format_snapshot(merged.snapshot()))
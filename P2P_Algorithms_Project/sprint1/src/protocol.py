@@ -0,0 +1,34 @@
+import struct
+import time
+from collections import namedtuple
+
+# Formato binario compartido por Gather y Broadcast.
+# Cabecera fija (16 bytes, orden de red):
+#   version (B) | flags (B) | node_id (H) | seq (I) | timestamp_ns (Q)
+# seguida del payload en bruto. El timestamp es time.monotonic_ns() del emisor.
+# En flags, los 3 bits bajos son el códec del bloque en sprint2 (codec.py) y
+# FLAG_CLOCK marca un mensaje cuyo payload es una estimación de clocksync.py.
+VERSION = 1
+FLAG_CLOCK = 0x80
+HEADER = struct.Struct("!BBHIQ")
+HEADER_SIZE = HEADER.size
+
+Frame = namedtuple("Frame", ["version", "flags", "node_id", "seq", "timestamp_ns", "payload"])
+
+def encode_frame(node_id, seq, payload=b"", flags=0, timestamp_ns=None):
+    if timestamp_ns is None:
+        timestamp_ns = time.monotonic_ns()
+    return HEADER.pack(VERSION, flags, node_id, seq & 0xFFFFFFFF, timestamp_ns) + payload
+
+def decode_frame(frame):
+    if len(frame) < HEADER_SIZE:
+        raise ValueError(f"Frame too short: {len(frame)} bytes")
+    version, flags, node_id, seq, timestamp_ns = HEADER.unpack_from(frame)
+    if version != VERSION:
+        raise ValueError(f"Unsupported protocol version: {version}")
+    return Frame(version, flags, node_id, seq, timestamp_ns, frame[HEADER_SIZE:])
+
+def latency_ms(frame, recv_ns=None):
+    if recv_ns is None:
+        recv_ns = time.monotonic_ns()
+    return (recv_ns - frame.timestamp_ns) / 1e6
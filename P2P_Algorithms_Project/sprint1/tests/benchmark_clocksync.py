@@ -0,0 +1,90 @@
+import sys
+import os
+import struct
+import threading
+import time
+import zmq
+
+# Añadir el directorio raíz del proyecto al PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from clocksync import ClockSync, TimeServer
+from histogram import LatencyHistogram
+from protocol import decode_frame, encode_frame
+
+# Precisión de la latencia corregida con clocksync.py. Un "servidor remoto"
+# simulado lleva su reloj OFFSET_NS por delante y DRIFT más rápido que el
+# local; publica cada 10 ms por tcp (loopback) con ese reloj en la cabecera y
+# el reloj local real en el payload, que da la latencia verdadera. El receptor
+# compara la latencia sin corregir y la corregida con la verdadera.
+OFFSET_NS = 250_000_000
+DRIFT = 100e-6
+DATA_ENDPOINT = "tcp://127.0.0.1:5597"
+TIME_ENDPOINT = "tcp://127.0.0.1:5598"
+TRUE_SEND = struct.Struct("!Q")
+
+def remote_time(local_ns, start_ns):
+    return local_ns + OFFSET_NS + round(DRIFT * (local_ns - start_ns))
+
+def publisher(context, start_ns, stopped):
+    socket = context.socket(zmq.PUB)
+    socket.setsockopt(zmq.LINGER, 0)
+    socket.bind(DATA_ENDPOINT)
+    seq = 0
+    while not stopped.is_set():
+        # Ambos timestamps salen de la misma lectura del reloj
+        now_ns = time.monotonic_ns()
+        socket.send(encode_frame(0, seq, TRUE_SEND.pack(now_ns), timestamp_ns=remote_time(now_ns, start_ns)))
+        seq += 1
+        time.sleep(0.01)
+    socket.close()
+
+def run(duration, probes, window, sync_interval):
+    context = zmq.Context()
+    start_ns = time.monotonic_ns()
+    server = TimeServer(TIME_ENDPOINT, context, clock=lambda: remote_time(time.monotonic_ns(), start_ns)).start()
+    stopped = threading.Event()
+    sender = threading.Thread(target=publisher, args=(context, start_ns, stopped))
+    sender.start()
+    socket = context.socket(zmq.SUB)
+    socket.setsockopt(zmq.LINGER, 0)
+    socket.setsockopt_string(zmq.SUBSCRIBE, "")
+    socket.connect(DATA_ENDPOINT)
+    clock_sync = ClockSync(TIME_ENDPOINT, context, probes=probes, interval=sync_interval, window=window).start()
+    errors = LatencyHistogram()
+    uncertainty = LatencyHistogram()
+    covered = total = 0
+    raw_error = 0
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        if not socket.poll(100):
+            continue
+        frame = decode_frame(socket.recv())
+        recv_ns = time.monotonic_ns()
+        if not clock_sync.clock.synced():
+            continue
+        (true_send_ns,) = TRUE_SEND.unpack(frame.payload)
+        true_latency = recv_ns - true_send_ns
+        error = abs(recv_ns - clock_sync.clock.to_local(frame.timestamp_ns) - true_latency)
+        raw_error = max(raw_error, abs(recv_ns - frame.timestamp_ns - true_latency))
+        errors.record(error)
+        total += 1
+        uncertainty.record(clock_sync.clock.uncertainty(recv_ns))
+        covered += error <= clock_sync.clock.uncertainty(recv_ns)
+    clock_sync.close()
+    stopped.set()
+    sender.join()
+    socket.close()
+    server.close()
+    context.term()
+    return raw_error, errors.snapshot(), uncertainty.snapshot(), covered / total
+
+if __name__ == "__main__":
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 20.0
+    print(f"Reloj remoto: {OFFSET_NS / 1e6:+.0f} ms, deriva {DRIFT * 1e6:+.0f} ppm; {duration:.0f} s por fila")
+    print("| Sondas | Ventana | Error sin corregir (ms) | Error p50 (us) | Error p99 (us) | Error máx (us) | "
+          "Incertidumbre p50 (us) | Dentro de la incertidumbre |")
+    for probes, window in ((1, 1), (8, 1), (8, 16)):
+        raw_error, errors, uncertainty, covered = run(duration, probes, window, sync_interval=2.0)
+        print(f"| {probes} | {window} | {raw_error / 1e6:.1f} | {errors['p50'] * 1e3:.1f} | "
+              f"{errors['p99'] * 1e3:.1f} | {errors['max'] * 1e3:.1f} | {uncertainty['p50'] * 1e3:.1f} | {covered:.1%} |")
@@ -0,0 +1,41 @@
+import sys
+import os
+import time
+import datetime
+
+# Añadir el directorio raíz del proyecto al PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from dateutil import parser
+from protocol import encode_frame, decode_frame, latency_ms
+
+# Microbenchmark: mensajes/s codificando y decodificando en el formato de texto
+# anterior (f-string + dateutil) frente al formato binario de protocol.py.
+
+def text_roundtrip(n, node_id=1):
+    for i in range(n):
+        send_time = datetime.datetime.now()
+        message = f"Data from node {node_id}: {i} {send_time.strftime('%Y-%m-%d %H:%M:%S.%f')}"
+        _, send_time_str = message.rsplit(' ', 1)
+        sent = parser.parse(send_time_str)
+        (datetime.datetime.now() - sent).total_seconds()
+
+def binary_roundtrip(n, node_id=1):
+    payload = b"0"
+    for i in range(n):
+        frame = decode_frame(encode_frame(node_id, i, payload))
+        latency_ms(frame)
+
+def measure(fn, n):
+    start = time.perf_counter()
+    fn(n)
+    return n / (time.perf_counter() - start)
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    text_rate = measure(text_roundtrip, n)
+    binary_rate = measure(binary_roundtrip, n)
+    print(f"Mensajes: {n}")
+    print(f"Texto + dateutil: {text_rate:,.0f} msg/s")
+    print(f"Binario (protocol.py): {binary_rate:,.0f} msg/s")
+    print(f"Mejora: {binary_rate / text_rate:.1f}x")
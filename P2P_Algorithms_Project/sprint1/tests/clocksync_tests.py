@@ -0,0 +1,92 @@
+import sys
+import os
+import random
+import time
+import unittest
+import zmq
+
+# Añadir el directorio raíz del proyecto al PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from clocksync import MAX_DRIFT, ClockOffset, ClockSync, TimeServer
+
+class TestClockOffset(unittest.TestCase):
+    def test_offset_and_drift_fit(self):
+        # Reloj del par: 5 ms por delante y 20 ppm más rápido, sondas con ±50 us de ruido
+        rng = random.Random(0)
+        clock = ClockOffset()
+        for i in range(16):
+            local_ns = i * 1_000_000_000
+            true_offset = 5_000_000 + 20e-6 * local_ns
+            clock.add_sample(local_ns, round(true_offset + rng.uniform(-50_000, 50_000)), 50_000)
+        snapshot = clock.snapshot()
+        self.assertAlmostEqual(snapshot["drift_ppm"], 20, delta=2)
+        later_ns = 20 * 1_000_000_000
+        self.assertLess(abs(clock.offset(later_ns) - (5_000_000 + 20e-6 * later_ns)), clock.uncertainty(later_ns))
+        # La incertidumbre crece al alejarse de la última ronda
+        self.assertGreaterEqual(clock.uncertainty(15 * 1_000_000_000), 50_000)
+        self.assertGreater(clock.uncertainty(later_ns), clock.uncertainty(15 * 1_000_000_000))
+        self.assertLess(abs(clock.to_local(clock.to_peer(later_ns)) - later_ns), 10)
+
+    def test_single_sample(self):
+        clock = ClockOffset()
+        self.assertFalse(clock.synced())
+        clock.add_sample(1000, -300, 40)
+        self.assertTrue(clock.synced())
+        self.assertEqual(clock.offset(10 ** 9), -300)
+        self.assertEqual(clock.uncertainty(1000), 40)
+        # Sin deriva estimada se supone la máxima
+        self.assertEqual(clock.uncertainty(1000 + 10 ** 9), 40 + round(MAX_DRIFT * 10 ** 9))
+
+    def test_encode_decode(self):
+        clock = ClockOffset()
+        clock.add_sample(10, 2_000_000, 1000)
+        clock.add_sample(2_000_000_010, 2_000_100, 800)
+        decoded = ClockOffset.decode(clock.encode())
+        self.assertEqual(decoded.model, clock.model)
+        self.assertEqual(decoded.to_peer(5_000_000_000), clock.to_peer(5_000_000_000))
+        with self.assertRaises(ValueError):
+            ClockOffset.decode(b"short")
+
+class TestClockSync(unittest.TestCase):
+    def test_probes_estimate_skewed_clock(self):
+        context = zmq.Context()
+        skew_ns = 3_000_000_000
+        server = TimeServer("inproc://clock", context, clock=lambda: time.monotonic_ns() + skew_ns).start()
+        client = ClockSync("inproc://clock", context, probes=4)
+        self.assertTrue(client.sync())
+        self.assertTrue(client.sync())
+        clock = client.clock
+        now_ns = time.monotonic_ns()
+        self.assertLessEqual(abs(clock.offset(now_ns) - skew_ns), clock.uncertainty(now_ns))
+        client.close()
+        server.close()
+        context.term()
+
+    def test_malformed_probe(self):
+        context = zmq.Context()
+        server = TimeServer("inproc://clock", context).start()
+        socket = context.socket(zmq.REQ)
+        socket.connect("inproc://clock")
+        socket.send(b"bad")
+        self.assertTrue(socket.poll(1000))
+        self.assertEqual(socket.recv(), b"ERR probe")
+        socket.close()
+        # El servidor sigue respondiendo a las sondas válidas
+        self.assertTrue(server.thread.is_alive())
+        client = ClockSync("inproc://clock", context, probes=2)
+        self.assertTrue(client.sync())
+        client.close()
+        server.close()
+        context.term()
+
+    def test_no_reply(self):
+        context = zmq.Context()
+        client = ClockSync("inproc://nobody", context, probes=2, timeout=0.05)
+        self.assertFalse(client.sync())
+        self.assertFalse(client.clock.synced())
+        client.close()
+        context.term()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import sys
+import os
+import random
+import tempfile
+import unittest
+
+# Añadir el directorio raíz del proyecto al PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from histogram import SUB_COUNT, LatencyHistogram, bucket_index, bucket_value
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_bucket_relative_error(self):
+        for value in (0, 1, SUB_COUNT - 1, SUB_COUNT, 1000, 123456, 987654321, 2 ** 40 + 12345):
+            estimate = bucket_value(bucket_index(value))
+            self.assertLessEqual(abs(estimate - value), max(1, value / SUB_COUNT))
+
+    def test_percentiles(self):
+        histogram = LatencyHistogram()
+        values = list(range(1, 100001))
+        random.Random(0).shuffle(values)
+        for value in values:
+            histogram.record(value * 1000)
+        for q in (0.5, 0.99, 0.999):
+            expected = q * 100000 * 1000
+            self.assertLess(abs(histogram.percentile(q) - expected) / expected, 0.01)
+        self.assertEqual(histogram.count, 100000)
+        self.assertEqual(histogram.min, 1000)
+        self.assertEqual(histogram.max, 100000000)
+
+    def test_merge_and_dump(self):
+        first = LatencyHistogram()
+        second = LatencyHistogram()
+        for value in range(1000):
+            first.record(value)
+            second.record(value + 5000)
+        first.merge(second)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "latency.hist")
+            first.dump(path)
+            loaded = LatencyHistogram.load(path)
+        self.assertEqual(loaded.snapshot(), first.snapshot())
+        self.assertEqual(loaded.count, 2000)
+        self.assertEqual(loaded.max, 5999)
+
+    def test_negative_values_clamped(self):
+        histogram = LatencyHistogram()
+        histogram.record(-5)
+        self.assertEqual(histogram.min, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+import sys
+import os
+import unittest
+
+# Añadir el directorio raíz del proyecto al PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from protocol import HEADER_SIZE, VERSION, encode_frame, decode_frame
+
+class TestProtocol(unittest.TestCase):
+    def test_roundtrip(self):
+        raw = encode_frame(7, 42, b"payload", flags=3, timestamp_ns=123456789)
+        self.assertEqual(len(raw), HEADER_SIZE + len(b"payload"))
+        frame = decode_frame(raw)
+        self.assertEqual(frame.version, VERSION)
+        self.assertEqual(frame.flags, 3)
+        self.assertEqual(frame.node_id, 7)
+        self.assertEqual(frame.seq, 42)
+        self.assertEqual(frame.timestamp_ns, 123456789)
+        self.assertEqual(frame.payload, b"payload")
+
+    def test_short_frame(self):
+        with self.assertRaises(ValueError):
+            decode_frame(b"\x01\x00")
+
+    def test_unknown_version(self):
+        raw = bytearray(encode_frame(1, 1))
+        raw[0] = VERSION + 1
+        with self.assertRaises(ValueError):
+            decode_frame(bytes(raw))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,293 @@
+import hashlib
+import struct
+import threading
+import zmq
+from batching import decode_batch, pack_records, unpack_records
+from registry import REGISTRY
+
+# Anti-entropía entre el servidor Gather (con WAL) y sus réplicas en abanico.
+# Cada lado mantiene un árbol de Merkle sobre rangos de offsets del WAL: una
+# hoja cubre leaf_size offsets y su hash es el XOR de los hashes de sus
+# entradas (se actualiza en O(1) al añadir o quitar una); cada nodo interno es
+# el hash de sus `fanout` hijos. El servidor compara los árboles nivel a nivel
+# desde la raíz y solo envía las hojas distintas, así el coste de una
+# resincronización depende de la divergencia y no del tamaño del log.
+#   replicación: [REPLICATE, offset (Q), *frames del lote]                -> [ACK]
+#   hashes:      [HASHES, hojas (Q), leaf_size, fanout, nivel (I), índices (Q...)]
+#                                                                         -> [hashes de 16 bytes]
+#   reparación:  [REPAIR, rangos (QQ...), registros con prefijo de longitud] -> [ACK]
+REPLICATE = b"R"
+HASHES = b"H"
+REPAIR = b"P"
+OFFSET = struct.Struct("!Q")
+TREE_REQUEST = struct.Struct("!QIII")
+RANGE = struct.Struct("!QQ")
+HASH_SIZE = 16
+EMPTY_HASH = bytes(HASH_SIZE)
+LEAF_SIZE = 64
+FANOUT = 16
+RESYNC_BUCKETS = (0, 1e3, 1e4, 1e5, 1e6, 1e7, 1e8, 1e9)
+# Errores que abortan una resincronización (réplica caída o que responde mal,
+# socket en mal estado, WAL ilegible) sin parar el hilo de anti-entropía
+RESYNC_ERRORS = (TimeoutError, ValueError, OSError, zmq.ZMQError)
+
+def entry_hash(offset, record):
+    digest = hashlib.blake2b(OFFSET.pack(offset), digest_size=HASH_SIZE)
+    digest.update(record)
+    return int.from_bytes(digest.digest(), "big")
+
+class MerkleTree:
+    def __init__(self, leaf_size=LEAF_SIZE, fanout=FANOUT):
+        self.leaf_size = leaf_size
+        self.fanout = fanout
+        self.leaves = []
+        self.version = 0
+        self.cache = None
+
+    def toggle(self, offset, record):
+        # Añade la entrada, o la quita si ya estaba: el XOR es su propio inverso
+        leaf = offset // self.leaf_size
+        if leaf >= len(self.leaves):
+            self.leaves.extend([0] * (leaf + 1 - len(self.leaves)))
+        self.leaves[leaf] ^= entry_hash(offset, record)
+        self.version += 1
+
+    def levels(self, leaves):
+        # Niveles del árbol sobre las primeras `leaves` hojas: levels[0] son las
+        # hojas y levels[-1] la raíz. Se guardan hasta la siguiente modificación.
+        if self.cache is not None and self.cache[:2] == (leaves, self.version):
+            return self.cache[2]
+        level = [self.leaves[i].to_bytes(HASH_SIZE, "big") if i < len(self.leaves) else EMPTY_HASH
+                 for i in range(leaves)]
+        levels = [level]
+        while len(level) > 1:
+            level = [hashlib.blake2b(b"".join(level[i:i + self.fanout]), digest_size=HASH_SIZE).digest()
+                     for i in range(0, len(level), self.fanout)]
+            levels.append(level)
+        self.cache = (leaves, self.version, levels)
+        return levels
+
+class ReplicaStore:
+    # Registros de una réplica indexados por offset del WAL del servidor
+    def __init__(self, leaf_size=LEAF_SIZE, fanout=FANOUT):
+        self.records = {}
+        self.tree = MerkleTree(leaf_size, fanout)
+        self.repaired = 0
+
+    def put(self, offset, record):
+        old = self.records.get(offset)
+        if old == record:
+            return
+        if old is not None:
+            self.tree.toggle(offset, old)
+        self.records[offset] = record
+        self.tree.toggle(offset, record)
+
+    def delete(self, offset):
+        old = self.records.pop(offset, None)
+        if old is not None:
+            self.tree.toggle(offset, old)
+
+    def handle(self, frames):
+        # Respuesta (lista de frames) a un mensaje del servidor
+        kind = frames[0]
+        if kind == REPLICATE:
+            (offset,) = OFFSET.unpack(frames[1])
+            _, records = decode_batch(frames[2:])
+            for i, record in enumerate(records):
+                self.put(offset + i, record)
+        elif kind == HASHES:
+            leaves, leaf_size, fanout, level = TREE_REQUEST.unpack_from(frames[1])
+            if (leaf_size, fanout) != (self.tree.leaf_size, self.tree.fanout):
+                return [f"ERR tree {self.tree.leaf_size}/{self.tree.fanout}".encode()]
+            hashes = self.tree.levels(leaves)[level]
+            return [b"".join(hashes[index] for (index,) in OFFSET.iter_unpack(frames[1][TREE_REQUEST.size:]))]
+        elif kind == REPAIR:
+            records = unpack_records(frames[2])
+            position = 0
+            # Cada rango sustituye por completo a lo que hubiera en la réplica
+            for start, stop in RANGE.iter_unpack(frames[1]):
+                for offset in range(start, stop):
+                    self.delete(offset)
+                for offset in range(start, stop):
+                    self.put(offset, records[position])
+                    position += 1
+            self.repaired += position
+        # Cualquier otro mensaje es un lote sin offset (formato anterior): solo se confirma
+        return [b"ACK"]
+
+class AntiEntropy:
+    # Hilo del servidor Gather que cada `interval` segundos resincroniza cada
+    # réplica con el WAL. Solo se comparan los offsets que ya eran duraderos en
+    # la ronda anterior, para no "reparar" lotes que aún están en vuelo.
+    def __init__(self, wal, replicas, context=None, interval=10.0, timeout=2.0, leaf_size=LEAF_SIZE,
+                 fanout=FANOUT, max_repair_bytes=1024 * 1024, registry=REGISTRY):
+        self.wal = wal
+        self.context = context or zmq.Context.instance()
+        self.replicas = list(replicas)
+        self.endpoints = [replica if "://" in replica else f"tcp://{replica}" for replica in self.replicas]
+        self.interval = interval
+        self.timeout_ms = int(timeout * 1000)
+        self.max_repair_bytes = max_repair_bytes
+        self.tree = MerkleTree(leaf_size, fanout)
+        self.indexed = 0
+        self.settled = 0
+        self.sockets = [None] * len(self.replicas)
+        self.last = {}
+        self.stopped = threading.Event()
+        self.thread = None
+        self.register(registry)
+
+    def register(self, registry):
+        registry.gauge("antientropy_indexed_offset", "WAL entries included in the server tree",
+                       function=lambda: self.indexed)
+        self.metrics = []
+        for replica in self.replicas:
+            self.metrics.append({
+                "resyncs": registry.counter("antientropy_resyncs_total", "Completed resyncs", replica=replica),
+                "failures": registry.counter("antientropy_failures_total", "Resyncs aborted by a timeout or error",
+                                             replica=replica),
+                "sent": registry.counter("antientropy_bytes_total", "Bytes exchanged by anti-entropy",
+                                         replica=replica, direction="sent"),
+                "received": registry.counter("antientropy_bytes_total", "Bytes exchanged by anti-entropy",
+                                             replica=replica, direction="received"),
+                "bytes": registry.histogram("antientropy_resync_bytes", "Bytes exchanged per resync",
+                                            buckets=RESYNC_BUCKETS, replica=replica),
+                "records": registry.counter("antientropy_repaired_records_total", "Records sent in repairs",
+                                            replica=replica),
+                "leaves": registry.gauge("antientropy_divergent_leaves", "Leaves that differed in the last resync",
+                                         replica=replica),
+            })
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+        return self
+
+    def catch_up(self):
+        # Añade al árbol las entradas que el WAL ha hecho duraderas desde la última vez
+        for offset, record in self.wal.scan(self.indexed):
+            self.tree.toggle(offset, record)
+            self.indexed = offset + 1
+        return self.indexed
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            leaves = self.settled // self.tree.leaf_size
+            for index in range(len(self.replicas)):
+                if self.stopped.is_set():
+                    break
+                try:
+                    self.resync(index, leaves)
+                except RESYNC_ERRORS as error:
+                    print(f"Anti-entropy with {self.replicas[index]} failed: {error}")
+            try:
+                self.settled = self.catch_up()
+            except RESYNC_ERRORS as error:
+                # Sin leer el WAL no avanza settled: la siguiente ronda de cada
+                # réplica compara un árbol atrasado y se cuenta como fallo
+                print(f"Anti-entropy could not read the WAL: {error}")
+                for metrics in self.metrics:
+                    metrics["failures"].inc()
+
+    def _request(self, index, frames, totals):
+        socket = self.sockets[index]
+        if socket is None:
+            socket = self.sockets[index] = self.context.socket(zmq.REQ)
+            socket.setsockopt(zmq.LINGER, 0)
+            socket.connect(self.endpoints[index])
+        socket.send_multipart(frames)
+        totals["sent"] += sum(len(frame) for frame in frames)
+        if not socket.poll(self.timeout_ms, zmq.POLLIN):
+            # Un REQ sin respuesta queda bloqueado: se cierra y se abre otro en la siguiente petición
+            socket.close()
+            self.sockets[index] = None
+            raise TimeoutError("no reply")
+        reply = socket.recv_multipart()
+        totals["received"] += sum(len(frame) for frame in reply)
+        if reply[0].startswith(b"ERR"):
+            raise ValueError(reply[0].decode())
+        return reply
+
+    def resync(self, index, leaves=None):
+        # Compara el árbol del servidor con el de la réplica `index` sobre las
+        # primeras `leaves` hojas (por defecto todas las completas) y repara
+        # las que difieren. Devuelve un resumen de la resincronización.
+        metrics = self.metrics[index]
+        totals = {"sent": 0, "received": 0, "rounds": 0, "leaves": 0, "records": 0}
+        try:
+            if leaves is None:
+                leaves = self.catch_up() // self.tree.leaf_size
+            self._resync(index, leaves, totals)
+        except RESYNC_ERRORS as error:
+            metrics["failures"].inc()
+            if isinstance(error, zmq.ZMQError) and self.sockets[index] is not None:
+                # Un REQ que falla a mitad de petición no se puede reutilizar
+                self.sockets[index].close()
+                self.sockets[index] = None
+            raise
+        finally:
+            metrics["sent"].inc(totals["sent"])
+            metrics["received"].inc(totals["received"])
+        metrics["resyncs"].inc()
+        metrics["bytes"].observe(totals["sent"] + totals["received"])
+        metrics["records"].inc(totals["records"])
+        metrics["leaves"].set(totals["leaves"])
+        self.last[self.replicas[index]] = totals
+        return totals
+
+    def _resync(self, index, leaves, totals):
+        if leaves == 0:
+            return
+        levels = self.tree.levels(leaves)
+        fanout = self.tree.fanout
+        level = len(levels) - 1
+        nodes = [0]
+        while nodes:
+            request = TREE_REQUEST.pack(leaves, self.tree.leaf_size, fanout, level)
+            request += b"".join(OFFSET.pack(node) for node in nodes)
+            (theirs,) = self._request(index, [HASHES, request], totals)
+            totals["rounds"] += 1
+            ours = levels[level]
+            differing = [node for i, node in enumerate(nodes)
+                         if theirs[i * HASH_SIZE:(i + 1) * HASH_SIZE] != ours[node]]
+            if level == 0:
+                self._repair(index, differing, totals)
+                return
+            level -= 1
+            width = len(levels[level])
+            nodes = [child for node in differing
+                     for child in range(node * fanout, min((node + 1) * fanout, width))]
+
+    def _repair(self, index, differing, totals):
+        # Envía el contenido completo de las hojas distintas, agrupado en
+        # mensajes de hasta max_repair_bytes
+        leaf_size = self.tree.leaf_size
+        totals["leaves"] = len(differing)
+        ranges = []
+        records = []
+        size = 0
+        for leaf in differing:
+            entries = self.wal.read(leaf * leaf_size, max_entries=leaf_size)
+            ranges.append(RANGE.pack(leaf * leaf_size, leaf * leaf_size + len(entries)))
+            records.extend(record for _, record in entries)
+            size += sum(len(record) for _, record in entries)
+            if size >= self.max_repair_bytes:
+                self._request(index, [REPAIR, b"".join(ranges), pack_records(records)], totals)
+                totals["records"] += len(records)
+                ranges, records, size = [], [], 0
+        if ranges:
+            self._request(index, [REPAIR, b"".join(ranges), pack_records(records)], totals)
+            totals["records"] += len(records)
+
+    def stats(self):
+        return dict(self.last)
+
+    def close(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+        for socket in self.sockets:
+            if socket is not None:
+                socket.close()
@@ -0,0 +1,147 @@
+import sys
+import os
+import lzma
+import struct
+import time
+import zlib
+
+# Reutilizar el formato binario de mensajes del Sprint 1
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'sprint1', 'src')))
+
+from protocol import encode_frame, decode_frame
+from codec import CODEC_MASK, DEFAULT_CODEC
+from registry import REGISTRY, CompressionStats
+
+# Un lote viaja como un mensaje multiparte de ZeroMQ:
+#   frame 0: cabecera de protocol.py cuyo payload es el número de registros;
+#            el byte de flags indica el códec del bloque (codec.py)
+#   frame 1: registros con prefijo de longitud, codificados como un solo bloque
+RECORD_LEN = struct.Struct("!I")
+BATCH_COUNT = struct.Struct("!I")
+# ACK de un lote en el modo ROUTER/DEALER: número de secuencia de la cabecera
+BATCH_ACK = struct.Struct("!I")
+
+def pack_records(records):
+    parts = []
+    for record in records:
+        parts.append(RECORD_LEN.pack(len(record)))
+        parts.append(record)
+    return b"".join(parts)
+
+def unpack_records(block):
+    # Los registros siempre son bytes: de un memoryview se copia solo cada registro
+    records = []
+    offset = 0
+    end = len(block)
+    view = block if isinstance(block, bytes) else memoryview(block)
+    while offset < end:
+        (length,) = RECORD_LEN.unpack_from(block, offset)
+        offset += RECORD_LEN.size
+        record = view[offset:offset + length]
+        records.append(record if view is block else record.tobytes())
+        offset += length
+    if offset != end:
+        raise ValueError("Truncated record in batch")
+    return records
+
+def encode_batch(node_id, seq, records, codec=DEFAULT_CODEC):
+    codec_id, block = codec.encode(pack_records(records))
+    header = encode_frame(node_id, seq, BATCH_COUNT.pack(len(records)), flags=codec_id)
+    return [header, block]
+
+def decode_batch(frames, codec=DEFAULT_CODEC):
+    # Cualquier mensaje mal formado termina en ValueError, también los errores
+    # de los descompresores y de struct: un cliente no puede tumbar al servidor
+    try:
+        return _decode_batch(frames, codec)
+    except (zlib.error, lzma.LZMAError, OSError, EOFError, struct.error) as e:
+        raise ValueError(f"Corrupt batch: {e}") from e
+
+def _decode_batch(frames, codec):
+    # Un solo frame: formato anterior, un registro comprimido con zlib
+    if len(frames) == 1:
+        return None, [zlib.decompress(frames[0])]
+    header = decode_frame(frames[0])
+    (count,) = BATCH_COUNT.unpack(header.payload)
+    records = unpack_records(codec.decode(header.flags & CODEC_MASK, frames[1]))
+    if len(records) != count:
+        raise ValueError(f"Batch declares {count} records but contains {len(records)}")
+    return header, records
+
+class GatherStats:
+    # Métricas del lado servidor de Gather, etiquetadas con el nombre del servidor.
+    # Con compression=False no se exportan los bytes antes/después de comprimir.
+    def __init__(self, server, registry=REGISTRY, compression=True):
+        self.messages_in = registry.counter("gather_messages_in_total", "Messages received", server=server)
+        self.records_in = registry.counter("gather_records_in_total", "Records received", server=server)
+        self.bytes_in = registry.counter("gather_bytes_in_total", "Bytes received on the wire", server=server)
+        self.messages_out = registry.counter("gather_messages_out_total", "Replies sent", server=server)
+        self.errors = registry.counter("gather_errors_total", "Messages that could not be decoded", server=server)
+        self.compression = CompressionStats("gather", registry, server=server) if compression else None
+
+    def received(self, frames, records=None):
+        self.messages_in.inc()
+        self.bytes_in.inc(sum(len(frame) for frame in frames))
+        if records is not None:
+            self.records_in.inc(len(records))
+        if records is not None and self.compression is not None:
+            self.compression.observe(sum(len(record) for record in records), len(frames[-1]))
+
+class BatchingGatherClient:
+    # Acumula registros y los envía como un lote cuando se alcanza batch_size
+    # o cuando el registro más antiguo lleva max_delay segundos esperando.
+    # send() solo comprueba el plazo al recibir otro registro: un productor que
+    # se queda sin datos debe esperar con poll() (o llamar a flush_if_due() en
+    # su propio bucle) para que un lote parcial no se quede sin enviar.
+    def __init__(self, socket, node_id, batch_size=64, max_delay=0.05, on_flush=None):
+        self.socket = socket
+        self.node_id = node_id
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.on_flush = on_flush
+        self.records = []
+        self.first_time = None
+        self.seq = 0
+
+    def send(self, record):
+        if isinstance(record, str):
+            record = record.encode()
+        if not self.records:
+            self.first_time = time.monotonic()
+        self.records.append(record)
+        if len(self.records) >= self.batch_size:
+            return self.flush()
+        return self.flush_if_due()
+
+    def time_to_flush(self):
+        # Segundos que faltan para que venza el lote pendiente, o None sin lote
+        if not self.records:
+            return None
+        return max(0.0, self.first_time + self.max_delay - time.monotonic())
+
+    def poll(self, timeout):
+        # Espera hasta `timeout` segundos sin registros nuevos; si en ese tiempo
+        # vence el plazo del lote pendiente, lo envía sin esperar al resto
+        remaining = self.time_to_flush()
+        if remaining is None or remaining > timeout:
+            time.sleep(timeout)
+            return None
+        time.sleep(remaining)
+        return self.flush()
+
+    def flush_if_due(self):
+        if self.records and time.monotonic() - self.first_time >= self.max_delay:
+            return self.flush()
+        return None
+
+    def flush(self):
+        if not self.records:
+            return None
+        frames = encode_batch(self.node_id, self.seq, self.records)
+        self.socket.send_multipart(frames)
+        reply = self.socket.recv_string()
+        self.records = []
+        self.seq += 1
+        if self.on_flush is not None:
+            self.on_flush(frames, reply)
+        return reply
@@ -1,15 +1,36 @@
-import zlib
+import argparse
+import time
 import zmq
+from broadcast_relay import decode_hops, hop_latencies_ms
+from pubsub import decode_broadcast
+from transport import service_endpoint
+from zerocopy import recv_frames
 
-def broadcast_client():
+def broadcast_client(topics, endpoint="tcp://localhost:5555", zero_copy=False):
     context = zmq.Context()
     socket = context.socket(zmq.SUB)
-    socket.connect("tcp://localhost:5555")
-    socket.setsockopt_string(zmq.SUBSCRIBE, "")
+    socket.connect(endpoint)
+    # Sin tópicos se suscribe a todo, como antes
+    for topic in topics or [""]:
+        socket.setsockopt_string(zmq.SUBSCRIBE, topic)
     while True:
-        compressed_message = socket.recv()
-        message = zlib.decompress(compressed_message).decode()
-        print(f"Received broadcast: {message}")
+        frames = recv_frames(socket, copy=not zero_copy)
+        recv_ns = time.monotonic_ns()
+        topic, frame, message = decode_broadcast(frames)
+        # str(..., "utf-8") acepta tanto bytes como memoryview
+        print(f"Received broadcast [{str(topic, 'utf-8')}]: {str(message, 'utf-8')}")
+        hops = decode_hops(frames)
+        if hops:
+            latencies = ", ".join(f"{latency:.3f}" for latency in hop_latencies_ms(frame.timestamp_ns, hops, recv_ns))
+            print(f"Hop latencies (ms): {latencies}")
 
 if __name__ == "__main__":
-    broadcast_client()
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("topics", nargs="*")
+    arg_parser.add_argument("--transport", choices=["tcp", "ipc"], default="tcp",
+                            help="ipc for a root server on the same host")
+    arg_parser.add_argument("--connect", help="root server or leaf relay endpoint, overrides --transport")
+    arg_parser.add_argument("--zero-copy", action="store_true",
+                            help="receive frames as memoryviews without copying them")
+    args = arg_parser.parse_args()
+    broadcast_client(args.topics, args.connect or service_endpoint("broadcast", args.transport), args.zero_copy)
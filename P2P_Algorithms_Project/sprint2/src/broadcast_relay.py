@@ -0,0 +1,120 @@
+import sys
+import os
+import argparse
+import multiprocessing
+import struct
+import time
+import zmq
+
+# Reutilizar el formato binario de mensajes del Sprint 1
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'sprint1', 'src')))
+
+from protocol import decode_frame
+
+# Nodo relay para Broadcast en árbol k-ario: se suscribe al nodo padre (XSUB)
+# y republica hacia sus hijos (XPUB). Las suscripciones de los hijos se
+# propagan hacia arriba, así la raíz solo atiende a sus k relays directos.
+# Cada relay añade un frame [relay_id (H), recepción monotonic_ns (Q)] al
+# mensaje para medir la latencia de cada salto.
+HOP = struct.Struct("!HQ")
+
+def decode_hops(frames):
+    return [HOP.unpack(frame) for frame in frames[3:]]
+
+def hop_latencies_ms(header_timestamp_ns, hops, recv_ns=None):
+    # Latencia de cada salto: desde el sello anterior (o el emisor) hasta el
+    # relay; con recv_ns se añade el último salto hasta el suscriptor.
+    latencies = []
+    previous = header_timestamp_ns
+    for _, received_ns in hops:
+        latencies.append((received_ns - previous) / 1e6)
+        previous = received_ns
+    if recv_ns is not None:
+        latencies.append((recv_ns - previous) / 1e6)
+    return latencies
+
+def broadcast_relay(relay_id, upstream, bind_endpoint, context=None, report_interval=10.0):
+    context = context or zmq.Context.instance()
+    frontend = context.socket(zmq.XSUB)
+    frontend.connect(upstream)
+    backend = context.socket(zmq.XPUB)
+    backend.bind(bind_endpoint)
+    poller = zmq.Poller()
+    poller.register(frontend, zmq.POLLIN)
+    poller.register(backend, zmq.POLLIN)
+    forwarded = 0
+    hop_total_ns = 0
+    next_report = time.monotonic() + report_interval
+    try:
+        while True:
+            events = dict(poller.poll(1000))
+            if backend in events:
+                # Suscripciones y bajas de los hijos hacia el padre
+                frontend.send(backend.recv())
+            if frontend in events:
+                frames = frontend.recv_multipart()
+                now = time.monotonic_ns()
+                previous = HOP.unpack(frames[-1])[1] if len(frames) > 3 else decode_frame(frames[1]).timestamp_ns
+                hop_total_ns += now - previous
+                frames.append(HOP.pack(relay_id, now))
+                backend.send_multipart(frames)
+                forwarded += 1
+            if time.monotonic() >= next_report:
+                if forwarded:
+                    print(f"Relay {relay_id}: forwarded={forwarded} "
+                          f"mean hop latency={hop_total_ns / forwarded / 1e6:.3f} ms")
+                next_report = time.monotonic() + report_interval
+    finally:
+        frontend.close()
+        backend.close()
+
+def plan_tree(relays, fanout, root_endpoint="tcp://localhost:5555", host="localhost", base_port=5600):
+    # Árbol k-ario en anchura: los k primeros relays cuelgan de la raíz y el
+    # relay i cuelga del relay (i - k) // k.
+    plan = []
+    for relay_id in range(relays):
+        if relay_id < fanout:
+            upstream = root_endpoint
+            depth = 1
+        else:
+            parent = plan[(relay_id - fanout) // fanout]
+            upstream = parent["connect"]
+            depth = parent["depth"] + 1
+        plan.append({
+            "relay_id": relay_id,
+            "upstream": upstream,
+            "bind": f"tcp://*:{base_port + relay_id}",
+            "connect": f"tcp://{host}:{base_port + relay_id}",
+            "depth": depth,
+        })
+    return plan
+
+def leaf_endpoints(plan):
+    parents = {entry["upstream"] for entry in plan}
+    return [entry["connect"] for entry in plan if entry["connect"] not in parents]
+
+def run_tree(plan):
+    processes = [multiprocessing.Process(target=broadcast_relay,
+                                         args=(entry["relay_id"], entry["upstream"], entry["bind"]))
+                 for entry in plan]
+    for process in processes:
+        process.start()
+    return processes
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--id", type=int, default=0)
+    arg_parser.add_argument("--upstream", default="tcp://localhost:5555")
+    arg_parser.add_argument("--bind", default="tcp://*:5600")
+    arg_parser.add_argument("--tree", type=int, help="launch a whole tree with this many relays")
+    arg_parser.add_argument("--fanout", type=int, default=4)
+    args = arg_parser.parse_args()
+    if args.tree:
+        plan = plan_tree(args.tree, args.fanout, args.upstream)
+        for entry in plan:
+            print(f"Relay {entry['relay_id']} depth {entry['depth']}: {entry['upstream']} -> {entry['bind']}")
+        print(f"Leaf endpoints for clients: {leaf_endpoints(plan)}")
+        for process in run_tree(plan):
+            process.join()
+    else:
+        broadcast_relay(args.id, args.upstream, args.bind)
@@ -1,17 +1,35 @@
-import zlib
+import argparse
 import zmq
 import time
+from pubsub import TopicPublisher
+from registry import serve_metrics
+from transport import service_endpoint
 
-def broadcast_server():
+TOPICS = {
+    "nodes": "Hello to all nodes",
+    "metrics": "latency,bandwidth",
+    "alerts": "No alerts",
+}
+
+def broadcast_server(topics=TOPICS, metrics_port=None, bind_endpoint="tcp://*:5555"):
     context = zmq.Context()
-    socket = context.socket(zmq.PUB)
-    socket.bind("tcp://*:5555")
+    socket = context.socket(zmq.XPUB)
+    socket.bind(bind_endpoint)
+    publisher = TopicPublisher(socket)
+    if metrics_port:
+        serve_metrics(metrics_port)
     while True:
-        message = "Hello to all nodes"
-        compressed_message = zlib.compress(message.encode())
-        socket.send(compressed_message)
-        print(f"Broadcasting: {message}")
+        for topic, message in topics.items():
+            if publisher.publish(topic, message):
+                print(f"Broadcasting [{topic}]: {message}")
         time.sleep(1)
 
 if __name__ == "__main__":
-    broadcast_server()
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--metrics-port", type=int)
+    arg_parser.add_argument("--transport", choices=["tcp", "ipc"], default="tcp",
+                            help="ipc for subscribers and relays on the same host")
+    arg_parser.add_argument("--endpoint", help="endpoint to bind, overrides --transport")
+    args = arg_parser.parse_args()
+    broadcast_server(metrics_port=args.metrics_port,
+                     bind_endpoint=args.endpoint or service_endpoint("broadcast", args.transport, bind=True))
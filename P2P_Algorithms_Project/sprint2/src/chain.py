@@ -0,0 +1,130 @@
+import collections
+import struct
+import threading
+import zmq
+from replication import QuorumWrite
+from registry import REGISTRY
+
+# Replicación en cadena: la cabeza envía cada mensaje solo al primer nodo,
+# cada nodo lo reenvía al siguiente y la cola confirma directamente a la
+# cabeza. El ancho de banda de salida por nodo no depende del número de réplicas.
+#   mensaje en la cadena: [seq (Q), *frames]
+#   ACK de la cola:       [seq (Q)]
+CHAIN_SEQ = struct.Struct("!Q")
+
+class ChainReplicator:
+    # Misma interfaz que ReplicationPool: replicate() devuelve un QuorumWrite
+    # que se confirma cuando la cola de la cadena ha recibido el mensaje.
+    def __init__(self, head_endpoint, ack_endpoint, context=None, max_pending=10000, registry=REGISTRY):
+        self.context = context or zmq.Context.instance()
+        self.socket = self.context.socket(zmq.PUSH)
+        self.socket.setsockopt(zmq.LINGER, 0)
+        self.socket.connect(head_endpoint)
+        self.ack_endpoint = ack_endpoint
+        self.max_pending = max_pending
+        self.pending = collections.OrderedDict()
+        self.lock = threading.Lock()
+        self.seq = 0
+        self.sent = 0
+        self.committed = 0
+        self.failed = 0
+        self.bytes_out = 0
+        self.running = True
+        self.register(registry, head_endpoint)
+        ready = threading.Event()
+        self.thread = threading.Thread(target=self._collect_acks, args=(ready,), daemon=True)
+        self.thread.start()
+        ready.wait()
+
+    def replicate(self, frames):
+        if isinstance(frames, bytes):
+            frames = [frames]
+        write = QuorumWrite(1)
+        with self.lock:
+            seq = self.seq
+            self.seq += 1
+            self.pending[seq] = write
+            # Los mensajes más antiguos sin confirmar se dan por perdidos
+            while len(self.pending) > self.max_pending:
+                _, lost = self.pending.popitem(last=False)
+                self.failed += 1
+                lost.fail()
+        message = [CHAIN_SEQ.pack(seq)] + list(frames)
+        try:
+            # Sin bloquear: con la cabeza caída la cola del PUSH se llena
+            # (SNDHWM) y el servidor Gather dejaría de atender a sus clientes
+            self.socket.send_multipart(message, zmq.NOBLOCK)
+        except zmq.Again:
+            with self.lock:
+                self.pending.pop(seq, None)
+            self.failed += 1
+            write.fail()
+            return write
+        self.sent += 1
+        self.bytes_out += sum(len(frame) for frame in message)
+        return write
+
+    def _collect_acks(self, ready):
+        socket = self.context.socket(zmq.PULL)
+        socket.bind(self.ack_endpoint)
+        ready.set()
+        try:
+            while self.running:
+                if not socket.poll(100, zmq.POLLIN):
+                    continue
+                (seq,) = CHAIN_SEQ.unpack(socket.recv())
+                with self.lock:
+                    write = self.pending.pop(seq, None)
+                if write is not None:
+                    self.committed += 1
+                    write.ack()
+        finally:
+            socket.close()
+
+    def register(self, registry, head_endpoint):
+        registry.gauge("replication_queue_depth", "Messages waiting in the replica queue",
+                       function=lambda: len(self.pending), replica=head_endpoint)
+        registry.counter("replication_sent_total", "Messages acked by the replica",
+                         function=lambda: self.committed, replica=head_endpoint)
+        registry.counter("replication_failed_total", "Messages without reply from the replica",
+                         function=lambda: self.failed, replica=head_endpoint)
+        registry.counter("replication_bytes_out_total", "Bytes sent to the replica",
+                         function=lambda: self.bytes_out, replica=head_endpoint)
+
+    def stats(self):
+        return {
+            "pending": len(self.pending),
+            "sent": self.sent,
+            "committed": self.committed,
+            "failed": self.failed,
+            "bytes_out": self.bytes_out,
+        }
+
+    def close(self):
+        self.running = False
+        self.thread.join()
+        self.socket.close()
+
+def chain_node(bind_endpoint, next_endpoint=None, ack_endpoint=None, context=None, verbose=True):
+    # Nodo de la cadena: recibe del anterior y reenvía al siguiente; si es la
+    # cola (sin siguiente) confirma el mensaje a la cabeza.
+    if next_endpoint is None and ack_endpoint is None:
+        raise ValueError("A chain node needs either a next node or an ack endpoint")
+    context = context or zmq.Context.instance()
+    upstream = context.socket(zmq.PULL)
+    upstream.bind(bind_endpoint)
+    downstream = context.socket(zmq.PUSH)
+    downstream.connect(next_endpoint or ack_endpoint)
+    try:
+        while True:
+            message = upstream.recv_multipart()
+            if verbose:
+                (seq,) = CHAIN_SEQ.unpack(message[0])
+                print(f"Replicated seq {seq} ({sum(len(frame) for frame in message[1:])} bytes)")
+            if next_endpoint is not None:
+                downstream.send_multipart(message)
+            else:
+                downstream.send(message[0])
+    finally:
+        upstream.close()
+        downstream.close()
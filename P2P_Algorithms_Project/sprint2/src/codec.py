@@ -0,0 +1,102 @@
+import bz2
+import collections
+import lzma
+import random
+import zlib
+
+# Capa de códecs para Gather y Broadcast. El códec usado viaja en los 3 bits
+# bajos del byte de flags de la cabecera de protocol.py.
+RAW = 0
+ZLIB = 1
+ZLIB_DICT = 2
+LZMA = 3
+BZ2 = 4
+CODEC_MASK = 0x07
+NAMES = {RAW: "raw", ZLIB: "zlib", ZLIB_DICT: "zlib+zdict", LZMA: "lzma", BZ2: "bz2"}
+
+def train_dictionary(samples, size=1024, gram=8):
+    # Diccionario preestablecido para zlib: los fragmentos más frecuentes del
+    # tráfico de ejemplo, con los más frecuentes al final (distancias cortas).
+    # Cargar el diccionario cuesta CPU en cada mensaje, por eso se limita a 1 KB.
+    counts = collections.Counter()
+    for sample in samples:
+        for i in range(0, max(1, len(sample) - gram + 1)):
+            counts[sample[i:i + gram]] += 1
+    selected = []
+    total = 0
+    for fragment, count in counts.most_common():
+        if count < 2 or total + len(fragment) > size:
+            break
+        selected.append(fragment)
+        total += len(fragment)
+    return b"".join(reversed(selected))
+
+def sample_traffic(count=2000, seed=0):
+    # Mensajes representativos de los Sprints 2 y 3
+    rng = random.Random(seed)
+    samples = []
+    for i in range(count):
+        samples.append(f"Data from node {rng.randint(1, 100)}: {rng.randint(0, 9)}".encode())
+        samples.append(f"{rng.uniform(20, 100)},{rng.uniform(10, 100)}".encode())
+    samples.append(b"Hello to all nodes")
+    samples.append(b"Broadcast message")
+    return samples
+
+DEFAULT_ZDICT = train_dictionary(sample_traffic())
+
+class Codec:
+    # Selección por tamaño: por debajo de `threshold` bytes se envía en bruto,
+    # hasta `small_limit` se usa zlib con diccionario y por encima `large_codec`.
+    def __init__(self, threshold=16, small_limit=4096, large_codec=ZLIB, zdict=DEFAULT_ZDICT, level=6):
+        self.threshold = threshold
+        self.small_limit = small_limit
+        self.large_codec = large_codec
+        self.zdict = zdict
+        self.level = level
+
+    def choose(self, size):
+        if size < self.threshold:
+            return RAW
+        if size <= self.small_limit:
+            return ZLIB_DICT
+        return self.large_codec
+
+    def encode(self, payload, codec=None):
+        if codec is None:
+            codec = self.choose(len(payload))
+        if codec == RAW:
+            return RAW, payload
+        if codec == ZLIB:
+            data = zlib.compress(payload, self.level)
+        elif codec == ZLIB_DICT:
+            # Deflate sin cabecera ni checksum: 6 bytes menos por mensaje
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, -15, zdict=self.zdict)
+            data = compressor.compress(payload) + compressor.flush()
+        elif codec == LZMA:
+            data = lzma.compress(payload, format=lzma.FORMAT_RAW, filters=[{"id": lzma.FILTER_LZMA2, "preset": self.level}])
+        elif codec == BZ2:
+            data = bz2.compress(payload, 9)
+        else:
+            raise ValueError(f"Unknown codec: {codec}")
+        # Si comprimir no reduce el tamaño, se envía en bruto
+        if len(data) >= len(payload):
+            return RAW, payload
+        return codec, data
+
+    def decode(self, codec, data):
+        # data puede ser bytes o un memoryview sobre el frame recibido
+        # (zerocopy.py); RAW lo devuelve tal cual, sin copiarlo
+        if codec == RAW:
+            return data
+        if codec == ZLIB:
+            return zlib.decompress(data)
+        if codec == ZLIB_DICT:
+            decompressor = zlib.decompressobj(-15, zdict=self.zdict)
+            return decompressor.decompress(data) + decompressor.flush()
+        if codec == LZMA:
+            return lzma.decompress(data, format=lzma.FORMAT_RAW, filters=[{"id": lzma.FILTER_LZMA2}])
+        if codec == BZ2:
+            return bz2.decompress(data)
+        raise ValueError(f"Unknown codec: {codec}")
+
+DEFAULT_CODEC = Codec()
@@ -0,0 +1,150 @@
+import argparse
+import multiprocessing
+import os
+import signal
+import tempfile
+import threading
+import zmq
+from batching import GatherStats, decode_batch
+from registry import REGISTRY, serve_metrics
+from transport import service_endpoint
+from wal import WriteAheadLog
+from zerocopy import recv_frames
+
+# Gather en varios núcleos: el broker reparte los mensajes entre N procesos
+# trabajadores y cada uno descomprime, decodifica y guarda sus lotes.
+#   clientes REQ -> ROUTER (frontend) -> DEALER (backend) -> trabajadores REP
+# El ROUTER antepone la identidad del cliente y el DEALER la conserva, así la
+# respuesta de cada trabajador vuelve al cliente correcto; el DEALER reparte
+# en turno rotatorio. El proxy de ZeroMQ mueve los mensajes sin pasar por Python.
+
+STOP_SIGNALS = {signal.SIGINT, signal.SIGTERM}
+
+def default_backend():
+    # Un socket ipc por broker: varios brokers pueden convivir en la misma máquina
+    return f"ipc://{os.path.join(tempfile.gettempdir(), f'p2p-gather-workers-{os.getpid()}.sock')}"
+
+def gather_worker(worker_id, backend, verbose=False, metrics_port=None, wal_dir=None, zero_copy=False,
+                  timeout=2.0):
+    signal.pthread_sigmask(signal.SIG_UNBLOCK, STOP_SIGNALS)
+    context = zmq.Context()
+    socket = context.socket(zmq.REP)
+    socket.connect(backend)
+    stats = GatherStats(f"worker{worker_id}")
+    # El WAL admite un solo escritor: un directorio por trabajador
+    wal = WriteAheadLog(os.path.join(wal_dir, f"worker-{worker_id}")) if wal_dir else None
+    if metrics_port:
+        serve_metrics(metrics_port)
+    try:
+        while True:
+            frames = recv_frames(socket, copy=not zero_copy)
+            try:
+                _, records = decode_batch(frames)
+            except ValueError as e:
+                print(f"Worker {worker_id}: error decoding batch: {e}")
+                stats.errors.inc()
+                socket.send_string("NACK decode")
+                continue
+            stats.received(frames, records)
+            if verbose:
+                for record in records:
+                    print(f"Worker {worker_id} received data: {record.decode()}")
+            if wal is not None and records:
+                last_offset = wal.append_batch(records) + len(records) - 1
+                if not wal.wait_durable(last_offset, timeout):
+                    socket.send_string("NACK wal")
+                    continue
+            socket.send_string("ACK")
+            stats.messages_out.inc()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        socket.close()
+        if wal is not None:
+            wal.close()
+        context.term()
+
+def start_workers(count, backend, **options):
+    # Los trabajadores se crean antes que el contexto del broker: tras fork()
+    # cada proceso abre su propio contexto de ZeroMQ
+    metrics_port = options.pop("metrics_port", None)
+    workers = []
+    for worker_id in range(count):
+        port = metrics_port + 1 + worker_id if metrics_port else None
+        worker = multiprocessing.Process(target=gather_worker, args=(worker_id, backend),
+                                         kwargs=dict(options, metrics_port=port), daemon=True)
+        worker.start()
+        workers.append(worker)
+    return workers
+
+def gather_broker(workers=None, frontend="tcp://*:5556", backend=None, metrics_port=None, **options):
+    # metrics_port: el broker exporta en ese puerto y el trabajador i en metrics_port + 1 + i
+    workers = workers or os.cpu_count()
+    backend = backend or default_backend()
+    # Las señales quedan bloqueadas hasta instalar los manejadores: una que
+    # llegue mientras se crean los trabajadores se atiende después, y los
+    # trabajadores (que heredan la máscara) la desbloquean al arrancar
+    signal.pthread_sigmask(signal.SIG_BLOCK, STOP_SIGNALS)
+    stopped = threading.Event()
+    try:
+        processes = start_workers(workers, backend, metrics_port=metrics_port, **options)
+        for signum in STOP_SIGNALS:
+            signal.signal(signum, lambda *_: stopped.set())
+    finally:
+        signal.pthread_sigmask(signal.SIG_UNBLOCK, STOP_SIGNALS)
+    context = zmq.Context()
+    # Al parar, las respuestas que no se hayan entregado se descartan
+    context.setsockopt(zmq.LINGER, 0)
+    frontend_socket = context.socket(zmq.ROUTER)
+    backend_socket = context.socket(zmq.DEALER)
+    # El proxy corre en un hilo y se detiene con TERMINATE por el socket de
+    # control. El hilo principal solo espera a SIGINT/SIGTERM: una señal que
+    # llega a un hilo de ZeroMQ no interrumpe zmq.proxy(), pero sí se atiende
+    # en la siguiente vuelta de stopped.wait()
+    control = context.socket(zmq.PAIR)
+    control.bind(f"inproc://gather-broker-control-{os.getpid()}")
+    steer = context.socket(zmq.PAIR)
+    steer.connect(f"inproc://gather-broker-control-{os.getpid()}")
+    proxy = threading.Thread(target=zmq.proxy_steerable, args=(frontend_socket, backend_socket, None, steer),
+                             daemon=True)
+    try:
+        frontend_socket.bind(frontend)
+        backend_socket.bind(backend)
+        REGISTRY.gauge("gather_broker_workers", "Live gather worker processes",
+                       function=lambda: sum(process.is_alive() for process in processes))
+        if metrics_port:
+            serve_metrics(metrics_port)
+        proxy.start()
+        print(f"Gather broker on {frontend} with {workers} workers ({backend})")
+        while not stopped.wait(0.1):
+            pass
+    finally:
+        if proxy.is_alive():
+            control.send(b"TERMINATE")
+            proxy.join()
+        for socket in (frontend_socket, backend_socket, control, steer):
+            socket.close()
+        context.term()
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join()
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--workers", "-n", type=int, default=os.cpu_count(),
+                            help="worker processes (default: one per core)")
+    arg_parser.add_argument("--transport", choices=["tcp", "ipc"], default="tcp",
+                            help="ipc for clients on the same host")
+    arg_parser.add_argument("--endpoint", help="frontend endpoint to bind, overrides --transport")
+    arg_parser.add_argument("--backend", help="endpoint between broker and workers (default: ipc in the temp dir)")
+    arg_parser.add_argument("--verbose", action="store_true", help="print every record")
+    arg_parser.add_argument("--wal", help="write-ahead log directory, one subdirectory per worker")
+    arg_parser.add_argument("--zero-copy", action="store_true",
+                            help="receive frames as memoryviews without copying them")
+    arg_parser.add_argument("--metrics-port", type=int,
+                            help="broker metrics port; worker i uses metrics-port + 1 + i")
+    args = arg_parser.parse_args()
+    gather_broker(args.workers, args.endpoint or service_endpoint("gather", args.transport, bind=True),
+                  args.backend, args.metrics_port, verbose=args.verbose, wal_dir=args.wal,
+                  zero_copy=args.zero_copy)
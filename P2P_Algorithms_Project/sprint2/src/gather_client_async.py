@@ -0,0 +1,88 @@
+import argparse
+import time
+import zmq
+from batching import BATCH_ACK, encode_batch
+from transport import service_endpoint
+
+class PipelinedGatherClient:
+    # Control de flujo por créditos: el cliente dispone de `window` créditos y
+    # cada mensaje enviado consume uno; el ACK con su número de secuencia lo
+    # devuelve. Sin créditos, el cliente espera ACKs antes de seguir enviando.
+    # Un NACK también devuelve el crédito (el lote se cuenta en self.nacks), y
+    # si no llega ninguna respuesta en `timeout` segundos se lanza TimeoutError.
+    def __init__(self, socket, node_id, window=32, on_ack=None, timeout=5.0):
+        self.socket = socket
+        self.node_id = node_id
+        self.window = window
+        self.on_ack = on_ack
+        self.timeout_ms = None if timeout is None else int(timeout * 1000)
+        self.in_flight = {}
+        self.seq = 0
+        self.nacks = 0
+
+    def send(self, records):
+        while len(self.in_flight) >= self.window:
+            self.recv_ack()
+        seq = self.seq
+        self.seq = (self.seq + 1) & 0xFFFFFFFF
+        self.socket.send_multipart(encode_batch(self.node_id, seq, records))
+        self.in_flight[seq] = time.perf_counter()
+        # Recoger los ACKs que ya hayan llegado sin bloquear
+        while self.in_flight and self.socket.poll(0, zmq.POLLIN):
+            self.recv_ack()
+        return seq
+
+    def recv_ack(self):
+        # (seq, rtt) de la respuesta recibida; rtt es None en un NACK
+        if not self.socket.poll(self.timeout_ms, zmq.POLLIN):
+            raise TimeoutError(f"No reply for {len(self.in_flight)} batches in flight")
+        frames = self.socket.recv_multipart()
+        if len(frames) > 1:
+            # NACK sin número de secuencia: el lote más antiguo en vuelo
+            seq = BATCH_ACK.unpack(frames[0])[0] if frames[0] else next(iter(self.in_flight), None)
+            self.in_flight.pop(seq, None)
+            self.nacks += 1
+            print(f"Batch {seq} rejected: {frames[1].decode()}")
+            return seq, None
+        (seq,) = BATCH_ACK.unpack(frames[0])
+        sent = self.in_flight.pop(seq, None)
+        if sent is None:
+            print(f"Unexpected ACK for seq {seq}")
+            return seq, None
+        rtt = time.perf_counter() - sent
+        if self.on_ack is not None:
+            self.on_ack(seq, rtt)
+        return seq, rtt
+
+    def drain(self):
+        while self.in_flight:
+            self.recv_ack()
+
+def gather_client_async(node_id, window=32, count=10, port=5559, server=None):
+    context = zmq.Context()
+    socket = context.socket(zmq.DEALER)
+    socket.connect(server or f"tcp://localhost:{port}")
+
+    def on_ack(seq, rtt):
+        print(f"Received ACK {seq} ({rtt * 1000:.3f} ms)")
+
+    client = PipelinedGatherClient(socket, node_id, window, on_ack=on_ack)
+    for i in range(count):
+        client.send([f"Data from node {node_id}: {i}".encode()])
+    client.drain()
+    socket.close()
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("node_id", type=int)
+    arg_parser.add_argument("--window", type=int, default=32)
+    arg_parser.add_argument("--count", type=int, default=10)
+    arg_parser.add_argument("--port", type=int, default=5559)
+    arg_parser.add_argument("--transport", choices=["tcp", "ipc"], default="tcp",
+                            help="ipc for a server on the same host (ignores --port)")
+    arg_parser.add_argument("--server", help="server endpoint, overrides --transport and --port")
+    args = arg_parser.parse_args()
+    server = args.server
+    if server is None and args.transport != "tcp":
+        server = service_endpoint("gather-async", args.transport)
+    gather_client_async(args.node_id, args.window, args.count, args.port, server)
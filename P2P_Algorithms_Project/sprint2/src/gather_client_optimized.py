@@ -1,18 +1,36 @@
-import zlib
+import argparse
 import zmq
+from batching import BatchingGatherClient
+from transport import service_endpoint
 
-def gather_client(node_id):
+def gather_client(node_id, batch_size=16, max_delay=0.05, server="tcp://localhost:5556", interval=0.0):
     context = zmq.Context()
     socket = context.socket(zmq.REQ)
-    socket.connect("tcp://localhost:5556")
+    socket.connect(server)
+    client = BatchingGatherClient(socket, node_id, batch_size, max_delay)
     for i in range(10):
         message = f"Data from node {node_id}: {i}"
-        compressed_message = zlib.compress(message.encode())
-        socket.send(compressed_message)
-        reply = socket.recv_string()
+        reply = client.send(message)
+        if reply is not None:
+            print(f"Received reply: {reply}")
+        # Entre registros se espera con poll(): un lote parcial sale al vencer max_delay
+        reply = client.poll(interval)
+        if reply is not None:
+            print(f"Received reply: {reply}")
+    reply = client.flush()
+    if reply is not None:
         print(f"Received reply: {reply}")
 
 if __name__ == "__main__":
-    import sys
-    node_id = int(sys.argv[1])
-    gather_client(node_id)
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("node_id", type=int)
+    arg_parser.add_argument("--batch-size", type=int, default=16)
+    arg_parser.add_argument("--max-delay", type=float, default=0.05)
+    arg_parser.add_argument("--interval", type=float, default=0.0,
+                            help="seconds between records")
+    arg_parser.add_argument("--transport", choices=["tcp", "ipc"], default="tcp",
+                            help="ipc for a server on the same host")
+    arg_parser.add_argument("--server", help="server endpoint, overrides --transport")
+    args = arg_parser.parse_args()
+    gather_client(args.node_id, args.batch_size, args.max_delay,
+                  args.server or service_endpoint("gather", args.transport), args.interval)
@@ -1,31 +1,42 @@
-import zlib
+import argparse
 import zmq
-import sys
-import threading
+from batching import BatchingGatherClient
+from replication import ReplicationPool
+from transport import service_endpoint
 
-def replicate_data(data, replicas):
-    for replica in replicas:
-        context = zmq.Context()
-        socket = context.socket(zmq.REQ)
-        socket.connect(f"tcp://{replica}")
-        compressed_data = zlib.compress(data.encode())
-        socket.send(compressed_data)
-        reply = socket.recv_string()
-        print(f"Replication reply: {reply}")
-
-def gather_client_with_replication(node_id, replicas):
+def gather_client_with_replication(node_id, replicas, batch_size=16, max_delay=0.05,
+                                   server="tcp://localhost:5556", interval=0.0):
     context = zmq.Context()
     socket = context.socket(zmq.REQ)
-    socket.connect("tcp://localhost:5556")
+    socket.connect(server)
+    pool = ReplicationPool(replicas, context)
+
+    def on_flush(frames, reply):
+        print(f"Received reply: {reply}")
+        pool.replicate(frames)
+
+    client = BatchingGatherClient(socket, node_id, batch_size, max_delay, on_flush=on_flush)
     for i in range(10):
         message = f"Data from node {node_id}: {i}"
-        compressed_message = zlib.compress(message.encode())
-        socket.send(compressed_message)
-        reply = socket.recv_string()
-        print(f"Received reply: {reply}")
-        threading.Thread(target=replicate_data, args=(message, replicas)).start()
+        client.send(message)
+        # Entre registros se espera con poll(): un lote parcial sale al vencer max_delay
+        client.poll(interval)
+    client.flush()
+    # Esperar a que las réplicas reciban los lotes pendientes
+    pool.close()
+    print(f"Replication stats: {pool.stats()}")
 
 if __name__ == "__main__":
-    node_id = int(sys.argv[1])
-    replicas = sys.argv[2:]
-    gather_client_with_replication(node_id, replicas)
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("node_id", type=int)
+    arg_parser.add_argument("replicas", nargs="*")
+    arg_parser.add_argument("--batch-size", type=int, default=16)
+    arg_parser.add_argument("--max-delay", type=float, default=0.05)
+    arg_parser.add_argument("--interval", type=float, default=0.0,
+                            help="seconds between records")
+    arg_parser.add_argument("--transport", choices=["tcp", "ipc"], default="tcp",
+                            help="ipc for a server on the same host")
+    arg_parser.add_argument("--server", help="server endpoint, overrides --transport")
+    args = arg_parser.parse_args()
+    gather_client_with_replication(args.node_id, args.replicas, args.batch_size, args.max_delay,
+                                   args.server or service_endpoint("gather", args.transport), args.interval)
@@ -0,0 +1,68 @@
+import argparse
+import zmq
+from batching import BATCH_ACK, GatherStats, decode_batch
+from protocol import decode_frame
+from registry import serve_metrics
+from transport import service_endpoint
+
+# Gather asíncrono: un socket ROUTER atiende a todos los clientes DEALER sin
+# esperar un viaje de ida y vuelta por mensaje. Cada lote se confirma con su
+# número de secuencia, lo que devuelve un crédito al cliente. Un lote que no
+# se puede procesar también se responde, para no perder el crédito:
+#   ACK:  [seq (I)]
+#   NACK: [seq (I), motivo]  o  [b"", motivo] si ni la cabecera se puede leer;
+#         como las respuestas a un cliente salen en orden, es su lote más antiguo
+def batch_seq(frames):
+    # Número de secuencia de un lote cuyo bloque no se ha podido decodificar
+    if len(frames) < 2:
+        return b""
+    try:
+        return BATCH_ACK.pack(decode_frame(frames[0]).seq)
+    except ValueError:
+        return b""
+
+def gather_server_async(port=5559, context=None, verbose=True, metrics_port=None, bind_endpoint=None):
+    context = context or zmq.Context.instance()
+    socket = context.socket(zmq.ROUTER)
+    socket.bind(bind_endpoint or f"tcp://*:{port}")
+    stats = GatherStats("async")
+    if metrics_port:
+        serve_metrics(metrics_port)
+    try:
+        while True:
+            identity, *frames = socket.recv_multipart()
+            try:
+                header, records = decode_batch(frames)
+            except ValueError as e:
+                print(f"Error decoding batch: {e}")
+                stats.errors.inc()
+                socket.send_multipart([identity, batch_seq(frames), b"NACK decode"])
+                continue
+            if header is None:
+                print("Discarding message without sequence header")
+                stats.errors.inc()
+                socket.send_multipart([identity, b"", b"NACK header"])
+                continue
+            stats.received(frames, records)
+            if verbose:
+                for record in records:
+                    print(f"Received data from node {header.node_id}: {record.decode()}")
+            socket.send_multipart([identity, BATCH_ACK.pack(header.seq)])
+            stats.messages_out.inc()
+    finally:
+        socket.close()
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--port", type=int, default=5559)
+    arg_parser.add_argument("--quiet", action="store_true")
+    arg_parser.add_argument("--metrics-port", type=int)
+    arg_parser.add_argument("--transport", choices=["tcp", "ipc"], default="tcp",
+                            help="ipc for clients on the same host (ignores --port)")
+    arg_parser.add_argument("--endpoint", help="endpoint to bind, overrides --transport and --port")
+    args = arg_parser.parse_args()
+    bind_endpoint = args.endpoint
+    if bind_endpoint is None and args.transport != "tcp":
+        bind_endpoint = service_endpoint("gather-async", args.transport, bind=True)
+    gather_server_async(args.port, verbose=not args.quiet, metrics_port=args.metrics_port,
+                        bind_endpoint=bind_endpoint)
@@ -1,15 +1,35 @@
-import zlib
+import argparse
 import zmq
+from batching import GatherStats, decode_batch
+from registry import serve_metrics
+from transport import service_endpoint
+from zerocopy import recv_frames
 
-def gather_server():
+def gather_server(metrics_port=None, zero_copy=False, bind_endpoint="tcp://*:5556"):
     context = zmq.Context()
     socket = context.socket(zmq.REP)
-    socket.bind("tcp://*:5556")
+    socket.bind(bind_endpoint)
+    stats = GatherStats("optimized")
+    if metrics_port:
+        serve_metrics(metrics_port)
     while True:
-        compressed_message = socket.recv()
-        message = zlib.decompress(compressed_message).decode()
-        print(f"Received data: {message}")
+        frames = recv_frames(socket, copy=not zero_copy)
+        _, records = decode_batch(frames)
+        stats.received(frames, records)
+        for record in records:
+            print(f"Received data: {record.decode()}")
+        # Un solo ACK por lote
         socket.send_string("ACK")
+        stats.messages_out.inc()
 
 if __name__ == "__main__":
-    gather_server()
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--metrics-port", type=int)
+    arg_parser.add_argument("--zero-copy", action="store_true",
+                            help="receive frames as memoryviews without copying them")
+    arg_parser.add_argument("--transport", choices=["tcp", "ipc"], default="tcp",
+                            help="ipc for clients on the same host")
+    arg_parser.add_argument("--endpoint", help="endpoint to bind, overrides --transport")
+    args = arg_parser.parse_args()
+    gather_server(args.metrics_port, args.zero_copy,
+                  args.endpoint or service_endpoint("gather", args.transport, bind=True))
@@ -1,35 +1,156 @@
-import zlib
+import argparse
+import collections
 import zmq
-import threading
-import sys
+import time
+from antientropy import OFFSET, REPLICATE, AntiEntropy
+from batching import GatherStats, decode_batch
+from registry import REGISTRY, serve_metrics
+from replication import OVERFLOW_POLICIES, ReplicationPool
+from chain import ChainReplicator
+from tracing import StageTracer, format_stages
+from transport import service_endpoint
+from wal import WriteAheadLog
+from zerocopy import recv_frames
 
-def replicate_data(data, replicas):
-    for replica in replicas:
-        context = zmq.Context()
-        socket = context.socket(zmq.REQ)
-        try:
-            socket.connect(f"tcp://{replica}")
-            compressed_data = zlib.compress(data.encode())
-            socket.send(compressed_data)
-            reply = socket.recv_string()
-            print(f"Replication reply: {reply}")
-        finally:
-            socket.close()
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
 
-def gather_server_with_replication(replicas):
+def gather_server_with_replication(replicas, write_quorum=0, timeout=2.0, report_interval=10.0,
+                                   mode="fanout", chain_ack="tcp://*:5565", metrics_port=None, trace_every=16,
+                                   queue_size=1000, overflow="drop-newest", spill_dir=None,
+                                   wal_dir=None, wal_sync_interval=0.0, wal_segment_bytes=64 * 1024 * 1024,
+                                   anti_entropy_interval=10.0, zero_copy=False, bind_endpoint="tcp://*:5556"):
+    # write_quorum = W: el cliente recibe el ACK cuando W de las N réplicas han
+    # confirmado. Con W = 0 se responde sin esperar a ninguna réplica.
+    # En modo cadena solo se conecta al primer nodo y W = 1 espera a la cola.
+    # Con wal_dir los registros se anexan al WAL y el ACK espera a su fsync;
+    # en modo abanico cada lote lleva además su offset y un hilo de
+    # anti-entropía resincroniza las réplicas con el WAL (antientropy.py).
+    targets = replicas[:1] if mode == "chain" else replicas
+    if write_quorum > len(targets):
+        raise ValueError(f"Write quorum {write_quorum} exceeds {len(targets)} replicas in {mode} mode")
     context = zmq.Context()
     socket = context.socket(zmq.REP)
-    socket.bind("tcp://*:5556")
+    socket.bind(bind_endpoint)
+    if mode == "chain" and replicas:
+        head = replicas[0] if "://" in replicas[0] else f"tcp://{replicas[0]}"
+        pool = ChainReplicator(head, chain_ack, context)
+    else:
+        pool = ReplicationPool(replicas, context, queue_size, timeout, overflow=overflow, spill_dir=spill_dir)
+    write_latencies = collections.deque(maxlen=10000)
+    stats = GatherStats("replication")
+    write_seconds = REGISTRY.histogram("gather_write_seconds", "Receive to reply time, including the quorum wait",
+                                       server="replication")
+    nacks = REGISTRY.counter("gather_quorum_nacks_total", "Writes that missed the write quorum",
+                             server="replication")
+    wal = wal_nacks = anti_entropy = None
+    if wal_dir:
+        wal = WriteAheadLog(wal_dir, wal_segment_bytes, wal_sync_interval)
+        wal_nacks = REGISTRY.counter("gather_wal_nacks_total", "Writes not made durable in time")
+        REGISTRY.counter("wal_syncs_total", "Group commits (fsync)", function=lambda: wal.syncs)
+        REGISTRY.gauge("wal_next_offset", "Offset of the next WAL entry", function=lambda: wal.next_offset)
+        REGISTRY.gauge("wal_durable_offset", "Entries below this offset are on disk",
+                       function=lambda: wal.durable_offset)
+        REGISTRY.gauge("wal_segments", "WAL segment files", function=lambda: len(wal.segments))
+        if mode == "fanout" and replicas and anti_entropy_interval > 0:
+            anti_entropy = AntiEntropy(wal, replicas, context, anti_entropy_interval, timeout).start()
+    tracer = StageTracer(("recv", "decode", "wal", "print", "replicate", "quorum", "durable", "ack"),
+                         sample_every=trace_every, server="replication")
+    if metrics_port:
+        serve_metrics(metrics_port)
+    next_report = time.monotonic() + report_interval
     try:
         while True:
-            compressed_message = socket.recv()
-            message = zlib.decompress(compressed_message).decode()
-            print(f"Received data: {message}")
-            threading.Thread(target=replicate_data, args=(message, replicas)).start()
-            socket.send_string("ACK")
+            tracer.begin(socket)
+            frames = recv_frames(socket, copy=not zero_copy)
+            tracer.mark("recv")
+            start = time.perf_counter()
+            _, records = decode_batch(frames)
+            tracer.mark("decode")
+            stats.received(frames, records)
+            last_offset = None
+            if wal is not None and records:
+                first_offset = wal.append_batch(records)
+                last_offset = first_offset + len(records) - 1
+                if mode == "fanout":
+                    frames = [REPLICATE, OFFSET.pack(first_offset)] + frames
+                tracer.mark("wal")
+            for record in records:
+                print(f"Received data: {record.decode()}")
+            tracer.mark("print")
+            # Los lotes se replican tal como llegaron, sin recomprimir
+            write = pool.replicate(frames)
+            tracer.mark("replicate")
+            acked = write.wait(write_quorum, timeout)
+            tracer.mark("quorum")
+            # El fsync del WAL se solapa con la espera de las réplicas
+            durable = last_offset is None or wal.wait_durable(last_offset, timeout)
+            tracer.mark("durable")
+            if acked and durable:
+                socket.send_string("ACK")
+            elif not acked:
+                socket.send_string(f"NACK quorum {write.acks}/{write_quorum}")
+                nacks.inc()
+            else:
+                socket.send_string("NACK wal")
+                wal_nacks.inc()
+            tracer.mark("ack")
+            tracer.end()
+            stats.messages_out.inc()
+            write_latencies.append(time.perf_counter() - start)
+            write_seconds.observe(write_latencies[-1])
+            if time.monotonic() >= next_report:
+                if replicas:
+                    print(f"Replication stats: {pool.stats()}")
+                    print(f"Write latency W={write_quorum}: "
+                          f"p50={percentile(write_latencies, 0.5) * 1000:.3f} ms "
+                          f"p99={percentile(write_latencies, 0.99) * 1000:.3f} ms")
+                if anti_entropy is not None:
+                    print(f"Anti-entropy: {anti_entropy.stats()}")
+                if tracer.sampled:
+                    print(f"Stages (1/{trace_every} sampled): {format_stages(tracer.snapshot())}")
+                next_report = time.monotonic() + report_interval
     finally:
         socket.close()
+        if anti_entropy is not None:
+            anti_entropy.close()
+        if wal is not None:
+            wal.close()
 
 if __name__ == "__main__":
-    replicas = sys.argv[1:]
-    gather_server_with_replication(replicas)
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("replicas", nargs="*")
+    arg_parser.add_argument("--write-quorum", "-w", type=int, default=0)
+    arg_parser.add_argument("--timeout", type=float, default=2.0)
+    arg_parser.add_argument("--mode", choices=["fanout", "chain"], default="fanout")
+    arg_parser.add_argument("--chain-ack", help="endpoint where the chain tail acks (default: per --transport)")
+    arg_parser.add_argument("--queue-size", type=int, default=1000, help="messages queued per replica")
+    arg_parser.add_argument("--overflow", choices=OVERFLOW_POLICIES, default="drop-newest",
+                            help="what to do when a replica queue is full")
+    arg_parser.add_argument("--spill-dir", help="directory for the spill files (default: system temp)")
+    arg_parser.add_argument("--wal", help="write-ahead log directory; acks wait for the fsync")
+    arg_parser.add_argument("--wal-sync-interval", type=float, default=0.0,
+                            help="minimum seconds between group commits (0 = as soon as the last fsync ends)")
+    arg_parser.add_argument("--wal-segment-mb", type=int, default=64)
+    arg_parser.add_argument("--anti-entropy-interval", type=float, default=10.0,
+                            help="seconds between replica resyncs against the wal (0 disables)")
+    arg_parser.add_argument("--zero-copy", action="store_true",
+                            help="receive frames as memoryviews without copying them")
+    arg_parser.add_argument("--transport", choices=["tcp", "ipc"], default="tcp",
+                            help="ipc for clients and replicas on the same host")
+    arg_parser.add_argument("--endpoint", help="endpoint to bind, overrides --transport")
+    arg_parser.add_argument("--metrics-port", type=int)
+    arg_parser.add_argument("--trace-every", type=int, default=16,
+                            help="time the stages of 1 in N messages (0 disables)")
+    args = arg_parser.parse_args()
+    gather_server_with_replication(args.replicas, args.write_quorum, args.timeout,
+                                   mode=args.mode,
+                                   chain_ack=args.chain_ack or service_endpoint("chain-ack", args.transport, bind=True),
+                                   metrics_port=args.metrics_port,
+                                   trace_every=args.trace_every, queue_size=args.queue_size,
+                                   overflow=args.overflow, spill_dir=args.spill_dir, wal_dir=args.wal,
+                                   wal_sync_interval=args.wal_sync_interval,
+                                   wal_segment_bytes=args.wal_segment_mb * 1024 * 1024,
+                                   anti_entropy_interval=args.anti_entropy_interval, zero_copy=args.zero_copy,
+                                   bind_endpoint=args.endpoint or service_endpoint("gather", args.transport, bind=True))
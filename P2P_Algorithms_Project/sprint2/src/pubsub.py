@@ -0,0 +1,88 @@
+import sys
+import os
+import collections
+import zmq
+from codec import CODEC_MASK, DEFAULT_CODEC
+from registry import REGISTRY, CompressionStats
+
+# Reutilizar el formato binario de mensajes del Sprint 1
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'sprint1', 'src')))
+
+from protocol import encode_frame, decode_frame
+
+# Broadcast por tópicos: [tópico, cabecera, payload codificado].
+# La cabecera (protocol.py) lleva la secuencia y el códec en los flags; el
+# payload codificado se guarda en caché y se reenvía sin volver a comprimir.
+
+class TopicPublisher:
+    # Publica sobre un socket XPUB y lleva la cuenta de los prefijos suscritos
+    # a partir de los mensajes de suscripción; los tópicos sin suscriptores
+    # no se codifican ni se envían.
+    def __init__(self, socket, codec=DEFAULT_CODEC, node_id=0, cache_size=256, registry=REGISTRY):
+        self.socket = socket
+        self.codec = codec
+        self.node_id = node_id
+        self.cache_size = cache_size
+        self.subscriptions = set()
+        self.cache = collections.OrderedDict()
+        self.seq = 0
+        self.sent = 0
+        self.skipped = 0
+        self.cache_hits = 0
+        self.compression = CompressionStats("broadcast", registry)
+        self.bytes_out = registry.counter("broadcast_bytes_out_total", "Bytes published")
+        registry.counter("broadcast_messages_out_total", "Messages published",
+                         function=lambda: self.sent)
+        registry.counter("broadcast_skipped_total", "Messages not sent for lack of subscribers",
+                         function=lambda: self.skipped)
+        registry.counter("broadcast_cache_hits_total", "Payloads reused from the encoding cache",
+                         function=lambda: self.cache_hits)
+        registry.gauge("broadcast_subscriptions", "Subscribed topic prefixes",
+                       function=lambda: len(self.subscriptions))
+
+    def poll_subscriptions(self):
+        while self.socket.poll(0, zmq.POLLIN):
+            event = self.socket.recv()
+            if event[:1] == b"\x01":
+                self.subscriptions.add(event[1:])
+            elif event[:1] == b"\x00":
+                self.subscriptions.discard(event[1:])
+
+    def has_subscribers(self, topic):
+        return any(topic.startswith(prefix) for prefix in self.subscriptions)
+
+    def encoded(self, topic, message):
+        key = (topic, message)
+        entry = self.cache.get(key)
+        if entry is not None:
+            self.cache.move_to_end(key)
+            self.cache_hits += 1
+            return entry
+        entry = self.codec.encode(message)
+        self.cache[key] = entry
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return entry
+
+    def publish(self, topic, message):
+        if isinstance(topic, str):
+            topic = topic.encode()
+        if isinstance(message, str):
+            message = message.encode()
+        self.poll_subscriptions()
+        if not self.has_subscribers(topic):
+            self.skipped += 1
+            return False
+        codec_id, payload = self.encoded(topic, message)
+        header = encode_frame(self.node_id, self.seq, flags=codec_id)
+        self.socket.send_multipart([topic, header, payload])
+        self.compression.observe(len(message), len(payload))
+        self.bytes_out.inc(len(topic) + len(header) + len(payload))
+        self.seq += 1
+        self.sent += 1
+        return True
+
+def decode_broadcast(frames, codec=DEFAULT_CODEC):
+    topic, header, payload = frames[:3]
+    frame = decode_frame(header)
+    return topic, frame, codec.decode(frame.flags & CODEC_MASK, payload)
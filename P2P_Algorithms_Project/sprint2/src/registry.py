@@ -0,0 +1,161 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Registro de métricas propias de los procesos (contadores, gauges e
+# histogramas) exportable en el formato de texto de Prometheus. Los contadores
+# y gauges pueden leer su valor de una función, así los componentes que ya
+# llevan la cuenta (ReplicaLink.sent, TopicPublisher.skipped...) no duplican
+# trabajo en la ruta caliente.
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{escape(value)}"' for key, value in pairs) + "}"
+
+def format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+class Counter:
+    def __init__(self, function=None):
+        self.value = 0
+        self.function = function
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self.lock:
+            self.value += amount
+
+    def get(self):
+        return self.function() if self.function is not None else self.value
+
+    def samples(self, name, labels):
+        return [f"{name}{format_labels(labels)} {format_value(self.get())}"]
+
+class Gauge(Counter):
+    def set(self, value):
+        self.value = value
+
+    def dec(self, amount=1):
+        self.inc(-amount)
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, value):
+        index = 0
+        while index < len(self.buckets) and value > self.buckets[index]:
+            index += 1
+        with self.lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def samples(self, name, labels):
+        with self.lock:
+            counts = list(self.counts)
+            total = self.sum
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{format_labels(labels, [('le', format_value(bound))])} {cumulative}")
+        lines.append(f"{name}_sum{format_labels(labels)} {format_value(total)}")
+        lines.append(f"{name}_count{format_labels(labels)} {cumulative}")
+        return lines
+
+class Registry:
+    def __init__(self):
+        self.families = {}
+        self.lock = threading.Lock()
+
+    def _get(self, kind, name, help, labels, factory):
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            family = self.families.get(name)
+            if family is None:
+                family = self.families[name] = {"type": kind, "help": help, "children": {}}
+            elif family["type"] != kind:
+                raise ValueError(f"Metric {name} already registered as {family['type']}")
+            metric = family["children"].get(key)
+            if metric is None:
+                metric = family["children"][key] = factory()
+            return metric
+
+    def counter(self, name, help="", function=None, **labels):
+        metric = self._get("counter", name, help, labels, Counter)
+        if function is not None:
+            metric.function = function
+        return metric
+
+    def gauge(self, name, help="", function=None, **labels):
+        metric = self._get("gauge", name, help, labels, Gauge)
+        if function is not None:
+            metric.function = function
+        return metric
+
+    def histogram(self, name, help="", buckets=DEFAULT_BUCKETS, **labels):
+        return self._get("histogram", name, help, labels, lambda: Histogram(buckets))
+
+    def exposition(self):
+        with self.lock:
+            families = [(name, dict(family, children=dict(family["children"])))
+                        for name, family in sorted(self.families.items())]
+        lines = []
+        for name, family in families:
+            lines.append(f"# HELP {name} {family['help']}")
+            lines.append(f"# TYPE {name} {family['type']}")
+            for labels, metric in sorted(family["children"].items()):
+                lines.extend(metric.samples(name, labels))
+        return "\n".join(lines) + "\n"
+
+# Registro por defecto del proceso
+REGISTRY = Registry()
+
+class CompressionStats:
+    # Bytes antes y después de comprimir y la razón entre ambos
+    def __init__(self, prefix, registry=REGISTRY, **labels):
+        self.raw = registry.counter(f"{prefix}_bytes_raw_total", "Bytes before compression", **labels)
+        self.encoded = registry.counter(f"{prefix}_bytes_encoded_total", "Bytes after compression", **labels)
+        registry.gauge(f"{prefix}_compression_ratio", "Raw bytes / encoded bytes",
+                       function=self.ratio, **labels)
+
+    def observe(self, raw_bytes, encoded_bytes):
+        self.raw.inc(raw_bytes)
+        self.encoded.inc(encoded_bytes)
+
+    def ratio(self):
+        encoded = self.encoded.get()
+        return self.raw.get() / encoded if encoded else 0.0
+
+def serve_metrics(port=9100, registry=REGISTRY, host=""):
+    # Endpoint HTTP mínimo (GET /metrics) para los procesos que no usan Flask
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.exposition().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
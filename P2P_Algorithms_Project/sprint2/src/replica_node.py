@@ -0,0 +1,33 @@
+import argparse
+import zmq
+from antientropy import ReplicaStore
+from chain import chain_node
+
+def fanout_replica(bind_endpoint, verbose=True, store=None):
+    # Réplica para la replicación en abanico: guarda los lotes que llegan con
+    # offset del WAL, responde a la anti-entropía y confirma cada mensaje
+    context = zmq.Context.instance()
+    socket = context.socket(zmq.REP)
+    socket.bind(bind_endpoint)
+    store = store if store is not None else ReplicaStore()
+    try:
+        while True:
+            frames = socket.recv_multipart()
+            if verbose:
+                print(f"Replicated {sum(len(frame) for frame in frames)} bytes")
+            socket.send_multipart(store.handle(frames))
+    finally:
+        socket.close()
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--bind", required=True, help="e.g. tcp://*:5570")
+    arg_parser.add_argument("--mode", choices=["fanout", "chain"], default="fanout")
+    arg_parser.add_argument("--next", help="next chain node, e.g. tcp://localhost:5571")
+    arg_parser.add_argument("--ack", help="head ack endpoint, used by the chain tail")
+    arg_parser.add_argument("--quiet", action="store_true")
+    args = arg_parser.parse_args()
+    if args.mode == "chain":
+        chain_node(args.bind, args.next, args.ack, verbose=not args.quiet)
+    else:
+        fanout_replica(args.bind, verbose=not args.quiet)
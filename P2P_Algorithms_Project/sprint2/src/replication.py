@@ -0,0 +1,267 @@
+import collections
+import os
+import queue
+import struct
+import tempfile
+import threading
+import time
+import zmq
+from registry import REGISTRY
+
+# Qué hace put() cuando la cola de una réplica está llena:
+#   drop-newest  descarta el mensaje nuevo y marca su escritura como fallida
+#   block        bloquea al servidor (y así al cliente) hasta que haya hueco
+#   drop-oldest  descarta el mensaje más antiguo de la cola y encola el nuevo
+#   spill        guarda el mensaje en un fichero y lo envía cuando la cola se vacía
+OVERFLOW_POLICIES = ("drop-newest", "block", "drop-oldest", "spill")
+SPILL_COUNT = struct.Struct("!I")
+SPILL_LEN = struct.Struct("!I")
+
+class QuorumWrite:
+    # Seguimiento de los ACKs de un mensaje replicado en N réplicas.
+    # wait(w) vuelve en cuanto w réplicas confirman, o cuando ya no es posible.
+    def __init__(self, replicas):
+        self.replicas = replicas
+        self.acks = 0
+        self.failures = 0
+        self.condition = threading.Condition()
+
+    def ack(self):
+        with self.condition:
+            self.acks += 1
+            self.condition.notify_all()
+
+    def fail(self):
+        with self.condition:
+            self.failures += 1
+            self.condition.notify_all()
+
+    def wait(self, w, timeout=None):
+        if w <= 0:
+            return True
+        with self.condition:
+            self.condition.wait_for(lambda: self.acks >= w or self.replicas - self.failures < w, timeout)
+            return self.acks >= w
+
+class SpillFile:
+    # Cola FIFO en disco: [nº de frames][longitud, frame]... por mensaje. Las
+    # escrituras pendientes (QuorumWrite) quedan en memoria, los datos no.
+    def __init__(self, directory=None, prefix="replica-"):
+        fd, self.path = tempfile.mkstemp(prefix=prefix, suffix=".spill", dir=directory)
+        self.file = os.fdopen(fd, "w+b")
+        self.read_offset = 0
+        self.waiting = collections.deque()
+        self.lock = threading.Lock()
+
+    @property
+    def pending(self):
+        return len(self.waiting)
+
+    def size(self):
+        with self.lock:
+            return self.file.seek(0, os.SEEK_END) - self.read_offset
+
+    def append(self, frames, enqueued, write):
+        data = [SPILL_COUNT.pack(len(frames))]
+        for frame in frames:
+            data.append(SPILL_LEN.pack(len(frame)))
+            data.append(frame)
+        with self.lock:
+            self.file.seek(0, os.SEEK_END)
+            self.file.write(b"".join(data))
+            self.waiting.append((enqueued, write))
+
+    def pop(self):
+        with self.lock:
+            self.file.flush()
+            self.file.seek(self.read_offset)
+            (count,) = SPILL_COUNT.unpack(self.file.read(SPILL_COUNT.size))
+            frames = []
+            for _ in range(count):
+                (length,) = SPILL_LEN.unpack(self.file.read(SPILL_LEN.size))
+                frames.append(self.file.read(length))
+            self.read_offset = self.file.tell()
+            enqueued, write = self.waiting.popleft()
+            # Vacío: se trunca para que el fichero no crezca indefinidamente
+            if not self.waiting:
+                self.file.seek(0)
+                self.file.truncate()
+                self.read_offset = 0
+            return frames, enqueued, write
+
+    def close(self):
+        self.file.close()
+        os.remove(self.path)
+
+class ReplicaLink:
+    # Conexión REQ persistente a una réplica. Un hilo propio consume una cola
+    # acotada, así el servidor Gather nunca abre sockets por mensaje.
+    def __init__(self, address, context, queue_size=1000, timeout=2.0, registry=REGISTRY,
+                 overflow="drop-newest", spill_dir=None):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        self.address = address
+        self.endpoint = address if "://" in address else f"tcp://{address}"
+        self.context = context
+        self.timeout_ms = int(timeout * 1000)
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+        self.spilled = 0
+        self.blocked = 0.0
+        self.bytes_out = 0
+        self.lag = 0.0
+        self.overflow = overflow
+        self.spill = SpillFile(spill_dir) if overflow == "spill" else None
+        self.register(registry)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def put(self, frames, write):
+        item = (frames, time.monotonic(), write)
+        # Mientras haya mensajes en disco los nuevos también van a disco, para no desordenarlos
+        if self.spill is not None and self.spill.pending:
+            self._spill(item)
+            return
+        try:
+            self.queue.put_nowait(item)
+            return
+        except queue.Full:
+            pass
+        if self.overflow == "block":
+            start = time.monotonic()
+            self.queue.put(item)
+            self.blocked += time.monotonic() - start
+        elif self.overflow == "drop-oldest":
+            while True:
+                try:
+                    _, _, oldest = self.queue.get_nowait()
+                    self.dropped += 1
+                    oldest.fail()
+                except queue.Empty:
+                    pass
+                try:
+                    self.queue.put_nowait(item)
+                    break
+                except queue.Full:
+                    continue
+        elif self.overflow == "spill":
+            self._spill(item)
+        else:
+            self.dropped += 1
+            write.fail()
+
+    def _spill(self, item):
+        self.spill.append(*item)
+        self.spilled += 1
+
+    def register(self, registry):
+        # Las métricas leen los contadores del enlace al exportarse
+        registry.gauge("replication_queue_depth", "Messages waiting in the replica queue",
+                       function=self.queue.qsize, replica=self.address)
+        registry.gauge("replication_lag_seconds", "Enqueue to ack time of the last message",
+                       function=lambda: self.lag, replica=self.address)
+        registry.counter("replication_sent_total", "Messages acked by the replica",
+                         function=lambda: self.sent, replica=self.address)
+        registry.counter("replication_failed_total", "Messages without reply from the replica",
+                         function=lambda: self.failed, replica=self.address)
+        registry.counter("replication_dropped_total", "Messages dropped because the queue was full",
+                         function=lambda: self.dropped, replica=self.address)
+        registry.counter("replication_spilled_total", "Messages written to the spill file",
+                         function=lambda: self.spilled, replica=self.address)
+        registry.gauge("replication_spill_bytes", "Bytes waiting in the spill file",
+                       function=lambda: self.spill.size() if self.spill is not None else 0, replica=self.address)
+        registry.counter("replication_blocked_seconds_total", "Time the server was blocked on a full queue",
+                         function=lambda: self.blocked, replica=self.address)
+        self.queue_wait = registry.histogram("replication_queue_wait_seconds", "Time from enqueue to send",
+                                             replica=self.address)
+        registry.counter("replication_bytes_out_total", "Bytes sent to the replica",
+                         function=lambda: self.bytes_out, replica=self.address)
+
+    def stats(self):
+        return {
+            "queue_depth": self.queue.qsize(),
+            "lag_ms": self.lag * 1000,
+            "sent": self.sent,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "spill_pending": self.spill.pending if self.spill is not None else 0,
+            "blocked_s": self.blocked,
+            "bytes_out": self.bytes_out,
+        }
+
+    def _connect(self):
+        socket = self.context.socket(zmq.REQ)
+        socket.setsockopt(zmq.LINGER, 0)
+        socket.connect(self.endpoint)
+        return socket
+
+    def _next(self):
+        # Primero la cola en memoria (lo más antiguo), después lo que haya en disco
+        if self.spill is not None and self.spill.pending and self.queue.empty():
+            return self.spill.pop()
+        item = self.queue.get()
+        if item is None and self.spill is not None and self.spill.pending:
+            # Al cerrar, enviar lo que quede en disco antes de salir
+            self.queue.put(None)
+            return self.spill.pop()
+        return item
+
+    def _run(self):
+        socket = self._connect()
+        try:
+            while True:
+                item = self._next()
+                if item is None:
+                    break
+                frames, enqueued, write = item
+                self.queue_wait.observe(time.monotonic() - enqueued)
+                socket.send_multipart(frames)
+                self.bytes_out += sum(len(frame) for frame in frames)
+                if socket.poll(self.timeout_ms, zmq.POLLIN):
+                    socket.recv()
+                    self.sent += 1
+                    self.lag = time.monotonic() - enqueued
+                    write.ack()
+                else:
+                    # Sin respuesta el REQ queda bloqueado: se descarta y se reconecta
+                    self.failed += 1
+                    write.fail()
+                    socket.close()
+                    socket = self._connect()
+        finally:
+            socket.close()
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+        if self.spill is not None:
+            self.spill.close()
+
+class ReplicationPool:
+    # Una ReplicaLink por réplica; replicate() encola los frames en todas y
+    # cada enlace los envía en paralelo con los demás. El QuorumWrite devuelto
+    # permite esperar a W de N réplicas; las más lentas terminan en segundo plano.
+    # El número de hilos es fijo (uno por réplica) y cada cola está acotada;
+    # overflow decide qué pasa cuando se llena (OVERFLOW_POLICIES).
+    def __init__(self, replicas, context=None, queue_size=1000, timeout=2.0, registry=REGISTRY,
+                 overflow="drop-newest", spill_dir=None):
+        self.context = context or zmq.Context.instance()
+        self.links = [ReplicaLink(replica, self.context, queue_size, timeout, registry, overflow, spill_dir)
+                      for replica in replicas]
+
+    def replicate(self, frames):
+        if isinstance(frames, bytes):
+            frames = [frames]
+        write = QuorumWrite(len(self.links))
+        for link in self.links:
+            link.put(frames, write)
+        return write
+
+    def stats(self):
+        return {link.address: link.stats() for link in self.links}
+
+    def close(self):
+        for link in self.links:
+            link.close()
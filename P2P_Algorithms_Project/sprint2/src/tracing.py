@@ -0,0 +1,100 @@
+import sys
+import os
+import array
+import time
+
+# Reutilizar el histograma de latencias del Sprint 1
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'sprint1', 'src')))
+
+from histogram import LatencyHistogram
+from registry import REGISTRY
+
+# Temporizadores por etapa para el bucle del servidor Gather. Solo se mide uno
+# de cada sample_every mensajes; las duraciones (ns, perf_counter_ns) se
+# escriben en un buffer preasignado y se vuelcan a un histograma por etapa
+# cuando se llena o cada flush_interval segundos, fuera de la ruta del mensaje.
+STAGE_BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 1e-2, 0.1)
+
+class StageTracer:
+    def __init__(self, stages, sample_every=16, capacity=256, flush_interval=1.0,
+                 server="gather", registry=REGISTRY):
+        self.stages = tuple(stages)
+        self.index = {stage: i for i, stage in enumerate(self.stages)}
+        self.sample_every = sample_every
+        self.capacity = capacity
+        self.flush_interval_ns = int(flush_interval * 1e9)
+        width = len(self.stages)
+        # Una fila por mensaje muestreado; -1 marca etapas que no se ejecutaron
+        self.buffer = array.array("q", bytes(8 * capacity * width))
+        self.empty_row = array.array("q", [-1] * width)
+        self.rows = 0
+        self.row = 0
+        self.messages = 0
+        self.sampled = 0
+        self.active = False
+        self.last = 0
+        self.last_flush = time.perf_counter_ns()
+        self.histograms = [LatencyHistogram() for _ in self.stages]
+        self.exported = [registry.histogram("gather_stage_seconds", "Time per gather stage (sampled)",
+                                            buckets=STAGE_BUCKETS, server=server, stage=stage)
+                         for stage in self.stages]
+
+    def sample(self):
+        # Decide si el siguiente mensaje se mide; la medición empieza con start()
+        self.messages += 1
+        self.active = self.sample_every > 0 and self.messages % self.sample_every == 0
+        if self.active:
+            width = len(self.stages)
+            self.row = self.rows * width
+            self.buffer[self.row:self.row + width] = self.empty_row
+        return self.active
+
+    def start(self):
+        if self.active:
+            self.last = time.perf_counter_ns()
+
+    def begin(self, socket):
+        # Llamar antes de recibir cada mensaje. En los mensajes muestreados se
+        # espera con poll() fuera de la medición, así la etapa "recv" no
+        # incluye el tiempo ocioso
+        if self.sample():
+            socket.poll()
+            self.start()
+
+    def mark(self, stage):
+        # Cierra la etapa `stage`: duración desde la marca anterior
+        if self.active:
+            now = time.perf_counter_ns()
+            self.buffer[self.row + self.index[stage]] = now - self.last
+            self.last = now
+
+    def end(self):
+        if not self.active:
+            return
+        self.active = False
+        self.rows += 1
+        self.sampled += 1
+        if self.rows == self.capacity or self.last - self.last_flush >= self.flush_interval_ns:
+            self.flush()
+
+    def flush(self):
+        width = len(self.stages)
+        buffer = self.buffer
+        for row in range(self.rows):
+            base = row * width
+            for i in range(width):
+                value = buffer[base + i]
+                if value >= 0:
+                    self.histograms[i].record(value)
+                    self.exported[i].observe(value / 1e9)
+        self.rows = 0
+        self.last_flush = time.perf_counter_ns()
+
+    def snapshot(self):
+        # Solo desde el hilo que mide: vuelca lo pendiente y resume cada etapa en ms
+        self.flush()
+        return {stage: histogram.snapshot() for stage, histogram in zip(self.stages, self.histograms)}
+
+def format_stages(snapshot):
+    return " ".join(f"{stage}=p50 {values['p50'] * 1000:.1f}us/p99 {values['p99'] * 1000:.1f}us"
+                    for stage, values in snapshot.items() if values["count"])
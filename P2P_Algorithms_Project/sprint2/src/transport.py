@@ -0,0 +1,23 @@
+import os
+import tempfile
+
+# Endpoints de cada servicio según el despliegue:
+#   inproc  componentes en el mismo proceso; ambos extremos deben usar el
+#           mismo zmq.Context (p. ej. zmq.Context.instance())
+#   ipc     procesos en la misma máquina (socket Unix), sin pila TCP
+#   tcp     procesos en máquinas distintas
+# Las réplicas, los relays y el nodo de ACK de la cadena ya reciben endpoints
+# completos, así que aceptan cualquiera de los tres.
+TRANSPORTS = ("inproc", "ipc", "tcp")
+PORTS = {"broadcast": 5555, "gather": 5556, "gather-async": 5559, "chain-ack": 5565}
+
+def service_endpoint(service, transport="tcp", bind=False, host="localhost", ipc_dir=None):
+    if service not in PORTS:
+        raise ValueError(f"Unknown service: {service}")
+    if transport == "inproc":
+        return f"inproc://{service}"
+    if transport == "ipc":
+        return f"ipc://{os.path.join(ipc_dir or tempfile.gettempdir(), f'p2p-{service}.sock')}"
+    if transport == "tcp":
+        return f"tcp://*:{PORTS[service]}" if bind else f"tcp://{host}:{PORTS[service]}"
+    raise ValueError(f"Unknown transport: {transport}")
@@ -0,0 +1,216 @@
+import array
+import bisect
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+
+# Log de escritura anticipada (WAL) del servidor Gather, solo de anexado y
+# dividido en segmentos:
+#   <base>.log  entradas [longitud (I) | crc32 (I) | datos], base = primer offset
+#   <base>.idx  posición en el .log de cada entrada del segmento (Q, orden nativo)
+# El offset de una entrada es su número de orden global. Las escrituras van a
+# un buffer y un hilo hace un fsync para todas las pendientes a la vez (group
+# commit): mientras dura un fsync se acumulan las siguientes. sync_interval
+# espacia los fsync (como máximo uno por intervalo); con None cada
+# append_batch() hace su propio fsync. wait_durable() espera al fsync.
+ENTRY = struct.Struct("!II")
+INDEX_ENTRY_SIZE = array.array("Q").itemsize
+
+def segment_name(base, suffix):
+    return f"{base:020d}{suffix}"
+
+class Segment:
+    def __init__(self, directory, base):
+        self.base = base
+        self.log_path = os.path.join(directory, segment_name(base, ".log"))
+        self.idx_path = os.path.join(directory, segment_name(base, ".idx"))
+        self.positions = array.array("Q")
+        self.size = 0
+
+    def load_index(self):
+        # Reconstruye el índice de lo que falte (o de un .log truncado) leyendo el .log
+        if os.path.exists(self.idx_path):
+            with open(self.idx_path, "rb") as f:
+                data = f.read()
+            self.positions.frombytes(data[:len(data) - len(data) % INDEX_ENTRY_SIZE])
+        log_size = os.path.getsize(self.log_path) if os.path.exists(self.log_path) else 0
+        while self.positions and self.positions[-1] >= log_size:
+            self.positions.pop()
+        position = 0
+        if self.positions:
+            position = self.positions[-1]
+            self.positions.pop()
+        with open(self.log_path, "rb") as f:
+            f.seek(position)
+            while True:
+                header = f.read(ENTRY.size)
+                if len(header) < ENTRY.size:
+                    break
+                length, crc = ENTRY.unpack(header)
+                data = f.read(length)
+                if len(data) < length or zlib.crc32(data) != crc:
+                    break
+                self.positions.append(position)
+                position += ENTRY.size + length
+        # Una escritura a medias al final (caída) se descarta
+        self.size = position
+        if position < log_size:
+            with open(self.log_path, "r+b") as f:
+                f.truncate(position)
+
+    def count(self):
+        return len(self.positions)
+
+class WriteAheadLog:
+    def __init__(self, directory, segment_bytes=64 * 1024 * 1024, sync_interval=0.0):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.sync_interval = sync_interval
+        os.makedirs(directory, exist_ok=True)
+        self.lock = threading.Lock()
+        self.durable_changed = threading.Condition(self.lock)
+        self.appended = threading.Condition(self.lock)
+        bases = sorted(int(name[:-4]) for name in os.listdir(directory) if name.endswith(".log"))
+        self.segments = [Segment(directory, base) for base in bases] or [Segment(directory, 0)]
+        for segment in self.segments:
+            if os.path.exists(segment.log_path):
+                segment.load_index()
+        self.active = self.segments[-1]
+        self.next_offset = self.active.base + self.active.count()
+        self.durable_offset = self.next_offset
+        self.log_file = open(self.active.log_path, "ab")
+        # El índice del segmento activo se reescribe entero tras la recuperación
+        self.idx_file = open(self.active.idx_path, "wb")
+        self.idx_file.write(self.active.positions.tobytes())
+        self.written_index = self.active.count()
+        self.syncs = 0
+        self.running = True
+        self.thread = None
+        if sync_interval is not None:
+            self.thread = threading.Thread(target=self._sync_loop, daemon=True)
+            self.thread.start()
+
+    def append(self, record):
+        return self.append_batch([record])
+
+    def append_batch(self, records):
+        # Devuelve el offset de la primera entrada
+        with self.lock:
+            first = self.next_offset
+            for record in records:
+                if self.active.size and self.active.size + ENTRY.size + len(record) > self.segment_bytes:
+                    self._roll()
+                self.active.positions.append(self.active.size)
+                self.log_file.write(ENTRY.pack(len(record), zlib.crc32(record)))
+                self.log_file.write(record)
+                self.active.size += ENTRY.size + len(record)
+                self.next_offset += 1
+            self.appended.notify()
+        if self.sync_interval is None:
+            self.sync()
+        return first
+
+    def _roll(self):
+        # Segmento lleno: se cierra en disco y se abre uno nuevo con base = next_offset
+        self._flush()
+        os.fsync(self.log_file.fileno())
+        os.fsync(self.idx_file.fileno())
+        self.log_file.close()
+        self.idx_file.close()
+        self.active = Segment(self.directory, self.next_offset)
+        self.segments.append(self.active)
+        self.written_index = 0
+        self.log_file = open(self.active.log_path, "ab")
+        self.idx_file = open(self.active.idx_path, "wb")
+
+    def _flush(self):
+        self.log_file.flush()
+        self.idx_file.write(self.active.positions[self.written_index:].tobytes())
+        self.idx_file.flush()
+        self.written_index = self.active.count()
+
+    def sync(self):
+        # Un fsync cubre todas las entradas escritas hasta ahora
+        with self.lock:
+            if self.durable_offset == self.next_offset:
+                return self.durable_offset
+            self._flush()
+            target = self.next_offset
+            # Descriptores duplicados: siguen siendo válidos aunque _roll() cierre los ficheros
+            fds = [os.dup(self.log_file.fileno()), os.dup(self.idx_file.fileno())]
+        try:
+            for fd in fds:
+                os.fsync(fd)
+        finally:
+            for fd in fds:
+                os.close(fd)
+        with self.lock:
+            self.syncs += 1
+            if target > self.durable_offset:
+                self.durable_offset = target
+            self.durable_changed.notify_all()
+            return self.durable_offset
+
+    def _sync_loop(self):
+        while True:
+            with self.lock:
+                self.appended.wait_for(lambda: self.next_offset > self.durable_offset or not self.running)
+                if not self.running:
+                    return
+            self.sync()
+            if self.sync_interval:
+                time.sleep(self.sync_interval)
+
+    def wait_durable(self, offset, timeout=None):
+        # True cuando la entrada `offset` ya está en disco
+        with self.lock:
+            return self.durable_changed.wait_for(lambda: self.durable_offset > offset, timeout)
+
+    def read(self, start, max_entries=None, max_bytes=None):
+        # Entradas [(offset, bytes)] desde `start`, solo de lo ya escrito en disco
+        with self.lock:
+            end = self.durable_offset
+            segments = list(self.segments)
+        entries = []
+        total = 0
+        offset = start
+        bases = [segment.base for segment in segments]
+        while offset < end and (max_entries is None or len(entries) < max_entries):
+            segment = segments[max(bisect.bisect_right(bases, offset) - 1, 0)]
+            last = min(end, segment.base + segment.count())
+            if offset >= last:
+                break
+            with open(segment.log_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                while offset < last and (max_entries is None or len(entries) < max_entries):
+                    position = segment.positions[offset - segment.base]
+                    length, _ = ENTRY.unpack_from(view, position)
+                    if max_bytes is not None and entries and total + length > max_bytes:
+                        return entries
+                    entries.append((offset, view[position + ENTRY.size:position + ENTRY.size + length]))
+                    total += length
+                    offset += 1
+        return entries
+
+    def scan(self, start=0):
+        # Recorre el log por lotes desde `start` hasta el último offset duradero
+        offset = start
+        while True:
+            entries = self.read(offset, max_entries=1024)
+            if not entries:
+                return
+            yield from entries
+            offset = entries[-1][0] + 1
+
+    def close(self):
+        with self.lock:
+            self.running = False
+            self.appended.notify()
+        if self.thread is not None:
+            self.thread.join()
+        self.sync()
+        with self.lock:
+            self.log_file.close()
+            self.idx_file.close()
@@ -0,0 +1,11 @@
+# Recepción sin copia: con copy=False ZeroMQ entrega objetos Frame y aquí se
+# devuelve su memoryview, de modo que la cabecera (protocol.py) se lee con
+# unpack_from y el payload llega a zlib/lzma sin pasar por un bytes
+# intermedio. El memoryview mantiene vivo el Frame mientras se use. Crear el
+# Frame cuesta más que copiar un mensaje pequeño; el punto de corte está
+# medido en reports/zero_copy_benchmark.txt.
+
+def recv_frames(socket, copy=True, flags=0):
+    if copy:
+        return socket.recv_multipart(flags)
+    return [frame.buffer for frame in socket.recv_multipart(flags, copy=False)]
@@ -0,0 +1,141 @@
+import sys
+import os
+import random
+import shutil
+import tempfile
+import threading
+import unittest
+import zmq
+
+# Añadir el directorio raíz del proyecto al PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from antientropy import OFFSET, REPLICATE, AntiEntropy, MerkleTree, ReplicaStore
+from batching import encode_batch
+from registry import Registry
+from wal import WriteAheadLog
+
+def serve(context, endpoint, store, ready, stop):
+    socket = context.socket(zmq.REP)
+    socket.bind(endpoint)
+    ready.set()
+    while not stop.is_set():
+        if socket.poll(50, zmq.POLLIN):
+            socket.send_multipart(store.handle(socket.recv_multipart()))
+    socket.close()
+
+class TestMerkleTree(unittest.TestCase):
+    def test_toggle_is_reversible(self):
+        tree = MerkleTree(leaf_size=4, fanout=2)
+        empty = tree.levels(4)[-1]
+        tree.toggle(5, b"record")
+        self.assertNotEqual(tree.levels(4)[-1], empty)
+        tree.toggle(5, b"record")
+        self.assertEqual(tree.levels(4)[-1], empty)
+
+    def test_insertion_order_does_not_matter(self):
+        first, second = MerkleTree(leaf_size=4, fanout=2), MerkleTree(leaf_size=4, fanout=2)
+        entries = [(i, f"r{i}".encode()) for i in range(32)]
+        for offset, record in entries:
+            first.toggle(offset, record)
+        for offset, record in reversed(entries):
+            second.toggle(offset, record)
+        self.assertEqual(first.levels(8), second.levels(8))
+        self.assertEqual(len(first.levels(8)), 4)
+
+class TestAntiEntropy(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="antientropy-test-")
+        self.wal = WriteAheadLog(self.directory, sync_interval=None)
+        self.records = [f"record-{i:05d}".encode() for i in range(4096)]
+        self.wal.append_batch(self.records)
+        self.context = zmq.Context()
+        self.store = ReplicaStore()
+        self.stop = threading.Event()
+        ready = threading.Event()
+        self.thread = threading.Thread(target=serve, args=(self.context, "inproc://replica", self.store,
+                                                           ready, self.stop))
+        self.thread.start()
+        ready.wait()
+        self.anti_entropy = AntiEntropy(self.wal, ["inproc://replica"], self.context, registry=Registry())
+
+    def tearDown(self):
+        self.anti_entropy.close()
+        self.stop.set()
+        self.thread.join()
+        self.context.term()
+        self.wal.close()
+        shutil.rmtree(self.directory)
+
+    def assert_in_sync(self):
+        self.assertEqual([self.store.records.get(i) for i in range(len(self.records))], self.records)
+
+    def test_fills_empty_replica(self):
+        result = self.anti_entropy.resync(0)
+        self.assertEqual(result["records"], len(self.records))
+        self.assert_in_sync()
+        # Ya sincronizada: solo se compara la raíz
+        result = self.anti_entropy.resync(0)
+        self.assertEqual((result["records"], result["rounds"]), (0, 1))
+
+    def test_repairs_only_divergent_leaves(self):
+        for offset, record in enumerate(self.records):
+            self.store.put(offset, record)
+        rng = random.Random(1)
+        missing = rng.sample(range(len(self.records)), 3)
+        for offset in missing:
+            self.store.delete(offset)
+        self.store.put(100, b"corrupted")
+        result = self.anti_entropy.resync(0)
+        leaves = {offset // 64 for offset in missing + [100]}
+        self.assertEqual(result["leaves"], len(leaves))
+        self.assertEqual(result["records"], 64 * len(leaves))
+        self.assert_in_sync()
+        full_size = sum(len(record) for record in self.records)
+        self.assertLess(result["sent"] + result["received"], full_size / 4)
+
+    def test_ignores_incomplete_leaf_and_replicated_offsets(self):
+        self.wal.append_batch([b"tail"])
+        first = self.wal.append_batch([b"a", b"b"])
+        self.store.handle([REPLICATE, OFFSET.pack(first)] + encode_batch(1, 0, [b"a", b"b"]))
+        self.assertEqual(self.store.records[first + 1], b"b")
+        # La última hoja está incompleta: no se compara todavía
+        result = self.anti_entropy.resync(0)
+        self.assertNotIn(len(self.records), self.store.records)
+        self.assert_in_sync()
+        self.assertEqual(result["records"], len(self.records))
+
+    def test_thread_survives_wal_and_socket_errors(self):
+        registry = Registry()
+        anti_entropy = AntiEntropy(self.wal, ["inproc://replica"], self.context, interval=0.05,
+                                   registry=registry)
+        scan = self.wal.scan
+        calls = []
+
+        def failing_scan(start=0):
+            calls.append(start)
+            if len(calls) == 1:
+                raise OSError("disk error")
+            return scan(start)
+
+        self.wal.scan = failing_scan
+        # El primer envío falla como si el socket estuviera en mal estado
+        socket = anti_entropy.sockets[0] = self.context.socket(zmq.REQ)
+        socket.setsockopt(zmq.LINGER, 0)
+        socket.connect("inproc://replica")
+        socket.send(b"unanswered")
+        anti_entropy.start()
+        try:
+            for _ in range(100):
+                if len(self.store.records) == len(self.records):
+                    break
+                self.stop.wait(0.05)
+        finally:
+            anti_entropy.close()
+        self.assert_in_sync()
+        # Un fallo al leer el WAL y otro del socket, y el hilo sigue vivo hasta close()
+        failures = registry.counter("antientropy_failures_total", replica="inproc://replica").get()
+        self.assertEqual(failures, 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import sys
+import os
+import time
+import unittest
+import zlib
+
+# Añadir el directorio raíz del proyecto al PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from batching import BATCH_COUNT, BatchingGatherClient, encode_batch, decode_batch
+
+class FakeSocket:
+    def __init__(self):
+        self.sent = []
+
+    def send_multipart(self, frames):
+        self.sent.append(frames)
+
+    def recv_string(self):
+        return "ACK"
+
+class TestBatching(unittest.TestCase):
+    def test_batch_roundtrip(self):
+        records = [b"1.5,2.5", b"", b"x" * 1000]
+        header, decoded = decode_batch(encode_batch(3, 9, records))
+        self.assertEqual(header.node_id, 3)
+        self.assertEqual(header.seq, 9)
+        self.assertEqual(decoded, records)
+
+    def test_legacy_single_frame(self):
+        header, decoded = decode_batch([zlib.compress(b"Data from node 1: 0")])
+        self.assertIsNone(header)
+        self.assertEqual(decoded, [b"Data from node 1: 0"])
+
+    def test_corrupt_batches_raise_value_error(self):
+        header, block = encode_batch(3, 9, [b"x" * 1000])
+        bad_count = header[:-BATCH_COUNT.size] + b"\x01"
+        for frames in ([b"garbage"], [header, b"garbage"], [bad_count, block], [header, block[:-10]]):
+            with self.assertRaises(ValueError):
+                decode_batch(frames)
+
+    def test_flush_by_size(self):
+        socket = FakeSocket()
+        client = BatchingGatherClient(socket, 1, batch_size=3, max_delay=60)
+        self.assertIsNone(client.send("a"))
+        self.assertIsNone(client.send("b"))
+        self.assertEqual(client.send("c"), "ACK")
+        self.assertEqual(len(socket.sent), 1)
+        _, decoded = decode_batch(socket.sent[0])
+        self.assertEqual(decoded, [b"a", b"b", b"c"])
+
+    def test_flush_by_delay(self):
+        socket = FakeSocket()
+        client = BatchingGatherClient(socket, 1, batch_size=100, max_delay=0)
+        self.assertEqual(client.send("a"), "ACK")
+        self.assertEqual(len(socket.sent), 1)
+
+    def test_partial_batch_flushed_without_further_sends(self):
+        socket = FakeSocket()
+        client = BatchingGatherClient(socket, 1, batch_size=100, max_delay=0.05)
+        self.assertIsNone(client.send("a"))
+        self.assertIsNone(client.flush_if_due())
+        time.sleep(0.06)
+        # Ningún send() posterior: el plazo se cumple desde flush_if_due()
+        self.assertEqual(client.flush_if_due(), "ACK")
+        self.assertEqual(len(socket.sent), 1)
+        self.assertIsNone(client.time_to_flush())
+
+    def test_poll_flushes_at_deadline(self):
+        socket = FakeSocket()
+        client = BatchingGatherClient(socket, 1, batch_size=100, max_delay=0.05)
+        self.assertIsNone(client.poll(0.01))
+        client.send("a")
+        start = time.monotonic()
+        self.assertEqual(client.poll(5.0), "ACK")
+        # poll() vuelve en cuanto vence el lote, no al agotar el timeout
+        self.assertLess(time.monotonic() - start, 1.0)
+        _, decoded = decode_batch(socket.sent[0])
+        self.assertEqual(decoded, [b"a"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import sys
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+import zmq
+
+# Añadir el directorio raíz del proyecto al PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from antientropy import AntiEntropy, ReplicaStore
+from registry import Registry
+from wal import WriteAheadLog
+
+# Coste de una resincronización por anti-entropía frente a reenviar todo el
+# log: réplica con N registros de los que faltan o están corruptos D,
+# repartidos al azar. La réplica responde por tcp://127.0.0.1 en otro hilo.
+
+def serve(context, endpoint, store, ready, stop):
+    socket = context.socket(zmq.REP)
+    socket.bind(endpoint)
+    ready.set()
+    while not stop.is_set():
+        if socket.poll(50, zmq.POLLIN):
+            socket.send_multipart(store.handle(socket.recv_multipart()))
+    socket.close()
+
+def main(count=200000, record_size=64):
+    directory = tempfile.mkdtemp(prefix="antientropy-bench-")
+    wal = WriteAheadLog(directory, sync_interval=None)
+    rng = random.Random(0)
+    records = [os.urandom(record_size // 2).hex().encode() for _ in range(count)]
+    for start in range(0, count, 1000):
+        wal.append_batch(records[start:start + 1000])
+    context = zmq.Context()
+    full = sum(len(record) + 4 for record in records)
+    print(f"{count} records, full resend = {full / 1e6:.2f} MB")
+    print(f"{'divergent':>10} {'leaves':>7} {'rounds':>6} {'bytes':>12} {'% of full':>9} {'time (ms)':>10}")
+    for divergent in (0, 1, 10, 100, 1000, 10000, count):
+        store = ReplicaStore()
+        damaged = set(rng.sample(range(count), divergent))
+        for offset, record in enumerate(records):
+            if offset not in damaged:
+                store.put(offset, record)
+            elif offset % 2:
+                store.put(offset, b"stale")
+        stop = threading.Event()
+        ready = threading.Event()
+        thread = threading.Thread(target=serve, args=(context, "tcp://127.0.0.1:5590", store, ready, stop))
+        thread.start()
+        ready.wait()
+        anti_entropy = AntiEntropy(wal, ["tcp://127.0.0.1:5590"], context, registry=Registry())
+        anti_entropy.catch_up()
+        # El árbol del servidor ya está al día; se mide solo la resincronización
+        anti_entropy.tree.levels(count // anti_entropy.tree.leaf_size)
+        start = time.perf_counter()
+        result = anti_entropy.resync(0)
+        elapsed = time.perf_counter() - start
+        assert all(store.records.get(i) == record for i, record in enumerate(records))
+        total = result["sent"] + result["received"]
+        print(f"{divergent:>10} {result['leaves']:>7} {result['rounds']:>6} {total:>12} "
+              f"{total / full * 100:>8.2f}% {elapsed * 1000:>10.1f}")
+        anti_entropy.close()
+        stop.set()
+        thread.join()
+    context.term()
+    wal.close()
+    shutil.rmtree(directory)
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
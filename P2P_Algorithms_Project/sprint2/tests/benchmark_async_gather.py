@@ -0,0 +1,109 @@
+import sys
+import os
+import multiprocessing
+import time
+import zmq
+
+# Añadir el directorio raíz del proyecto al PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from batching import encode_batch, decode_batch
+from gather_client_async import PipelinedGatherClient
+from gather_server_async import gather_server_async
+
+# Throughput del servidor Gather con N clientes concurrentes:
+# REQ/REP (un mensaje en vuelo por cliente) frente a ROUTER/DEALER con ventana.
+# Cada servidor corre en su propio proceso; los N clientes se multiplexan con un
+# Poller en el proceso principal para no medir el GIL en lugar del servidor.
+
+REP_PORT = 5597
+ROUTER_PORT = 5598
+
+def rep_server():
+    socket = zmq.Context().socket(zmq.REP)
+    socket.bind(f"tcp://127.0.0.1:{REP_PORT}")
+    while True:
+        decode_batch(socket.recv_multipart())
+        socket.send_string("ACK")
+
+def router_server():
+    gather_server_async(ROUTER_PORT, verbose=False)
+
+def run_req(context, clients, count):
+    sockets = []
+    poller = zmq.Poller()
+    remaining = {}
+    for node_id in range(clients):
+        socket = context.socket(zmq.REQ)
+        socket.connect(f"tcp://127.0.0.1:{REP_PORT}")
+        poller.register(socket, zmq.POLLIN)
+        sockets.append(socket)
+    start = time.perf_counter()
+    for node_id, socket in enumerate(sockets):
+        socket.send_multipart(encode_batch(node_id, 0, [b"Data"]))
+        remaining[socket] = count - 1
+    pending = clients
+    while pending:
+        for socket, _ in poller.poll():
+            socket.recv()
+            if remaining[socket]:
+                remaining[socket] -= 1
+                socket.send_multipart(encode_batch(0, remaining[socket], [b"Data"]))
+            else:
+                pending -= 1
+    elapsed = time.perf_counter() - start
+    for socket in sockets:
+        socket.close()
+    return clients * count / elapsed
+
+def send_available(entry, window):
+    # Envía mientras queden créditos; devuelve 1 cuando el cliente ha terminado
+    client = entry[0]
+    while entry[1] and len(client.in_flight) < window:
+        client.send([b"Data"])
+        entry[1] -= 1
+    if not entry[1] and not client.in_flight and not entry[2]:
+        entry[2] = True
+        return 1
+    return 0
+
+def run_dealer(context, clients, count, window):
+    poller = zmq.Poller()
+    state = {}
+    for node_id in range(clients):
+        socket = context.socket(zmq.DEALER)
+        socket.connect(f"tcp://127.0.0.1:{ROUTER_PORT}")
+        poller.register(socket, zmq.POLLIN)
+        state[socket] = [PipelinedGatherClient(socket, node_id, window), count, False]
+    start = time.perf_counter()
+    pending = clients
+    for socket in state:
+        pending -= send_available(state[socket], window)
+    while pending:
+        for socket, _ in poller.poll():
+            entry = state[socket]
+            if entry[0].in_flight:
+                entry[0].recv_ack()
+            pending -= send_available(entry, window)
+    elapsed = time.perf_counter() - start
+    for socket in state:
+        socket.close()
+    return clients * count / elapsed
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    window = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+    servers = [multiprocessing.Process(target=rep_server, daemon=True),
+               multiprocessing.Process(target=router_server, daemon=True)]
+    for server in servers:
+        server.start()
+    time.sleep(0.5)
+    context = zmq.Context()
+    print(f"{'clientes':>8} {'REQ/REP msg/s':>15} {'ROUTER/DEALER msg/s':>20}")
+    for clients in (1, 10, 50, 100):
+        req_rate = run_req(context, clients, count)
+        dealer_rate = run_dealer(context, clients, count, window)
+        print(f"{clients:>8} {req_rate:>15,.0f} {dealer_rate:>20,.0f}")
+    context.term()
+    for server in servers:
+        server.terminate()
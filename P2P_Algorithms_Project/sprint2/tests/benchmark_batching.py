@@ -0,0 +1,68 @@
+import sys
+import os
+import threading
+import time
+import zmq
+
+# Añadir el directorio raíz del proyecto al PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from batching import BatchingGatherClient, decode_batch
+
+# Throughput y latencia del cliente Gather por lotes para tamaños de lote 1..1024.
+# La latencia de un registro es el tiempo desde que se entrega al cliente hasta
+# que llega el ACK de su lote.
+
+ENDPOINT = "tcp://127.0.0.1:5599"
+
+def ack_server(context, ready):
+    socket = context.socket(zmq.REP)
+    socket.bind(ENDPOINT)
+    ready.set()
+    try:
+        while True:
+            frames = socket.recv_multipart()
+            decode_batch(frames)
+            socket.send_string("ACK")
+    except zmq.ContextTerminated:
+        pass
+    finally:
+        socket.close()
+
+def run(context, batch_size, records):
+    socket = context.socket(zmq.REQ)
+    socket.connect(ENDPOINT)
+    pending = []
+    latencies = []
+
+    def on_flush(frames, reply):
+        now = time.perf_counter()
+        latencies.extend(now - t for t in pending)
+        pending.clear()
+
+    client = BatchingGatherClient(socket, 1, batch_size, max_delay=1.0, on_flush=on_flush)
+    start = time.perf_counter()
+    for i in range(records):
+        pending.append(time.perf_counter())
+        client.send(f"{i * 0.5},{i * 0.25}")
+    client.flush()
+    elapsed = time.perf_counter() - start
+    socket.close()
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000
+    return records / elapsed, p50, p99
+
+if __name__ == "__main__":
+    records = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    context = zmq.Context()
+    ready = threading.Event()
+    threading.Thread(target=ack_server, args=(context, ready), daemon=True).start()
+    ready.wait()
+    print(f"{'lote':>6} {'registros/s':>14} {'p50 (ms)':>10} {'p99 (ms)':>10}")
+    batch_size = 1
+    while batch_size <= 1024:
+        rate, p50, p99 = run(context, batch_size, records)
+        print(f"{batch_size:>6} {rate:>14,.0f} {p50:>10.3f} {p99:>10.3f}")
+        batch_size *= 2
+    context.term()
@@ -0,0 +1,74 @@
+import sys
+import os
+import collections
+import multiprocessing
+import time
+
+# Añadir el directorio raíz del proyecto al PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from chain import ChainReplicator, chain_node
+from replica_node import fanout_replica
+from replication import ReplicationPool
+
+# Replicación en abanico frente a replicación en cadena con 1..8 réplicas en
+# localhost. Cada escritura se considera completa cuando todas las réplicas la
+# tienen (W = N en abanico, ACK de la cola en cadena), con hasta WINDOW
+# escrituras en vuelo. Se mide el throughput y los bytes que envía la cabeza.
+
+WINDOW = 64
+PAYLOAD = b"x" * 1024
+
+def run_writes(pool, writes, quorum):
+    in_flight = collections.deque()
+    start = time.perf_counter()
+    for i in range(writes):
+        if len(in_flight) >= WINDOW:
+            in_flight.popleft().wait(quorum, timeout=5.0)
+        in_flight.append(pool.replicate([PAYLOAD]))
+    while in_flight:
+        in_flight.popleft().wait(quorum, timeout=5.0)
+    return writes / (time.perf_counter() - start)
+
+def start_processes(targets):
+    processes = [multiprocessing.Process(target=target, args=args, kwargs={"verbose": False}, daemon=True)
+                 for target, args in targets]
+    for process in processes:
+        process.start()
+    time.sleep(0.5)
+    return processes
+
+def fanout(replicas, writes, port):
+    endpoints = [f"tcp://127.0.0.1:{port + i}" for i in range(replicas)]
+    processes = start_processes([(fanout_replica, (endpoint,)) for endpoint in endpoints])
+    pool = ReplicationPool(endpoints, queue_size=WINDOW * 2)
+    rate = run_writes(pool, writes, replicas)
+    bytes_out = sum(stats["bytes_out"] for stats in pool.stats().values())
+    pool.close()
+    for process in processes:
+        process.terminate()
+    return rate, bytes_out / writes
+
+def chain(replicas, writes, port):
+    endpoints = [f"tcp://127.0.0.1:{port + i}" for i in range(replicas)]
+    ack = f"tcp://127.0.0.1:{port + replicas}"
+    targets = []
+    for i, endpoint in enumerate(endpoints):
+        next_endpoint = endpoints[i + 1] if i + 1 < replicas else None
+        targets.append((chain_node, (endpoint, next_endpoint, None if next_endpoint else ack)))
+    processes = start_processes(targets)
+    replicator = ChainReplicator(endpoints[0], ack)
+    rate = run_writes(replicator, writes, 1)
+    bytes_out = replicator.stats()["bytes_out"]
+    replicator.close()
+    for process in processes:
+        process.terminate()
+    return rate, bytes_out / writes
+
+if __name__ == "__main__":
+    writes = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    print(f"{'réplicas':>8} {'abanico msg/s':>14} {'abanico B/msg':>14} {'cadena msg/s':>13} {'cadena B/msg':>13}")
+    for replicas in range(1, 9):
+        fanout_rate, fanout_bytes = fanout(replicas, writes, 5600 + replicas * 20)
+        chain_rate, chain_bytes = chain(replicas, writes, 5610 + replicas * 20)
+        print(f"{replicas:>8} {fanout_rate:>14,.0f} {fanout_bytes:>14,.0f} {chain_rate:>13,.0f} {chain_bytes:>13,.0f}")
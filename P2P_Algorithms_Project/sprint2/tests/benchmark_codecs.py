@@ -0,0 +1,41 @@
+import sys
+import os
+import time
+
+# Añadir el directorio raíz del proyecto al PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from batching import pack_records
+from codec import NAMES, Codec, sample_traffic
+
+# Ratio de compresión (bytes codificados / bytes originales) y tiempo de CPU
+# por mensaje (codificar + decodificar) para cada códec y tamaño de mensaje.
+# Los mensajes de prueba usan una semilla distinta de la del diccionario.
+
+def measure(codec, codec_id, payloads, repeat):
+    encoded_size = 0
+    start = time.process_time()
+    for _ in range(repeat):
+        for payload in payloads:
+            used, data = codec.encode(payload, codec_id)
+            codec.decode(used, data)
+    cpu = (time.process_time() - start) / (repeat * len(payloads))
+    for payload in payloads:
+        encoded_size += len(codec.encode(payload, codec_id)[1])
+    return encoded_size / sum(len(payload) for payload in payloads), cpu * 1e6
+
+if __name__ == "__main__":
+    codec = Codec()
+    traffic = sample_traffic(count=1024, seed=1)
+    workloads = [
+        ("mensaje (~20 B)", traffic[:200], 20),
+        ("lote 16", [pack_records(traffic[i:i + 16]) for i in range(0, 512, 16)], 10),
+        ("lote 1024", [pack_records(traffic[:1024]), pack_records(traffic[1024:2048])], 3),
+    ]
+    print(f"{'carga':<16} {'códec':<11} {'ratio':>7} {'CPU µs/msg':>11}")
+    for name, payloads, repeat in workloads:
+        for codec_id, codec_name in NAMES.items():
+            ratio, cpu = measure(codec, codec_id, payloads, repeat)
+            print(f"{name:<16} {codec_name:<11} {ratio:>7.3f} {cpu:>11.1f}")
+        ratio, cpu = measure(codec, None, payloads, repeat)
+        print(f"{name:<16} {'auto':<11} {ratio:>7.3f} {cpu:>11.1f}")
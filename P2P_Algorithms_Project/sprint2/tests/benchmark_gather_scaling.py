@@ -0,0 +1,83 @@
+import sys
+import os
+import multiprocessing
+import signal
+import time
+import zmq
+
+# Añadir el directorio raíz del proyecto al PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from batching import decode_batch, encode_batch
+from gather_broker import gather_broker
+
+# Escalado del Gather con broker ROUTER/DEALER de 1 a N trabajadores. El broker
+# (con sus trabajadores) corre en otro proceso; C procesos cliente mantienen
+# cada uno `window` lotes en vuelo sobre un DEALER con el delimitador vacío de
+# REQ, así la carga no depende de un viaje de ida y vuelta por mensaje. Cada
+# lote son 64 registros comprimidos con el códec por defecto. La fila "direct"
+# es un único proceso REP sin broker, como gather_server_optimized.py.
+ENDPOINT = "tcp://127.0.0.1:5596"
+RECORDS = [f"Data from node {i % 100}: latency={20 + i % 80}.5 bandwidth={10 + i % 90}.25".encode()
+           for i in range(64)]
+
+def client(duration, window, results):
+    socket = zmq.Context().socket(zmq.DEALER)
+    socket.connect(ENDPOINT)
+    batches = [[b""] + encode_batch(1, seq, RECORDS) for seq in range(16)]
+    for i in range(window):
+        socket.send_multipart(batches[i % len(batches)])
+    acked = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        socket.recv_multipart()
+        acked += 1
+        socket.send_multipart(batches[acked % len(batches)])
+    results.put(acked)
+    socket.close(linger=0)
+
+def direct_server():
+    socket = zmq.Context().socket(zmq.REP)
+    socket.bind(ENDPOINT)
+    try:
+        while True:
+            decode_batch(socket.recv_multipart())
+            socket.send_string("ACK")
+    except KeyboardInterrupt:
+        socket.close()
+
+def run(workers, clients, duration, window):
+    if workers:
+        broker = multiprocessing.Process(target=gather_broker, args=(workers, ENDPOINT))
+    else:
+        broker = multiprocessing.Process(target=direct_server)
+    broker.start()
+    time.sleep(1.0)
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=client, args=(duration, window, results)) for _ in range(clients)]
+    for process in processes:
+        process.start()
+    acked = sum(results.get() for _ in processes)
+    for process in processes:
+        process.join()
+    # SIGINT: el broker cierra sus sockets y termina a sus trabajadores
+    os.kill(broker.pid, signal.SIGINT)
+    broker.join(10)
+    if broker.is_alive():
+        print(f"Server {broker.pid} did not stop on SIGINT, terminating it")
+        broker.terminate()
+        broker.join()
+    return acked / duration
+
+def main(max_workers=None, clients=2, duration=5.0, window=32):
+    max_workers = max_workers or os.cpu_count()
+    print(f"{os.cpu_count()} cores, {clients} client processes, window {window}")
+    print(f"{'workers':>7} {'batches/s':>10} {'records/s':>10} {'speedup':>8}")
+    base = run(0, clients, duration, window)
+    print(f"{'direct':>7} {base:>10.0f} {base * len(RECORDS):>10.0f} {1:>7.2f}x")
+    for workers in range(1, max_workers + 1):
+        rate = run(workers, clients, duration, window)
+        print(f"{workers:>7} {rate:>10.0f} {rate * len(RECORDS):>10.0f} {rate / base:>7.2f}x")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else None)
@@ -0,0 +1,55 @@
+import sys
+import os
+import multiprocessing
+import random
+import time
+import zmq
+
+# Añadir el directorio raíz del proyecto al PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from replication import ReplicationPool
+
+# Latencia de escritura p50/p99 esperando W de N réplicas (W = 1..N).
+# Cada réplica corre en su propio proceso y responde tras un retardo
+# exponencial cuya media crece con el índice de la réplica.
+
+BASE_PORT = 5580
+
+def slow_replica(port, mean_delay):
+    socket = zmq.Context().socket(zmq.REP)
+    socket.bind(f"tcp://127.0.0.1:{port}")
+    while True:
+        socket.recv_multipart()
+        time.sleep(random.expovariate(1 / mean_delay))
+        socket.send_string("ACK")
+
+def run(pool, w, writes):
+    latencies = []
+    for i in range(writes):
+        start = time.perf_counter()
+        write = pool.replicate([b"header", str(i).encode()])
+        write.wait(w, timeout=2.0)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return latencies[len(latencies) // 2] * 1000, latencies[int(len(latencies) * 0.99)] * 1000
+
+if __name__ == "__main__":
+    replicas = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    writes = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    processes = []
+    for i in range(replicas):
+        process = multiprocessing.Process(target=slow_replica, args=(BASE_PORT + i, 0.001 * (i + 1)), daemon=True)
+        process.start()
+        processes.append(process)
+    time.sleep(0.5)
+    pool = ReplicationPool([f"127.0.0.1:{BASE_PORT + i}" for i in range(replicas)], queue_size=writes * replicas)
+    print(f"{'W':>3} {'p50 (ms)':>10} {'p99 (ms)':>10}")
+    for w in range(1, replicas + 1):
+        p50, p99 = run(pool, w, writes)
+        print(f"{w:>3} {p50:>10.3f} {p99:>10.3f}")
+        # Vaciar las colas de las réplicas lentas antes de la siguiente ronda
+        pool.replicate([b"header", b"drain"]).wait(replicas, timeout=30.0)
+    pool.close()
+    for process in processes:
+        process.terminate()
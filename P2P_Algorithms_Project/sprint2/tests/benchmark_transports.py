@@ -0,0 +1,98 @@
+import sys
+import os
+import tempfile
+import threading
+import time
+import zmq
+
+# Añadir el directorio raíz del proyecto al PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from transport import TRANSPORTS
+
+# Latencia de ida y vuelta REQ/REP y throughput PUSH/PULL de inproc, ipc y
+# tcp (127.0.0.1). Los dos extremos son hilos del mismo proceso y comparten
+# contexto, la única forma de que inproc funcione; así la diferencia entre
+# filas es solo el transporte. Los throughputs son el mejor de 3 intentos.
+
+def endpoints(transport, name):
+    if transport == "inproc":
+        return f"inproc://{name}", f"inproc://{name}"
+    if transport == "ipc":
+        path = os.path.join(tempfile.gettempdir(), f"bench-{name}.sock")
+        return f"ipc://{path}", f"ipc://{path}"
+    return "tcp://127.0.0.1:*", None
+
+def bind(socket, transport, name):
+    bind_endpoint, connect_endpoint = endpoints(transport, name)
+    socket.bind(bind_endpoint)
+    return connect_endpoint or socket.getsockopt_string(zmq.LAST_ENDPOINT)
+
+def echo(context, transport, count, ready):
+    socket = context.socket(zmq.REP)
+    ready.append(bind(socket, transport, "echo"))
+    for _ in range(count):
+        socket.send(socket.recv())
+    socket.close()
+
+def round_trips(context, transport, count=20000, size=64):
+    ready = []
+    thread = threading.Thread(target=echo, args=(context, transport, count + 100, ready))
+    thread.start()
+    while not ready:
+        time.sleep(0.01)
+    socket = context.socket(zmq.REQ)
+    socket.connect(ready[0])
+    payload = b"x" * size
+    for _ in range(100):
+        socket.send(payload)
+        socket.recv()
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        socket.send(payload)
+        socket.recv()
+        samples.append(time.perf_counter() - start)
+    socket.close()
+    thread.join()
+    samples.sort()
+    return samples[len(samples) // 2] * 1e6, samples[int(len(samples) * 0.99)] * 1e6
+
+def sink(context, transport, count, ready, done):
+    socket = context.socket(zmq.PULL)
+    ready.append(bind(socket, transport, "sink"))
+    socket.recv()
+    start = time.perf_counter()
+    for _ in range(count - 1):
+        socket.recv(copy=False)
+    done.append(time.perf_counter() - start)
+    socket.close()
+
+def throughput(context, transport, size, count):
+    ready, done = [], []
+    thread = threading.Thread(target=sink, args=(context, transport, count, ready, done))
+    thread.start()
+    while not ready:
+        time.sleep(0.01)
+    socket = context.socket(zmq.PUSH)
+    socket.connect(ready[0])
+    payload = b"x" * size
+    for _ in range(count):
+        socket.send(payload, copy=size < 65536)
+    thread.join()
+    socket.close()
+    return (count - 1) / done[0]
+
+def main():
+    context = zmq.Context()
+    print(f"{'transport':>9} {'rtt p50 (us)':>13} {'rtt p99 (us)':>13} {'64 B msg/s':>11} {'64 KB msg/s':>12} "
+          f"{'64 KB MB/s':>11}")
+    for transport in TRANSPORTS:
+        p50, p99 = round_trips(context, transport)
+        small = max(throughput(context, transport, 64, 200000) for _ in range(3))
+        large = max(throughput(context, transport, 65536, 20000) for _ in range(3))
+        print(f"{transport:>9} {p50:>13.1f} {p99:>13.1f} {small:>11.0f} {large:>12.0f} {large * 65536 / 1e6:>11.0f}")
+    context.term()
+
+if __name__ == "__main__":
+    main()
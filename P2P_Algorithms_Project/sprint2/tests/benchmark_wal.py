@@ -0,0 +1,51 @@
+import sys
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+# Añadir el directorio raíz del proyecto al PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from wal import WriteAheadLog
+
+# Escrituras duraderas por segundo del WAL: W escritores concurrentes anexan un
+# lote de 16 registros de 64 bytes y esperan a su fsync antes del siguiente,
+# como el servidor Gather antes de enviar el ACK. Con sync_interval = None cada
+# lote hace su propio fsync; con group commit un fsync cubre a todos los
+# escritores que llegaron mientras duraba el anterior (más el intervalo).
+
+RECORDS = [os.urandom(32).hex().encode() for _ in range(16)]
+
+def writer(wal, deadline, latencies):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        offset = wal.append_batch(RECORDS) + len(RECORDS) - 1
+        wal.wait_durable(offset)
+        latencies.append(time.perf_counter() - start)
+
+def run(sync_interval, writers, duration):
+    directory = tempfile.mkdtemp(prefix="wal-bench-")
+    wal = WriteAheadLog(directory, sync_interval=sync_interval)
+    latencies = []
+    deadline = time.perf_counter() + duration
+    threads = [threading.Thread(target=writer, args=(wal, deadline, latencies)) for _ in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wal.close()
+    shutil.rmtree(directory)
+    latencies.sort()
+    return (len(latencies) / duration, wal.syncs / duration, latencies[len(latencies) // 2] * 1000,
+            latencies[int(len(latencies) * 0.99)] * 1000)
+
+if __name__ == "__main__":
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 5.0
+    print(f"{'sync':>8} {'writers':>8} {'batches/s':>10} {'fsync/s':>8} {'p50 (ms)':>9} {'p99 (ms)':>9}")
+    for sync_interval in (None, 0.0, 0.001, 0.005):
+        for writers in (1, 8, 32):
+            rate, syncs, p50, p99 = run(sync_interval, writers, duration)
+            label = "each" if sync_interval is None else f"{sync_interval * 1000:g}ms"
+            print(f"{label:>8} {writers:>8} {rate:>10.0f} {syncs:>8.0f} {p50:>9.3f} {p99:>9.3f}")
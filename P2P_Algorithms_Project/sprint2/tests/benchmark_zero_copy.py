@@ -0,0 +1,73 @@
+import sys
+import os
+import threading
+import time
+import zmq
+
+# Añadir el directorio raíz del proyecto al PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from batching import decode_batch, encode_batch
+from codec import ZLIB, Codec
+from zerocopy import recv_frames
+
+# Recepción + decodificación de lotes de un registro de 64 B a 4 MB sobre
+# PUSH/PULL por tcp://127.0.0.1, copiando los frames (recv_multipart) o
+# recibiéndolos como memoryview (copy=False). "raw" es un payload sin
+# comprimir (solo se copia el registro final); "zlib" pasa por zlib.decompress.
+# Se mide el tiempo de CPU del hilo receptor (time.thread_time), así el
+# emisor y el hilo de E/S de ZeroMQ, que comparten la CPU, no cuentan; de
+# tres repeticiones se queda la mejor.
+SIZES = [64 * 4 ** i for i in range(9)]
+CODECS = {"raw": Codec(threshold=1 << 30), "zlib": Codec(threshold=0, small_limit=0, large_codec=ZLIB)}
+
+def payload(size):
+    # Texto hexadecimal aleatorio: zlib lo reduce a ~55%
+    return os.urandom(size // 2 + 1).hex().encode()[:size]
+
+def sender(endpoint, frames, count, ready):
+    socket = zmq.Context.instance().socket(zmq.PUSH)
+    socket.setsockopt(zmq.SNDHWM, 64)
+    socket.connect(endpoint)
+    ready.wait()
+    for _ in range(count):
+        socket.send_multipart(frames, copy=len(frames[1]) < 65536)
+    socket.close()
+
+def run(size, codec, copy):
+    count = max(200, min(20000, (128 << 20) // size))
+    frames = encode_batch(1, 0, [payload(size)], codec)
+    socket = zmq.Context.instance().socket(zmq.PULL)
+    socket.setsockopt(zmq.RCVHWM, 64)
+    socket.setsockopt(zmq.LINGER, 0)
+    endpoint = f"tcp://127.0.0.1:{socket.bind_to_random_port('tcp://127.0.0.1')}"
+    ready = threading.Event()
+    thread = threading.Thread(target=sender, args=(endpoint, frames, count, ready))
+    thread.start()
+    ready.set()
+    # El primer mensaje no cuenta: incluye la conexión
+    decode_batch(recv_frames(socket, copy), codec)
+    cpu = 0.0
+    for _ in range(count - 1):
+        # La espera en poll() no consume CPU del hilo, pero se deja fuera igualmente
+        socket.poll()
+        start = time.thread_time()
+        _, records = decode_batch(recv_frames(socket, copy), codec)
+        cpu += time.thread_time() - start
+    assert len(records[0]) == size
+    thread.join()
+    socket.close()
+    return cpu / (count - 1)
+
+def main(repeat=3):
+    print(f"{'size':>8} {'codec':>5} {'copy (us)':>10} {'no-copy (us)':>13} {'copy GB/s':>10} "
+          f"{'no-copy GB/s':>13} {'speedup':>8}")
+    for codec_name, codec in CODECS.items():
+        for size in SIZES:
+            copied = min(run(size, codec, True) for _ in range(repeat))
+            zero = min(run(size, codec, False) for _ in range(repeat))
+            print(f"{size:>8} {codec_name:>5} {copied * 1e6:>10.2f} {zero * 1e6:>13.2f} "
+                  f"{size / copied / 1e9:>10.2f} {size / zero / 1e9:>13.2f} {copied / zero:>7.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import sys
+import os
+import threading
+import unittest
+import zmq
+
+# Añadir el directorio raíz del proyecto al PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from chain import ChainReplicator, chain_node
+from registry import Registry
+
+def run_node(*args, **kwargs):
+    # Los nodos terminan cuando el test cierra el contexto
+    try:
+        chain_node(*args, **kwargs)
+    except zmq.ContextTerminated:
+        pass
+
+class TestChainReplication(unittest.TestCase):
+    def setUp(self):
+        self.context = zmq.Context()
+
+    def tearDown(self):
+        # term() espera a que los nodos cierren sus sockets
+        self.context.term()
+
+    def start_chain(self):
+        nodes = [("inproc://head", "inproc://middle", None),
+                 ("inproc://middle", "inproc://tail", None),
+                 ("inproc://tail", None, "inproc://chain-ack")]
+        for bind_endpoint, next_endpoint, ack_endpoint in nodes:
+            threading.Thread(target=run_node, args=(bind_endpoint, next_endpoint, ack_endpoint, self.context),
+                             kwargs=dict(verbose=False), daemon=True).start()
+
+    def test_commit_on_tail_ack(self):
+        self.start_chain()
+        replicator = ChainReplicator("inproc://head", "inproc://chain-ack", self.context, registry=Registry())
+        writes = [replicator.replicate([b"header", f"record {i}".encode()]) for i in range(10)]
+        for write in writes:
+            self.assertTrue(write.wait(1, timeout=5.0))
+        self.assertEqual(replicator.stats()["committed"], 10)
+        self.assertEqual(replicator.stats()["pending"], 0)
+        replicator.close()
+
+    def test_failure_after_max_pending(self):
+        # Sin cadena: nadie confirma y las escrituras más antiguas se dan por perdidas
+        replicator = ChainReplicator("inproc://head", "inproc://chain-ack", self.context, max_pending=2,
+                                     registry=Registry())
+        writes = [replicator.replicate([b"record"]) for _ in range(3)]
+        self.assertFalse(writes[0].wait(1, timeout=0))
+        self.assertEqual(writes[0].failures, 1)
+        self.assertEqual(writes[2].failures, 0)
+        self.assertEqual(replicator.stats()["failed"], 1)
+        self.assertEqual(replicator.stats()["pending"], 2)
+        replicator.close()
+
+    def test_full_queue_does_not_block(self):
+        # Con la cabeza caída el PUSH se llena; replicate() falla la escritura en vez de bloquear
+        replicator = ChainReplicator("inproc://head", "inproc://chain-ack", self.context, registry=Registry())
+        writes = [replicator.replicate([b"record"]) for _ in range(5000)]
+        self.assertGreater(replicator.stats()["failed"], 0)
+        self.assertFalse(writes[-1].wait(1, timeout=0))
+        replicator.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import sys
+import os
+import unittest
+
+# Añadir el directorio raíz del proyecto al PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from batching import encode_batch, decode_batch
+from codec import BZ2, LZMA, NAMES, RAW, ZLIB_DICT, CODEC_MASK, Codec
+
+class TestCodec(unittest.TestCase):
+    def test_roundtrip_all_codecs(self):
+        codec = Codec()
+        payload = b"Data from node 12: 3" * 50
+        for codec_id in NAMES:
+            used, data = codec.encode(payload, codec_id)
+            self.assertEqual(codec.decode(used, data), payload)
+
+    def test_threshold_sends_raw(self):
+        codec = Codec(threshold=16)
+        self.assertEqual(codec.encode(b"tiny"), (RAW, b"tiny"))
+
+    def test_incompressible_falls_back_to_raw(self):
+        codec = Codec()
+        payload = os.urandom(256)
+        self.assertEqual(codec.encode(payload, ZLIB_DICT), (RAW, payload))
+
+    def test_size_selection(self):
+        codec = Codec(threshold=16, small_limit=100, large_codec=BZ2)
+        self.assertEqual(codec.choose(10), RAW)
+        self.assertEqual(codec.choose(50), ZLIB_DICT)
+        self.assertEqual(codec.choose(500), BZ2)
+
+    def test_batch_flags_carry_codec(self):
+        codec = Codec(threshold=0, large_codec=LZMA, small_limit=0)
+        records = [f"{i},{i * 2}".encode() for i in range(500)]
+        frames = encode_batch(1, 1, records, codec=codec)
+        self.assertEqual(frames[0][1] & CODEC_MASK, LZMA)
+        self.assertEqual(decode_batch(frames, codec=codec)[1], records)
+
+if __name__ == '__main__':
+    unittest.main()
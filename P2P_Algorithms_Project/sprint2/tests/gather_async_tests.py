@@ -0,0 +1,102 @@
+import sys
+import os
+import multiprocessing
+import tempfile
+import unittest
+import zlib
+import zmq
+
+# Añadir el directorio raíz del proyecto al PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from batching import BATCH_ACK, encode_batch
+from gather_client_async import PipelinedGatherClient
+from gather_server_async import gather_server_async
+
+class TestPipelinedGatherClient(unittest.TestCase):
+    # El servidor es un ROUTER del propio test, para decidir cuándo y en qué orden responde
+    def setUp(self):
+        self.context = zmq.Context()
+        self.server = self.context.socket(zmq.ROUTER)
+        self.server.bind("inproc://gather-async")
+        self.socket = self.context.socket(zmq.DEALER)
+        self.socket.connect("inproc://gather-async")
+
+    def tearDown(self):
+        self.context.destroy(linger=0)
+
+    def receive(self):
+        identity, header, _ = self.server.recv_multipart()
+        return identity, header
+
+    def test_window_limits_batches_in_flight(self):
+        client = PipelinedGatherClient(self.socket, 1, window=2, timeout=0.2)
+        client.send([b"a"])
+        client.send([b"b"])
+        # Sin créditos, el tercer envío espera un ACK que no llega
+        with self.assertRaises(TimeoutError):
+            client.send([b"c"])
+        self.receive()
+        self.receive()
+        self.assertFalse(self.server.poll(100))
+        self.assertEqual(len(client.in_flight), 2)
+
+    def test_out_of_order_acks(self):
+        acked = []
+        client = PipelinedGatherClient(self.socket, 1, window=4, on_ack=lambda seq, rtt: acked.append(seq))
+        for records in ([b"a"], [b"b"], [b"c"]):
+            client.send(records)
+        identities = [self.receive()[0] for _ in range(3)]
+        for seq in (2, 0, 1):
+            self.server.send_multipart([identities[seq], BATCH_ACK.pack(seq)])
+        client.drain()
+        self.assertEqual(acked, [2, 0, 1])
+        self.assertEqual(client.in_flight, {})
+
+    def test_nack_returns_the_credit(self):
+        client = PipelinedGatherClient(self.socket, 1, window=1, timeout=1.0)
+        client.send([b"a"])
+        identity, _ = self.receive()
+        # NACK sin número de secuencia: corresponde al lote más antiguo
+        self.server.send_multipart([identity, b"", b"NACK decode"])
+        client.send([b"b"])
+        identity, _ = self.receive()
+        self.server.send_multipart([identity, BATCH_ACK.pack(1), b"NACK decode"])
+        client.drain()
+        self.assertEqual(client.nacks, 2)
+        self.assertEqual(client.in_flight, {})
+
+class TestGatherServerAsync(unittest.TestCase):
+    def setUp(self):
+        self.endpoint = f"ipc://{os.path.join(tempfile.mkdtemp(), 'gather-async.sock')}"
+        self.process = multiprocessing.Process(target=gather_server_async,
+                                               kwargs=dict(verbose=False, bind_endpoint=self.endpoint), daemon=True)
+        self.process.start()
+        self.context = zmq.Context()
+        self.socket = self.context.socket(zmq.DEALER)
+        self.socket.connect(self.endpoint)
+
+    def tearDown(self):
+        self.context.destroy(linger=0)
+        self.process.terminate()
+        self.process.join()
+
+    def request(self, frames):
+        self.socket.send_multipart(frames)
+        self.assertTrue(self.socket.poll(5000), "no reply from the server")
+        return self.socket.recv_multipart()
+
+    def test_error_replies(self):
+        header, _ = encode_batch(1, 7, [b"a" * 100])
+        self.assertEqual(self.request(encode_batch(1, 6, [b"a"])), [BATCH_ACK.pack(6)])
+        # Bloque corrupto: la cabecera aún da el número de secuencia
+        self.assertEqual(self.request([header, b"garbage"]), [BATCH_ACK.pack(7), b"NACK decode"])
+        # Un solo frame ilegible o del formato anterior, sin secuencia
+        self.assertEqual(self.request([b"garbage"]), [b"", b"NACK decode"])
+        self.assertEqual(self.request([zlib.compress(b"legacy")]), [b"", b"NACK header"])
+        # El servidor sigue atendiendo
+        self.assertEqual(self.request(encode_batch(1, 8, [b"b"])), [BATCH_ACK.pack(8)])
+        self.assertTrue(self.process.is_alive())
+
+if __name__ == "__main__":
+    unittest.main()
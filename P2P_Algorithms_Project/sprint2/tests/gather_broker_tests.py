@@ -0,0 +1,68 @@
+import sys
+import os
+import multiprocessing
+import signal
+import tempfile
+import unittest
+import zmq
+
+# Añadir el directorio raíz del proyecto al PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from batching import encode_batch
+from gather_broker import gather_broker
+
+class TestGatherBroker(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.frontend = f"ipc://{os.path.join(self.directory, 'gather.sock')}"
+        backend = f"ipc://{os.path.join(self.directory, 'workers.sock')}"
+        # El broker crea procesos hijos: no puede ser un proceso daemon
+        self.broker = multiprocessing.Process(target=gather_broker, args=(2, self.frontend, backend))
+        self.broker.start()
+        self.context = zmq.Context()
+
+    def tearDown(self):
+        self.context.destroy(linger=0)
+        if self.broker.exitcode is None:
+            os.kill(self.broker.pid, signal.SIGINT)
+            self.broker.join(10)
+        stuck = self.broker.is_alive()
+        if stuck:
+            # No dejar procesos colgados aunque el test falle
+            self.broker.terminate()
+            self.broker.join()
+        self.assertFalse(stuck, "broker did not stop on SIGINT")
+
+    def request(self, frames):
+        socket = self.context.socket(zmq.REQ)
+        socket.setsockopt(zmq.LINGER, 0)
+        socket.connect(self.frontend)
+        socket.send_multipart(frames)
+        self.assertTrue(socket.poll(5000), "no reply from the broker")
+        reply = socket.recv_string()
+        socket.close()
+        return reply
+
+    def test_batches_are_acknowledged(self):
+        for seq in range(10):
+            self.assertEqual(self.request(encode_batch(1, seq, [b"a", b"b", b"c"])), "ACK")
+
+    def test_stops_on_sigterm(self):
+        self.assertEqual(self.request(encode_batch(1, 0, [b"a"])), "ACK")
+        self.broker.terminate()
+        self.broker.join(10)
+        self.assertFalse(self.broker.is_alive())
+        # Al parar, el broker termina también a sus trabajadores
+        self.assertEqual(self.broker.exitcode, 0)
+
+    def test_invalid_batch_is_rejected(self):
+        self.assertEqual(self.request([b"not a header", b"not a block"]), "NACK decode")
+        # Un solo frame es el formato anterior (zlib): el error del descompresor tampoco tumba al trabajador
+        self.assertEqual(self.request([b"garbage"]), "NACK decode")
+        self.assertEqual(self.request([b"garbage"]), "NACK decode")
+        # El trabajador sigue atendiendo después del error
+        self.assertEqual(self.request(encode_batch(1, 0, [b"a"])), "ACK")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,293 @@
+import sys
+import os
+import argparse
+import asyncio
+import collections
+import json
+import random
+import resource
+import string
+import time
+import zmq
+import zmq.asyncio
+
+# Añadir el directorio raíz del proyecto al PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'sprint1', 'src')))
+
+from batching import BATCH_ACK, encode_batch
+from histogram import LatencyHistogram
+from protocol import decode_frame
+from pubsub import TopicPublisher
+
+# Generador de carga en un solo proceso con zmq.asyncio; sustituye a
+# run_stress_tests.sh (un intérprete por cliente, sin control de ritmo ni
+# resultados). Las llegadas son de bucle abierto: un proceso de Poisson con la
+# tasa pedida decide cuándo se envía cada mensaje, sin esperar a la respuesta
+# anterior, y la latencia se mide desde el instante programado para no ocultar
+# las colas del servidor (coordinated omission).
+#
+# Los clientes Gather usan DEALER: contra un servidor REP (puerto 5556) se
+# antepone el delimitador vacío y las respuestas llegan en orden; contra el
+# servidor ROUTER asíncrono (puerto 5559) el ACK lleva la secuencia del lote.
+# Los clientes Broadcast son SUB y miden la latencia con el timestamp de la
+# cabecera (mismo host, reloj monotónico).
+
+def payloads(size, count=64, seed=0):
+    rng = random.Random(seed)
+    alphabet = string.ascii_letters + string.digits
+    return [("".join(rng.choice(alphabet) for _ in range(size))).encode() for _ in range(count)]
+
+def raise_fd_limit(needed):
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < needed:
+        target = needed if hard == resource.RLIM_INFINITY else min(hard, needed)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+        soft = target
+    return soft
+
+class GatherLoad:
+    def __init__(self, context, endpoint, clients, rate, payload_size, mode="rep", batch_size=1):
+        self.endpoint = endpoint
+        self.mode = mode
+        self.rate = rate
+        self.batch_size = batch_size
+        self.records = payloads(payload_size)
+        self.sockets = []
+        for _ in range(clients):
+            socket = context.socket(zmq.DEALER)
+            socket.setsockopt(zmq.LINGER, 0)
+            socket.connect(endpoint)
+            self.sockets.append(socket)
+        # Instantes programados de los mensajes en vuelo, por socket
+        self.in_flight = [collections.deque() if mode == "rep" else {} for _ in self.sockets]
+        self.seqs = [0] * clients
+        self.histogram = LatencyHistogram()
+        self.sent = 0
+        self.completed = 0
+        self.nacks = 0
+        self.bytes_out = 0
+        self.late_sends = 0
+
+    def send(self, index, scheduled_ns):
+        seq = self.seqs[index]
+        self.seqs[index] += 1
+        records = [self.records[(seq + i) % len(self.records)] for i in range(self.batch_size)]
+        frames = encode_batch(index, seq, records)
+        if self.mode == "rep":
+            frames = [b""] + frames
+            self.in_flight[index].append(scheduled_ns)
+        else:
+            self.in_flight[index][seq & 0xFFFFFFFF] = scheduled_ns
+        self.sockets[index].send_multipart(frames)
+        self.sent += 1
+        self.bytes_out += sum(len(frame) for frame in frames)
+
+    async def produce(self, deadline_ns, rng):
+        # Llegadas de Poisson para todo el conjunto de clientes, repartidas al azar
+        next_ns = time.monotonic_ns()
+        clients = len(self.sockets)
+        while next_ns < deadline_ns:
+            now = time.monotonic_ns()
+            if next_ns > now:
+                await asyncio.sleep((next_ns - now) / 1e9)
+            elif now - next_ns > 1_000_000:
+                self.late_sends += 1
+            self.send(rng.randrange(clients), next_ns)
+            next_ns += int(rng.expovariate(self.rate) * 1e9)
+
+    async def consume(self, index):
+        socket = self.sockets[index]
+        pending = self.in_flight[index]
+        while True:
+            frames = await socket.recv_multipart()
+            recv_ns = time.monotonic_ns()
+            if self.mode == "rep":
+                reply = frames[-1]
+                if not pending:
+                    continue
+                scheduled_ns = pending.popleft()
+                if reply != b"ACK":
+                    self.nacks += 1
+            else:
+                # NACK: [seq, motivo], o [b"", motivo] para el lote más antiguo
+                if len(frames) > 1:
+                    self.nacks += 1
+                    seq = BATCH_ACK.unpack(frames[0])[0] if frames[0] else next(iter(pending), None)
+                else:
+                    (seq,) = BATCH_ACK.unpack(frames[0])
+                scheduled_ns = pending.pop(seq, None)
+                if scheduled_ns is None:
+                    continue
+            self.completed += 1
+            self.histogram.record(recv_ns - scheduled_ns)
+
+    def outstanding(self):
+        return sum(len(pending) for pending in self.in_flight)
+
+    def report(self, elapsed):
+        return {
+            "endpoint": self.endpoint,
+            "mode": self.mode,
+            "clients": len(self.sockets),
+            "target_rate": self.rate,
+            "sent": self.sent,
+            "completed": self.completed,
+            "lost": self.outstanding(),
+            "nacks": self.nacks,
+            "late_sends": self.late_sends,
+            "throughput_msgs": self.completed / elapsed,
+            "throughput_bytes": self.bytes_out / elapsed,
+            "latency_ms": self.histogram.snapshot(),
+        }
+
+class BroadcastLoad:
+    def __init__(self, context, endpoint, clients, topics=("",)):
+        self.endpoint = endpoint
+        self.sockets = []
+        for _ in range(clients):
+            socket = context.socket(zmq.SUB)
+            socket.setsockopt(zmq.LINGER, 0)
+            for topic in topics:
+                socket.setsockopt_string(zmq.SUBSCRIBE, topic)
+            socket.connect(endpoint)
+            self.sockets.append(socket)
+        self.histogram = LatencyHistogram()
+        self.received = 0
+        self.bytes_in = 0
+
+    async def consume(self, index):
+        socket = self.sockets[index]
+        while True:
+            frames = await socket.recv_multipart()
+            recv_ns = time.monotonic_ns()
+            # Solo la cabecera: el payload no hace falta para medir la latencia
+            frame = decode_frame(frames[1])
+            self.received += 1
+            self.bytes_in += sum(len(part) for part in frames)
+            self.histogram.record(recv_ns - frame.timestamp_ns)
+
+    def report(self, elapsed):
+        return {
+            "endpoint": self.endpoint,
+            "clients": len(self.sockets),
+            "received": self.received,
+            "throughput_msgs": self.received / elapsed,
+            "throughput_bytes": self.bytes_in / elapsed,
+            "latency_ms": self.histogram.snapshot(),
+        }
+
+async def publish(socket, rate, payload_size, deadline_ns, rng):
+    # Publicador propio (--publish-rate): mide el reparto a muchos SUB sin
+    # depender del ritmo fijo de broadcast_server_optimized.py
+    publisher = TopicPublisher(socket)
+    messages = payloads(payload_size)
+    next_ns = time.monotonic_ns()
+    while next_ns < deadline_ns:
+        now = time.monotonic_ns()
+        if next_ns > now:
+            await asyncio.sleep((next_ns - now) / 1e9)
+        publisher.publish(b"load", messages[publisher.seq % len(messages)])
+        next_ns += int(rng.expovariate(rate) * 1e9)
+
+async def run_load(args):
+    raise_fd_limit(2 * (args.gather_clients + args.broadcast_clients) + 256)
+    context = zmq.asyncio.Context()
+    # libzmq limita a 1023 sockets por contexto por defecto
+    context.set(zmq.MAX_SOCKETS, args.gather_clients + args.broadcast_clients + 64)
+    context.setsockopt(zmq.LINGER, 0)
+    rng = random.Random(args.seed)
+    gather = broadcast = None
+    tasks = []
+    if args.gather_clients:
+        gather = GatherLoad(context, args.gather, args.gather_clients, args.rate, args.payload_size,
+                            args.gather_mode, args.batch_size)
+        tasks += [asyncio.ensure_future(gather.consume(i)) for i in range(args.gather_clients)]
+    if args.broadcast_clients:
+        if args.publish_rate:
+            # Socket síncrono: TopicPublisher usa poll(0)/recv() sin bloquear
+            publisher_socket = zmq.Context.instance().socket(zmq.XPUB)
+            publisher_socket.setsockopt(zmq.LINGER, 0)
+            publisher_socket.bind(args.broadcast.replace("localhost", "127.0.0.1"))
+        broadcast = BroadcastLoad(context, args.broadcast, args.broadcast_clients, args.topics or [""])
+        tasks += [asyncio.ensure_future(broadcast.consume(i)) for i in range(args.broadcast_clients)]
+    # Dar tiempo a que se establezcan las conexiones y suscripciones
+    await asyncio.sleep(args.warmup)
+    start_ns = time.monotonic_ns()
+    deadline_ns = start_ns + int(args.duration * 1e9)
+    producers = []
+    if gather is not None:
+        producers.append(gather.produce(deadline_ns, rng))
+    if broadcast is not None and args.publish_rate:
+        producers.append(publish(publisher_socket, args.publish_rate, args.payload_size, deadline_ns, rng))
+    if producers:
+        await asyncio.gather(*producers)
+    else:
+        await asyncio.sleep(args.duration)
+    # Esperar a las respuestas pendientes como mucho --drain segundos
+    drain_deadline = time.monotonic() + args.drain
+    while gather is not None and gather.outstanding() and time.monotonic() < drain_deadline:
+        await asyncio.sleep(0.01)
+    elapsed = (time.monotonic_ns() - start_ns) / 1e9
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    report = {
+        "config": {key: value for key, value in vars(args).items() if key != "report"},
+        "elapsed_s": elapsed,
+    }
+    if gather is not None:
+        report["gather"] = gather.report(elapsed)
+    if broadcast is not None:
+        report["broadcast"] = broadcast.report(elapsed)
+    context.destroy(linger=0)
+    if broadcast is not None and args.publish_rate:
+        publisher_socket.close()
+    return report
+
+def format_report(report):
+    lines = []
+    for kind in ("gather", "broadcast"):
+        section = report.get(kind)
+        if not section:
+            continue
+        latency = section["latency_ms"]
+        lines.append(f"{kind}: {section['clients']} clients, {section['throughput_msgs']:.1f} msg/s, "
+                     f"{section['throughput_bytes'] / 1e6:.2f} MB/s")
+        if latency["count"]:
+            lines.append(f"  latency ms: p50={latency['p50']:.3f} p90={latency['p90']:.3f} "
+                         f"p99={latency['p99']:.3f} p999={latency['p999']:.3f} max={latency['max']:.3f}")
+        if kind == "gather":
+            lines.append(f"  sent={section['sent']} completed={section['completed']} lost={section['lost']} "
+                         f"nacks={section['nacks']} late_sends={section['late_sends']}")
+    return "\n".join(lines)
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--gather", default="tcp://localhost:5556")
+    arg_parser.add_argument("--gather-mode", choices=["rep", "router"], default="rep",
+                            help="REP server (gather_server_*) or ROUTER server (gather_server_async)")
+    arg_parser.add_argument("--gather-clients", type=int, default=1000)
+    arg_parser.add_argument("--rate", type=float, default=1000.0, help="gather messages per second, all clients")
+    arg_parser.add_argument("--batch-size", type=int, default=1, help="records per gather message")
+    arg_parser.add_argument("--broadcast", default="tcp://localhost:5555")
+    arg_parser.add_argument("--broadcast-clients", type=int, default=1000)
+    arg_parser.add_argument("--topics", nargs="*")
+    arg_parser.add_argument("--publish-rate", type=float, default=0.0,
+                            help="bind the broadcast endpoint and publish at this rate instead of a server")
+    arg_parser.add_argument("--payload-size", type=int, default=64, help="bytes per record")
+    arg_parser.add_argument("--duration", type=float, default=30.0)
+    arg_parser.add_argument("--warmup", type=float, default=2.0)
+    arg_parser.add_argument("--drain", type=float, default=5.0)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--report", default=os.path.join(os.path.dirname(__file__), '..', 'reports',
+                                                             'stress_test_results.json'))
+    args = arg_parser.parse_args()
+    report = asyncio.run(run_load(args))
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2)
+    print(format_report(report))
+    print(f"Report written to {args.report}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import sys
+import os
+import time
+import unittest
+import zmq
+
+# Añadir el directorio raíz del proyecto al PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from pubsub import TopicPublisher, decode_broadcast
+
+class TestTopicPublisher(unittest.TestCase):
+    def setUp(self):
+        self.context = zmq.Context()
+        self.xpub = self.context.socket(zmq.XPUB)
+        self.xpub.bind("inproc://broadcast")
+        self.sub = self.context.socket(zmq.SUB)
+        self.sub.connect("inproc://broadcast")
+        self.publisher = TopicPublisher(self.xpub)
+
+    def tearDown(self):
+        self.sub.close()
+        self.xpub.close()
+        self.context.term()
+
+    def wait_for_subscription(self, topic):
+        deadline = time.monotonic() + 1.0
+        while not self.publisher.has_subscribers(topic) and time.monotonic() < deadline:
+            self.publisher.poll_subscriptions()
+            time.sleep(0.01)
+
+    def test_skips_topics_without_subscribers(self):
+        self.sub.setsockopt(zmq.SUBSCRIBE, b"metrics")
+        self.wait_for_subscription(b"metrics")
+        self.assertFalse(self.publisher.publish("alerts", "No alerts"))
+        self.assertTrue(self.publisher.publish("metrics", "latency,bandwidth"))
+        topic, frame, message = decode_broadcast(self.sub.recv_multipart())
+        self.assertEqual((topic, message), (b"metrics", b"latency,bandwidth"))
+        self.assertEqual(self.publisher.skipped, 1)
+
+    def test_reuses_encoded_payload(self):
+        self.sub.setsockopt(zmq.SUBSCRIBE, b"")
+        self.wait_for_subscription(b"nodes")
+        for _ in range(3):
+            self.publisher.publish("nodes", "Hello to all nodes")
+        self.assertEqual(self.publisher.cache_hits, 2)
+        seqs = [decode_broadcast(self.sub.recv_multipart())[1].seq for _ in range(3)]
+        self.assertEqual(seqs, [0, 1, 2])
+
+    def test_unsubscribe(self):
+        self.sub.setsockopt(zmq.SUBSCRIBE, b"nodes")
+        self.wait_for_subscription(b"nodes")
+        self.sub.setsockopt(zmq.UNSUBSCRIBE, b"nodes")
+        deadline = time.monotonic() + 1.0
+        while self.publisher.has_subscribers(b"nodes") and time.monotonic() < deadline:
+            self.publisher.poll_subscriptions()
+            time.sleep(0.01)
+        self.assertFalse(self.publisher.publish("nodes", "Hello to all nodes"))
+
+if __name__ == '__main__':
+    unittest.main()
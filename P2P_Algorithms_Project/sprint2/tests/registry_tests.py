@@ -0,0 +1,59 @@
+import sys
+import os
+import unittest
+import urllib.request
+
+# Añadir el directorio raíz del proyecto al PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from batching import GatherStats, encode_batch
+from registry import CompressionStats, Registry, serve_metrics
+
+class TestRegistry(unittest.TestCase):
+    def test_text_exposition(self):
+        registry = Registry()
+        registry.counter("messages_total", "Messages", server="a").inc(3)
+        registry.gauge("depth", "Queue depth", function=lambda: 7)
+        histogram = registry.histogram("write_seconds", "Write time", buckets=(0.01, 0.1))
+        for value in (0.005, 0.05, 0.5):
+            histogram.observe(value)
+        text = registry.exposition()
+        self.assertIn("# TYPE messages_total counter\nmessages_total{server=\"a\"} 3.0\n", text)
+        self.assertIn("depth 7.0\n", text)
+        self.assertIn('write_seconds_bucket{le="0.01"} 1\n', text)
+        self.assertIn('write_seconds_bucket{le="0.1"} 2\n', text)
+        self.assertIn('write_seconds_bucket{le="+Inf"} 3\n', text)
+        self.assertIn("write_seconds_count 3\n", text)
+
+    def test_same_name_and_labels_returns_same_metric(self):
+        registry = Registry()
+        self.assertIs(registry.counter("c", x="1"), registry.counter("c", x="1"))
+        self.assertIsNot(registry.counter("c", x="1"), registry.counter("c", x="2"))
+        with self.assertRaises(ValueError):
+            registry.gauge("c")
+
+    def test_gather_stats_compression_ratio(self):
+        registry = Registry()
+        stats = GatherStats("test", registry)
+        records = [b"latency=42.0,bandwidth=10.0"] * 64
+        frames = encode_batch(1, 0, records)
+        stats.received(frames, records)
+        self.assertEqual(stats.records_in.get(), 64)
+        self.assertGreater(stats.compression.ratio(), 1.0)
+        self.assertEqual(CompressionStats("empty", registry).ratio(), 0.0)
+
+    def test_standalone_endpoint(self):
+        registry = Registry()
+        registry.counter("up_total").inc()
+        server = serve_metrics(0, registry, host="127.0.0.1")
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+            with urllib.request.urlopen(url) as response:
+                self.assertTrue(response.headers["Content-Type"].startswith("text/plain"))
+                self.assertIn("up_total 1.0", response.read().decode())
+        finally:
+            server.shutdown()
+            server.server_close()
+
+if __name__ == '__main__':
+    unittest.main()
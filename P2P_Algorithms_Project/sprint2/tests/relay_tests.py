@@ -0,0 +1,96 @@
+import sys
+import os
+import threading
+import time
+import unittest
+import zmq
+
+# Añadir el directorio raíz del proyecto al PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from broadcast_relay import HOP, broadcast_relay, decode_hops, hop_latencies_ms, leaf_endpoints, plan_tree
+from pubsub import TopicPublisher, decode_broadcast
+from registry import Registry
+
+def run_relay(*args, **kwargs):
+    # El relay termina cuando el test cierra el contexto
+    try:
+        broadcast_relay(*args, **kwargs)
+    except zmq.ContextTerminated:
+        pass
+
+class TestRelayTree(unittest.TestCase):
+    def test_root_has_fanout_children(self):
+        plan = plan_tree(13, 3, root_endpoint="tcp://root:5555")
+        self.assertEqual(sum(1 for entry in plan if entry["upstream"] == "tcp://root:5555"), 3)
+        children = {}
+        for entry in plan:
+            children[entry["upstream"]] = children.get(entry["upstream"], 0) + 1
+        self.assertTrue(all(count <= 3 for count in children.values()))
+        self.assertEqual(max(entry["depth"] for entry in plan), 3)
+
+    def test_leaf_endpoints(self):
+        plan = plan_tree(3, 2)
+        self.assertEqual(leaf_endpoints(plan), [plan[1]["connect"], plan[2]["connect"]])
+
+    def test_hop_latencies(self):
+        frames = [b"topic", b"header", b"payload", HOP.pack(0, 2_000_000), HOP.pack(5, 5_000_000)]
+        hops = decode_hops(frames)
+        self.assertEqual(hops, [(0, 2_000_000), (5, 5_000_000)])
+        self.assertEqual(hop_latencies_ms(1_000_000, hops, 6_000_000), [1.0, 3.0, 1.0])
+
+class TestBroadcastRelay(unittest.TestCase):
+    def setUp(self):
+        self.context = zmq.Context()
+        self.root = self.context.socket(zmq.XPUB)
+        self.root.setsockopt(zmq.LINGER, 0)
+        self.root.bind("inproc://root")
+        self.publisher = TopicPublisher(self.root, registry=Registry())
+        self.relay = threading.Thread(target=run_relay, args=(7, "inproc://root", "inproc://relay", self.context))
+        self.relay.start()
+        self.sub = self.context.socket(zmq.SUB)
+        self.sub.setsockopt(zmq.LINGER, 0)
+        # inproc exige que el relay haya hecho bind antes de conectar
+        deadline = time.monotonic() + 5.0
+        while True:
+            try:
+                self.sub.connect("inproc://relay")
+                break
+            except zmq.ZMQError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.01)
+
+    def tearDown(self):
+        self.sub.close()
+        self.root.close()
+        # term() espera a que el relay cierre sus sockets
+        self.context.term()
+        self.relay.join(5)
+        self.assertFalse(self.relay.is_alive())
+
+    def test_forwards_subscribed_topic_with_hop(self):
+        self.sub.setsockopt(zmq.SUBSCRIBE, b"metrics")
+        # La suscripción llega a la raíz a través del relay
+        deadline = time.monotonic() + 5.0
+        while not self.publisher.has_subscribers(b"metrics") and time.monotonic() < deadline:
+            self.publisher.poll_subscriptions()
+            time.sleep(0.01)
+        self.assertTrue(self.publisher.has_subscribers(b"metrics"))
+        self.assertFalse(self.publisher.has_subscribers(b"alerts"))
+        # Se envía sin pasar por TopicPublisher para que el filtro lo apliquen los sockets
+        self.root.send_multipart([b"alerts", b"header", b"No alerts"])
+        self.assertTrue(self.publisher.publish("metrics", "latency,bandwidth"))
+        self.assertTrue(self.sub.poll(5000), "no message through the relay")
+        frames = self.sub.recv_multipart()
+        topic, header, message = decode_broadcast(frames[:3])
+        self.assertEqual((topic, message), (b"metrics", b"latency,bandwidth"))
+        hops = decode_hops(frames)
+        self.assertEqual(len(hops), 1)
+        self.assertEqual(hops[0][0], 7)
+        self.assertGreaterEqual(hops[0][1], header.timestamp_ns)
+        # El tema sin suscriptores no se entrega
+        self.assertFalse(self.sub.poll(200))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import sys
+import os
+import threading
+import time
+import unittest
+import zmq
+
+# Añadir el directorio raíz del proyecto al PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from replication import ReplicationPool
+from registry import Registry
+
+def replica(context, endpoint, received, count, release=None):
+    socket = context.socket(zmq.REP)
+    socket.bind(endpoint)
+    if release is not None:
+        release.wait()
+    for _ in range(count):
+        received.append(socket.recv_multipart())
+        socket.send_string("ACK")
+    socket.close()
+
+class TestReplicationPool(unittest.TestCase):
+    def setUp(self):
+        self.context = zmq.Context()
+
+    def tearDown(self):
+        self.context.term()
+
+    def test_replicates_to_all(self):
+        received = [[], []]
+        threads = []
+        for i in range(2):
+            thread = threading.Thread(target=replica, args=(self.context, f"inproc://replica{i}", received[i], 5))
+            thread.start()
+            threads.append(thread)
+        pool = ReplicationPool(["inproc://replica0", "inproc://replica1"], self.context)
+        for i in range(5):
+            pool.replicate([b"header", str(i).encode()])
+        pool.close()
+        for thread in threads:
+            thread.join()
+        for replica_received in received:
+            self.assertEqual([frames[1] for frames in replica_received], [b"0", b"1", b"2", b"3", b"4"])
+        for stats in pool.stats().values():
+            self.assertEqual(stats["sent"], 5)
+            self.assertEqual(stats["queue_depth"], 0)
+
+    def test_write_quorum(self):
+        received = []
+        thread = threading.Thread(target=replica, args=(self.context, "inproc://replica0", received, 1))
+        thread.start()
+        pool = ReplicationPool(["inproc://replica0", "tcp://127.0.0.1:5590"], self.context, timeout=0.05)
+        write = pool.replicate(b"data")
+        self.assertTrue(write.wait(1, timeout=1.0))
+        self.assertFalse(write.wait(2, timeout=1.0))
+        self.assertEqual(write.failures, 1)
+        pool.close()
+        thread.join()
+
+    def test_unreachable_replica_fails(self):
+        pool = ReplicationPool(["tcp://127.0.0.1:5590"], self.context, timeout=0.05)
+        pool.replicate(b"data")
+        pool.close()
+        stats = pool.stats()["tcp://127.0.0.1:5590"]
+        self.assertEqual(stats["sent"], 0)
+        self.assertEqual(stats["failed"], 1)
+
+    def overflow_pool(self, overflow, count, queue_size=2):
+        # Réplica retenida hasta release: el primer mensaje queda en vuelo y
+        # los siguientes llenan la cola de tamaño queue_size
+        received = []
+        release = threading.Event()
+        thread = threading.Thread(target=replica, args=(self.context, "inproc://slow", received, count, release))
+        thread.start()
+        pool = ReplicationPool(["inproc://slow"], self.context, queue_size=queue_size, timeout=5.0,
+                               registry=Registry(), overflow=overflow)
+        writes = [pool.replicate([b"0"])]
+        while not pool.links[0].queue.empty():
+            time.sleep(0.001)
+        return pool, writes, received, release, thread
+
+    def test_overflow_drop_oldest(self):
+        pool, writes, received, release, thread = self.overflow_pool("drop-oldest", 3)
+        writes += [pool.replicate([str(i).encode()]) for i in range(1, 5)]
+        release.set()
+        pool.close()
+        thread.join()
+        self.assertEqual([frames[0] for frames in received], [b"0", b"3", b"4"])
+        self.assertEqual([write.failures for write in writes], [0, 1, 1, 0, 0])
+
+    def test_overflow_spill_keeps_order(self):
+        pool, writes, received, release, thread = self.overflow_pool("spill", 6)
+        writes += [pool.replicate([b"h", str(i).encode()]) for i in range(1, 6)]
+        link = pool.links[0]
+        self.assertEqual(link.spill.pending, 3)
+        self.assertGreater(link.spill.size(), 0)
+        path = link.spill.path
+        release.set()
+        self.assertTrue(writes[-1].wait(1, timeout=2.0))
+        pool.close()
+        thread.join()
+        self.assertEqual([frames[-1] for frames in received], [b"0", b"1", b"2", b"3", b"4", b"5"])
+        self.assertEqual(link.sent, 6)
+        self.assertFalse(os.path.exists(path))
+
+    def test_overflow_block(self):
+        pool, writes, received, release, thread = self.overflow_pool("block", 3, queue_size=1)
+        pool.replicate([b"1"])
+        threading.Timer(0.05, release.set).start()
+        pool.replicate([b"2"])
+        pool.close()
+        thread.join()
+        self.assertEqual([frames[0] for frames in received], [b"0", b"1", b"2"])
+        self.assertGreater(pool.links[0].blocked, 0.0)
+        self.assertEqual(pool.links[0].dropped, 0)
+
+    def test_unknown_overflow_policy(self):
+        with self.assertRaises(ValueError):
+            ReplicationPool(["inproc://none"], self.context, overflow="ignore")
+
+if __name__ == '__main__':
+    unittest.main()
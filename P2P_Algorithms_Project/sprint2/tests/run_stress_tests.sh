@@ -1,22 +1,22 @@
 #!/bin/bash
+# Prueba de estrés reproducible: los servidores en segundo plano y todos los
+# clientes simulados en un solo proceso (load_generator.py). Las opciones se
+# pasan tal cual al generador, p. ej.:
+#   ./run_stress_tests.sh --gather-clients 2000 --rate 5000 --duration 60
 
-# Incrementar el límite de archivos abiertos
-ulimit -n 10000
+cd "$(dirname "$0")"
 
-# Lanzar el servidor Gather con replicación
-python ../src/gather_server_with_replication.py localhost:5557 localhost:5558 &
+# Lanzar dos réplicas, el servidor Gather replicando en ellas y el servidor Broadcast
+python ../src/replica_node.py --bind tcp://*:5557 --quiet &
+REPLICA1_PID=$!
+python ../src/replica_node.py --bind tcp://*:5558 --quiet &
+REPLICA2_PID=$!
+python ../src/gather_server_with_replication.py localhost:5557 localhost:5558 > /dev/null &
+GATHER_PID=$!
+python ../src/broadcast_server_optimized.py > /dev/null &
+BROADCAST_PID=$!
+trap 'kill $GATHER_PID $BROADCAST_PID $REPLICA1_PID $REPLICA2_PID 2>/dev/null' EXIT
+sleep 1
 
-# Lanzar nodos clientes Gather
-for i in {1..50}
-do
-    python ../src/gather_client_with_replication.py $i localhost:5557 localhost:5558 &
-done
-
-# Lanzar el servidor Broadcast
-python ../src/broadcast_server_optimized.py &
-
-# Lanzar nodos clientes Broadcast
-for i in {1..50}
-do
-    python ../src/broadcast_client_optimized.py &
-done
+# Clientes Gather y Broadcast simulados; informe en ../reports/stress_test_results.json
+python load_generator.py "$@"
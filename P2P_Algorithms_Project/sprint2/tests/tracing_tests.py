@@ -0,0 +1,75 @@
+import sys
+import os
+import time
+import unittest
+
+# Añadir el directorio raíz del proyecto al PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from registry import Registry
+from tracing import StageTracer, format_stages
+
+class TestStageTracer(unittest.TestCase):
+    def test_only_sampled_messages_are_timed(self):
+        tracer = StageTracer(("recv", "work"), sample_every=4, registry=Registry())
+        for _ in range(16):
+            tracer.sample()
+            tracer.start()
+            tracer.mark("recv")
+            tracer.mark("work")
+            tracer.end()
+        snapshot = tracer.snapshot()
+        self.assertEqual(tracer.sampled, 4)
+        self.assertEqual(snapshot["recv"]["count"], 4)
+        self.assertEqual(snapshot["work"]["count"], 4)
+
+    def test_stage_durations_and_skipped_stages(self):
+        registry = Registry()
+        tracer = StageTracer(("recv", "work", "ack"), sample_every=1, registry=registry)
+        tracer.sample()
+        tracer.start()
+        tracer.mark("recv")
+        time.sleep(0.002)
+        tracer.mark("work")
+        tracer.end()
+        snapshot = tracer.snapshot()
+        self.assertGreaterEqual(snapshot["work"]["p50"], 1.5)
+        self.assertLess(snapshot["recv"]["p50"], snapshot["work"]["p50"])
+        self.assertEqual(snapshot["ack"], {"count": 0})
+        self.assertIn('gather_stage_seconds_count{server="gather",stage="work"} 1', registry.exposition())
+        self.assertTrue(format_stages(snapshot).startswith("recv=p50"))
+
+    def test_buffer_flushes_when_full(self):
+        tracer = StageTracer(("recv",), sample_every=1, capacity=8, flush_interval=3600, registry=Registry())
+        for _ in range(20):
+            tracer.sample()
+            tracer.start()
+            tracer.mark("recv")
+            tracer.end()
+        self.assertEqual(tracer.histograms[0].count, 16)
+        self.assertEqual(tracer.rows, 4)
+
+    def test_begin_waits_only_on_sampled_messages(self):
+        class FakeSocket:
+            polls = 0
+            def poll(self):
+                self.polls += 1
+
+        socket = FakeSocket()
+        tracer = StageTracer(("recv",), sample_every=4, registry=Registry())
+        for _ in range(8):
+            tracer.begin(socket)
+            tracer.mark("recv")
+            tracer.end()
+        self.assertEqual(socket.polls, 2)
+        self.assertEqual(tracer.sampled, 2)
+
+    def test_disabled(self):
+        tracer = StageTracer(("recv",), sample_every=0, registry=Registry())
+        self.assertFalse(tracer.sample())
+        tracer.mark("recv")
+        tracer.end()
+        self.assertEqual(tracer.sampled, 0)
+
+if __name__ == '__main__':
+    unittest.main()
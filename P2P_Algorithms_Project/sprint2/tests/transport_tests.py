@@ -0,0 +1,39 @@
+import sys
+import os
+import unittest
+import zmq
+
+# Añadir el directorio raíz del proyecto al PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from transport import service_endpoint
+
+class TestTransport(unittest.TestCase):
+    def test_service_endpoints(self):
+        self.assertEqual(service_endpoint("gather", "tcp", bind=True), "tcp://*:5556")
+        self.assertEqual(service_endpoint("broadcast", "tcp", host="10.0.0.2"), "tcp://10.0.0.2:5555")
+        self.assertEqual(service_endpoint("gather", "inproc"), "inproc://gather")
+        self.assertEqual(service_endpoint("gather", "ipc", ipc_dir="/run/p2p"), "ipc:///run/p2p/p2p-gather.sock")
+        # En ipc e inproc ambos extremos usan el mismo endpoint
+        self.assertEqual(service_endpoint("gather", "ipc", bind=True), service_endpoint("gather", "ipc"))
+        with self.assertRaises(ValueError):
+            service_endpoint("gather", "udp")
+        with self.assertRaises(ValueError):
+            service_endpoint("unknown")
+
+    def test_request_reply_over_each_transport(self):
+        context = zmq.Context()
+        for transport in ("inproc", "ipc"):
+            server = context.socket(zmq.REP)
+            server.bind(service_endpoint("gather-async", transport, bind=True))
+            client = context.socket(zmq.REQ)
+            client.connect(service_endpoint("gather-async", transport))
+            client.send(transport.encode())
+            server.send(server.recv())
+            self.assertEqual(client.recv(), transport.encode())
+            client.close()
+            server.close()
+        context.term()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import sys
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+# Añadir el directorio raíz del proyecto al PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from wal import WriteAheadLog
+
+class TestWriteAheadLog(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="wal-test-")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_append_and_read(self):
+        wal = WriteAheadLog(self.directory)
+        self.assertEqual(wal.append(b"a"), 0)
+        self.assertEqual(wal.append_batch([b"b", b"cc", b"ddd"]), 1)
+        self.assertTrue(wal.wait_durable(3, timeout=1.0))
+        self.assertEqual([(offset, bytes(data)) for offset, data in wal.read(1)],
+                         [(1, b"b"), (2, b"cc"), (3, b"ddd")])
+        self.assertEqual([bytes(data) for _, data in wal.scan()], [b"a", b"b", b"cc", b"ddd"])
+        wal.close()
+
+    def test_read_limits(self):
+        wal = WriteAheadLog(self.directory, sync_interval=None)
+        wal.append_batch([b"x" * 10 for _ in range(10)])
+        self.assertEqual(len(wal.read(0, max_entries=3)), 3)
+        self.assertEqual(len(wal.read(0, max_bytes=25)), 2)
+        # Una entrada mayor que max_bytes se devuelve igualmente para no bloquear al lector
+        self.assertEqual(len(wal.read(0, max_bytes=5)), 1)
+        self.assertEqual(wal.read(10), [])
+        wal.close()
+
+    def test_segment_rollover(self):
+        wal = WriteAheadLog(self.directory, segment_bytes=64, sync_interval=None)
+        wal.append_batch([str(i).encode() * 20 for i in range(10)])
+        self.assertGreater(len(wal.segments), 1)
+        self.assertEqual([offset for offset, _ in wal.scan()], list(range(10)))
+        self.assertEqual(bytes(wal.read(7, max_entries=1)[0][1]), b"7" * 20)
+        wal.close()
+
+    def test_reopen_continues_offsets(self):
+        wal = WriteAheadLog(self.directory, segment_bytes=64)
+        wal.append_batch([b"r" * 20 for _ in range(5)])
+        wal.close()
+        wal = WriteAheadLog(self.directory, segment_bytes=64)
+        self.assertEqual(wal.next_offset, 5)
+        self.assertEqual(wal.append(b"next"), 5)
+        wal.sync()
+        self.assertEqual(bytes(wal.read(5)[0][1]), b"next")
+        wal.close()
+
+    def test_recovers_torn_tail(self):
+        wal = WriteAheadLog(self.directory, sync_interval=None)
+        wal.append_batch([b"one", b"two", b"three"])
+        wal.close()
+        log_path = wal.active.log_path
+        # Simula una caída a mitad de la última escritura
+        with open(log_path, "r+b") as f:
+            f.truncate(os.path.getsize(log_path) - 2)
+        wal = WriteAheadLog(self.directory, sync_interval=None)
+        self.assertEqual(wal.next_offset, 2)
+        self.assertEqual([bytes(data) for _, data in wal.scan()], [b"one", b"two"])
+        self.assertEqual(wal.append(b"four"), 2)
+        self.assertEqual([bytes(data) for _, data in wal.scan()], [b"one", b"two", b"four"])
+        wal.close()
+
+    def test_group_commit(self):
+        wal = WriteAheadLog(self.directory, sync_interval=0.01)
+        results = []
+
+        def writer(i):
+            offset = wal.append(str(i).encode())
+            results.append(wal.wait_durable(offset, timeout=2.0))
+
+        threads = [threading.Thread(target=writer, args=(i,)) for i in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [True] * 16)
+        self.assertEqual(wal.durable_offset, 16)
+        # Las escrituras concurrentes comparten fsync
+        self.assertLess(wal.syncs, 16)
+        wal.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import sys
+import os
+import unittest
+import zmq
+
+# Añadir el directorio raíz del proyecto al PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from batching import decode_batch, encode_batch, unpack_records, pack_records
+from codec import BZ2, LZMA, RAW, ZLIB, ZLIB_DICT, Codec
+from pubsub import decode_broadcast
+from zerocopy import recv_frames
+from protocol import encode_frame
+
+# Un códec que fuerza cada formato, para registros de cualquier tamaño
+CODECS = {
+    RAW: Codec(threshold=1 << 20),
+    ZLIB_DICT: Codec(threshold=0),
+    ZLIB: Codec(threshold=0, small_limit=0, large_codec=ZLIB),
+    LZMA: Codec(threshold=0, small_limit=0, large_codec=LZMA),
+    BZ2: Codec(threshold=0, small_limit=0, large_codec=BZ2),
+}
+
+class TestZeroCopy(unittest.TestCase):
+    def setUp(self):
+        self.context = zmq.Context()
+        self.push = self.context.socket(zmq.PUSH)
+        self.pull = self.context.socket(zmq.PULL)
+        self.pull.bind("inproc://zerocopy")
+        self.push.connect("inproc://zerocopy")
+
+    def tearDown(self):
+        self.push.close()
+        self.pull.close()
+        self.context.term()
+
+    def test_recv_frames(self):
+        self.push.send_multipart([b"a", b"bc"])
+        self.assertEqual(recv_frames(self.pull), [b"a", b"bc"])
+        self.push.send_multipart([b"a", b"bc"])
+        frames = recv_frames(self.pull, copy=False)
+        self.assertTrue(all(isinstance(frame, memoryview) for frame in frames))
+        self.assertEqual([bytes(frame) for frame in frames], [b"a", b"bc"])
+
+    def test_decode_batch_from_memoryview(self):
+        records = [b"x" * 100, b"Data from node 7: 3", b""]
+        for codec in CODECS.values():
+            self.push.send_multipart(encode_batch(3, 9, records, codec))
+            header, decoded = decode_batch(recv_frames(self.pull, copy=False), codec)
+            self.assertEqual((header.node_id, header.seq), (3, 9))
+            self.assertEqual(decoded, records)
+            self.assertTrue(all(isinstance(record, bytes) for record in decoded))
+
+    def test_unpack_records_copies_only_records(self):
+        block = pack_records([b"one", b"two"])
+        self.assertEqual(unpack_records(memoryview(block)), [b"one", b"two"])
+        with self.assertRaises(ValueError):
+            unpack_records(memoryview(block)[:-1])
+
+    def test_decode_broadcast_from_memoryview(self):
+        self.push.send_multipart([b"alerts", encode_frame(0, 5, flags=RAW), b"hello"])
+        topic, frame, message = decode_broadcast(recv_frames(self.pull, copy=False))
+        self.assertEqual((bytes(topic), frame.seq, str(message, "utf-8")), (b"alerts", 5, "hello"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import json
+import math
+import zlib
+
+# Agregados parciales que se pueden combinar en cualquier orden: los nodos
+# agregadores resumen una ventana de muestras de sus clientes y envían un solo
+# registro hacia arriba. El sketch agrupa los valores en cubos logarítmicos
+# (error relativo ~1%) para estimar percentiles tras combinar.
+GAMMA = 1.02
+LOG_GAMMA = math.log(GAMMA)
+METRICS = ("latency", "bandwidth")
+AGGREGATE_TAG = b"AGG"
+
+class Aggregate:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.buckets = {}
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        bucket = math.ceil(math.log(value) / LOG_GAMMA) if value > 0 else 0
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def merge(self, other):
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        for bucket, count in other.buckets.items():
+            self.buckets[bucket] = self.buckets.get(bucket, 0) + count
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, q):
+        if not self.count:
+            return 0.0
+        rank = q * (self.count - 1)
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen > rank:
+                value = 2 * GAMMA ** bucket / (GAMMA + 1) if bucket else 0.0
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def to_dict(self):
+        return {"count": self.count, "sum": self.total, "min": self.min, "max": self.max,
+                "buckets": self.buckets}
+
+    @classmethod
+    def from_dict(cls, values):
+        aggregate = cls()
+        aggregate.count = values["count"]
+        aggregate.total = values["sum"]
+        aggregate.min = values["min"]
+        aggregate.max = values["max"]
+        aggregate.buckets = {int(bucket): count for bucket, count in values["buckets"].items()}
+        return aggregate
+
+def new_window():
+    return {metric: Aggregate() for metric in METRICS}
+
+def merge_window(window, other):
+    for metric in METRICS:
+        window[metric].merge(other[metric])
+
+def encode_aggregates(window, node_id):
+    record = {"node": node_id, "metrics": {metric: window[metric].to_dict() for metric in METRICS}}
+    return [AGGREGATE_TAG, zlib.compress(json.dumps(record).encode())]
+
+def encode_sample(node_id, latency, bandwidth):
+    return zlib.compress(f"{node_id},{latency},{bandwidth}".encode())
+
+def decode_gather_message(frames):
+    # Devuelve (nodo, ventana) tanto para una muestra "nodo,latency,bandwidth"
+    # de un cliente como para un registro agregado [AGG, json] de un agregador.
+    # Las muestras antiguas "latency,bandwidth" no llevan nodo (None).
+    if len(frames) == 2 and frames[0] == AGGREGATE_TAG:
+        record = json.loads(zlib.decompress(frames[1]))
+        window = {metric: Aggregate.from_dict(record["metrics"][metric]) for metric in METRICS}
+        return record["node"], window
+    fields = zlib.decompress(frames[0]).decode().split(",")
+    node = fields.pop(0) if len(fields) > len(METRICS) else None
+    window = new_window()
+    for metric, value in zip(METRICS, map(float, fields)):
+        window[metric].add(value)
+    return node, window
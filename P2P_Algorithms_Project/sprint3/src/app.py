@@ -1,26 +1,80 @@
+import argparse
+import os
 import signal
 import sys
-from flask import Flask, render_template, jsonify, Blueprint
+from flask import Flask, render_template, jsonify, Blueprint, request, Response, stream_with_context
 import threading
-import subprocess
-import zlib
 import zmq
 import time
 import random
 
+# Reutilizar la replicación con conexiones persistentes del Sprint 2
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'sprint2', 'src')))
+
+from replication import ReplicationPool
+from registry import CONTENT_TYPE, REGISTRY
+from batching import GatherStats
+from tracing import StageTracer
+from zerocopy import recv_frames
+from transport import TRANSPORTS, service_endpoint
+from aggregation import decode_gather_message, encode_sample
+from timeseries import TimeSeriesStore, event_stream
+from ingest import MetricsIngest
+
 app = Flask(__name__)
 
-data = {
-    "latency": 0,
-    "bandwidth": 0
-}
+# Historial de memoria fija por métrica y nodo
+store = TimeSeriesStore(capacity=3600)
+
+# Estado por nodo y de todo el clúster; un único hilo aplica las muestras
+ingest = MetricsIngest(store)
+ingest.register(REGISTRY)
+
+# Pool de replicación del servidor gather, expuesto en /metrics/replication
+replication_pool = None
 
 # Define el blueprint para las métricas
 metrics_bp = Blueprint('metrics_bp', __name__)
 
 @metrics_bp.route('/metrics', methods=['GET'])
 def get_metrics():
-    return jsonify(data)
+    # Con ?since=<seq> solo se devuelven los puntos posteriores a esa secuencia
+    since = request.args.get('since', type=int)
+    if since is None:
+        return jsonify(ingest.snapshot())
+    return jsonify(store.since(since))
+
+@metrics_bp.route('/prometheus', methods=['GET'])
+def get_prometheus():
+    # Contadores, gauges e histogramas del proceso en formato Prometheus
+    return Response(REGISTRY.exposition(), content_type=CONTENT_TYPE)
+
+@metrics_bp.route('/history', methods=['GET'])
+def get_history():
+    # Histórico agregado: ?range=<segundos>&resolution=1s|10s|1m|10m|auto&points=<N>
+    duration = request.args.get('range', default=3600, type=float)
+    points = request.args.get('points', default=300, type=int)
+    resolution = request.args.get('resolution', default='auto')
+    try:
+        return jsonify(store.history(duration, points, resolution))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+@metrics_bp.route('/stream', methods=['GET'])
+def stream_metrics():
+    # Server-Sent Events; al reconectar el navegador envía Last-Event-ID
+    since = request.headers.get('Last-Event-ID', type=int)
+    if since is None:
+        since = request.args.get('since', default=store.seq, type=int)
+    interval = request.args.get('interval', default=1.0, type=float)
+    return Response(stream_with_context(event_stream(store, since, interval)),
+                    mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+@metrics_bp.route('/replication', methods=['GET'])
+def get_replication_stats():
+    if replication_pool is None:
+        return jsonify({})
+    return jsonify(replication_pool.stats())
 
 app.register_blueprint(metrics_bp, url_prefix='/metrics')
 
@@ -28,74 +82,89 @@ app.register_blueprint(metrics_bp, url_prefix='/metrics')
 def index():
     return render_template('index.html')
 
-def replicate_data(message, replicas):
-    for replica in replicas:
-        context = zmq.Context.instance()
-        socket = context.socket(zmq.REQ)
-        try:
-            socket.connect(f"tcp://{replica}")
-            compressed_data = zlib.compress(message.encode())
-            socket.send(compressed_data)
-            reply = socket.recv_string()
-            print(f"Replication reply: {reply}")
-        finally:
-            socket.close()
-
-def gather_server_with_replication(replicas, port=5556):
+def gather_server_with_replication(replicas, bind_endpoint="tcp://*:5556", trace_every=16, zero_copy=False):
+    global replication_pool
+    # Context.instance(): con inproc:// el servidor y los clientes deben compartir contexto
     context = zmq.Context.instance()
     socket = context.socket(zmq.REP)
-    socket.bind(f"tcp://*:{port}")
+    try:
+        socket.bind(bind_endpoint)
+    except zmq.ZMQError as e:
+        print(f"Cannot bind {bind_endpoint}: {e}")
+        socket.close()
+        return
+    pool = replication_pool = ReplicationPool(replicas, context)
+    ingest.start()
+    # Las muestras se descomprimen en decode_gather_message, sin registros sueltos
+    stats = GatherStats("dashboard", compression=False)
+    tracer = StageTracer(("recv", "decode", "print", "ingest", "replicate", "ack"),
+                         sample_every=trace_every, server="dashboard")
     try:
         while True:
-            compressed_message = socket.recv()
-            message = zlib.decompress(compressed_message).decode()
-            print(f"Received data: {message}")
-            latency, bandwidth = map(float, message.split(","))
-            data["latency"] = latency
-            data["bandwidth"] = bandwidth
-            threading.Thread(target=replicate_data, args=(message, replicas)).start()
+            tracer.begin(socket)
+            frames = recv_frames(socket, copy=not zero_copy)
+            tracer.mark("recv")
+            stats.received(frames)
+            # Muestra de un cliente o agregado de un nodo agregador
+            node, window = decode_gather_message(frames)
+            tracer.mark("decode")
+            print(f"Received data from {node or 'client'}: {window['latency'].count} samples")
+            tracer.mark("print")
+            ingest.submit(node, window)
+            tracer.mark("ingest")
+            pool.replicate(frames)
+            tracer.mark("replicate")
             socket.send_string("ACK")
+            tracer.mark("ack")
+            tracer.end()
+            stats.messages_out.inc()
     finally:
         socket.close()
 
-def gather_client_with_replication(node_id, replicas, port=5556):
+def gather_client_with_replication(node_id, replicas, server="tcp://localhost:5556"):
     context = zmq.Context.instance()
     socket = context.socket(zmq.REQ)
-    socket.connect(f"tcp://localhost:{port}")
+    socket.connect(server)
+    pool = ReplicationPool(replicas, context)
     while True:
         latency = random.uniform(20, 100)  # Simulating latency
         bandwidth = random.uniform(10, 100)  # Simulating bandwidth
-        message = f"{latency},{bandwidth}"
-        compressed_message = zlib.compress(message.encode())
+        # El id de nodo viaja en el mensaje para llevar el estado por nodo
+        compressed_message = encode_sample(node_id, latency, bandwidth)
         socket.send(compressed_message)
         reply = socket.recv_string()
         print(f"Received reply: {reply}")
-        threading.Thread(target=replicate_data, args=(message, replicas)).start()
+        pool.replicate(compressed_message)
         time.sleep(1)
 
-def run_gather_server():
-    gather_server_with_replication([], port=5556)
+def run_gather_server(transport, zero_copy=False):
+    gather_server_with_replication([], service_endpoint("gather", transport, bind=True), zero_copy=zero_copy)
 
-def run_gather_client(client_id):
-    gather_client_with_replication(client_id, [], port=5556)
+def run_gather_client(client_id, transport):
+    gather_client_with_replication(client_id, [], service_endpoint("gather", transport))
 
 def signal_handler(sig, frame):
     print('Stopping threads...')
     sys.exit(0)
 
 if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser()
+    # El servidor y los clientes son hilos de este proceso: inproc evita la pila
+    # TCP y no ocupa ningún puerto; tcp/ipc permiten conectar clientes externos
+    arg_parser.add_argument("--transport", choices=TRANSPORTS, default="inproc",
+                            help="transport between the embedded gather server and clients")
+    arg_parser.add_argument("--zero-copy", action="store_true",
+                            help="receive frames as memoryviews without copying them")
+    args = arg_parser.parse_args()
     signal.signal(signal.SIGINT, signal_handler)
-    
-    # Asegúrate de matar procesos anteriores que utilizan el puerto 5556
-    subprocess.run(["kill $(lsof -t -i:5556) 2>/dev/null"], shell=True)
-    
+
     # Iniciar el servidor gather en un hilo separado
-    server_thread = threading.Thread(target=run_gather_server)
+    server_thread = threading.Thread(target=run_gather_server, args=(args.transport, args.zero_copy))
     server_thread.start()
 
     # Iniciar los clientes gather en hilos separados
     for i in range(1, 6):
-        client_thread = threading.Thread(target=run_gather_client, args=(i,))
+        client_thread = threading.Thread(target=run_gather_client, args=(i, args.transport))
         client_thread.start()
 
     app.run(debug=True)
@@ -0,0 +1,95 @@
+import queue
+import threading
+import time
+
+from aggregation import METRICS, merge_window, new_window
+
+# Estado de métricas por nodo con un único escritor: el servidor gather solo
+# encola (nodo, ventana) y un hilo de ingesta aplica las actualizaciones. Los
+# lectores de Flask obtienen una instantánea inmutable que se sustituye de una
+# vez tras cada lote, así que nunca bloquean la ingesta ni ven estados a medias.
+def summarize(aggregate):
+    return {"count": aggregate.count, "mean": aggregate.mean(),
+            "min": aggregate.min if aggregate.count else 0.0,
+            "max": aggregate.max if aggregate.count else 0.0,
+            "p50": aggregate.quantile(0.5), "p99": aggregate.quantile(0.99)}
+
+class MetricsIngest:
+    def __init__(self, store=None, queue_size=10000):
+        self.store = store
+        self.queue = queue.Queue(queue_size)
+        # Solo el hilo de ingesta modifica estos atributos
+        self.nodes = {}
+        self.last = {}
+        self.cluster = new_window()
+        self.updates = 0
+        self.dropped = 0
+        self.current = {"updates": 0, "nodes": {}, "cluster": {}}
+        self.thread = None
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, daemon=True)
+            self.thread.start()
+        return self
+
+    def register(self, registry):
+        registry.gauge("ingest_queue_depth", "Samples waiting for the ingest thread",
+                       function=self.queue.qsize)
+        registry.counter("ingest_updates_total", "Samples applied to the metric state",
+                         function=lambda: self.updates)
+        registry.counter("ingest_dropped_total", "Samples dropped because the queue was full",
+                         function=lambda: self.dropped)
+        registry.gauge("ingest_nodes", "Nodes with metric state", function=lambda: len(self.nodes))
+
+    def submit(self, node, window, timestamp=None):
+        try:
+            self.queue.put_nowait((node, window, timestamp or time.time()))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def run(self):
+        while True:
+            item = self.queue.get()
+            # Aplicar todo lo que ya esté en cola y publicar una sola instantánea
+            while item is not None:
+                self.apply(*item)
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+            self.current = self.build_snapshot()
+            if item is None:
+                return
+
+    def apply(self, node, window, timestamp):
+        node = "cluster" if node is None else str(node)
+        running = self.nodes.get(node)
+        if running is None:
+            running = self.nodes[node] = new_window()
+        merge_window(running, window)
+        merge_window(self.cluster, window)
+        self.last[node] = {metric: window[metric].mean() for metric in METRICS}
+        if self.store is not None:
+            for metric in METRICS:
+                self.store.append(metric, node, self.last[node][metric], timestamp)
+        self.updates += 1
+
+    def build_snapshot(self):
+        snapshot = {"updates": self.updates, "dropped": self.dropped, "nodes": {},
+                    "cluster": {metric: summarize(self.cluster[metric]) for metric in METRICS}}
+        for node, running in self.nodes.items():
+            snapshot["nodes"][node] = {metric: dict(summarize(running[metric]), last=self.last[node][metric])
+                                       for metric in METRICS}
+        return snapshot
+
+    def snapshot(self):
+        return self.current
+
+    def close(self):
+        if self.thread is not None:
+            self.queue.put(None)
+            self.thread.join()
+            self.thread = None
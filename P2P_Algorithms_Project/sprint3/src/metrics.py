@@ -1,63 +1,102 @@
-import zlib
+import os
+import sys
 import zmq
 import threading
-import socket as py_socket
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request, Response, stream_with_context
 
-metrics = Blueprint('metrics', __name__)
+# Reutilizar la replicación con conexiones persistentes del Sprint 2
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'sprint2', 'src')))
+
+from replication import ReplicationPool
+from registry import CONTENT_TYPE, REGISTRY
+from batching import GatherStats
+from tracing import StageTracer
+from aggregation import decode_gather_message
+from timeseries import TimeSeriesStore, event_stream
+from ingest import MetricsIngest
 
-# Datos simulados para pruebas
-data = {
-    "latency": 0,
-    "bandwidth": 0
-}
+metrics = Blueprint('metrics', __name__)
 
-# Función para replicar datos a los nodos de réplica
-def replicate_data(data, replicas):
-    for replica in replicas:
-        context = zmq.Context()
-        socket = context.socket(zmq.REQ)
-        try:
-            socket.connect(f"tcp://{replica}")
-            compressed_data = zlib.compress(data.encode())
-            socket.send(compressed_data)
-            reply = socket.recv_string()
-            print(f"Replication reply: {reply}")
-        finally:
-            socket.close()
+# Historial de memoria fija por métrica y nodo
+store = TimeSeriesStore(capacity=3600)
 
-# Función para verificar si el puerto está en uso
-def is_port_in_use(port):
-    with py_socket.socket(py_socket.AF_INET, py_socket.SOCK_STREAM) as s:
-        return s.connect_ex(('localhost', port)) == 0
+# Estado por nodo y de todo el clúster; un único hilo aplica las muestras
+ingest = MetricsIngest(store)
+ingest.register(REGISTRY)
 
 # Simulación de recepción de datos de latencia y ancho de banda desde los clientes
-def gather_server_with_replication(replicas, port=5556):
-    context = zmq.Context()
+def gather_server_with_replication(replicas, bind_endpoint="tcp://*:5556", trace_every=16):
+    # Context.instance(): con inproc:// los clientes deben compartir contexto
+    context = zmq.Context.instance()
     socket = context.socket(zmq.REP)
-    
-    if is_port_in_use(port):
-        print(f"Port {port} is already in use.")
+    try:
+        socket.bind(bind_endpoint)
+    except zmq.ZMQError as e:
+        print(f"Cannot bind {bind_endpoint}: {e}")
+        socket.close()
         return
-
-    socket.bind(f"tcp://*:{port}")
+    pool = ReplicationPool(replicas, context)
+    ingest.start()
+    # Las muestras se descomprimen en decode_gather_message, sin registros sueltos
+    stats = GatherStats("dashboard", compression=False)
+    tracer = StageTracer(("recv", "decode", "print", "ingest", "replicate", "ack"),
+                         sample_every=trace_every, server="dashboard")
     try:
         while True:
-            compressed_message = socket.recv()
-            message = zlib.decompress(compressed_message).decode()
-            print(f"Received data: {message}")
-            latency, bandwidth = map(float, message.split(","))
-            data["latency"] = latency
-            data["bandwidth"] = bandwidth
-            threading.Thread(target=replicate_data, args=(message, replicas)).start()
+            tracer.begin(socket)
+            frames = socket.recv_multipart()
+            tracer.mark("recv")
+            stats.received(frames)
+            # Muestra de un cliente o agregado de un nodo agregador
+            node, window = decode_gather_message(frames)
+            tracer.mark("decode")
+            print(f"Received data from {node or 'client'}: {window['latency'].count} samples")
+            tracer.mark("print")
+            ingest.submit(node, window)
+            tracer.mark("ingest")
+            pool.replicate(frames)
+            tracer.mark("replicate")
             socket.send_string("ACK")
+            tracer.mark("ack")
+            tracer.end()
+            stats.messages_out.inc()
     finally:
         socket.close()
 
 # Ruta de la API para obtener las métricas
 @metrics.route('/metrics', methods=['GET'])
 def get_metrics():
-    return jsonify(data)
+    # Con ?since=<seq> solo se devuelven los puntos posteriores a esa secuencia
+    since = request.args.get('since', type=int)
+    if since is None:
+        return jsonify(ingest.snapshot())
+    return jsonify(store.since(since))
+
+@metrics.route('/prometheus', methods=['GET'])
+def get_prometheus():
+    # Contadores, gauges e histogramas del proceso en formato Prometheus
+    return Response(REGISTRY.exposition(), content_type=CONTENT_TYPE)
+
+@metrics.route('/history', methods=['GET'])
+def get_history():
+    # Histórico agregado: ?range=<segundos>&resolution=1s|10s|1m|10m|auto&points=<N>
+    duration = request.args.get('range', default=3600, type=float)
+    points = request.args.get('points', default=300, type=int)
+    resolution = request.args.get('resolution', default='auto')
+    try:
+        return jsonify(store.history(duration, points, resolution))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+@metrics.route('/stream', methods=['GET'])
+def stream_metrics():
+    # Server-Sent Events; al reconectar el navegador envía Last-Event-ID
+    since = request.headers.get('Last-Event-ID', type=int)
+    if since is None:
+        since = request.args.get('since', default=store.seq, type=int)
+    interval = request.args.get('interval', default=1.0, type=float)
+    return Response(stream_with_context(event_stream(store, since, interval)),
+                    mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
 
 # Iniciar el servidor Gather en un hilo separado
 replicas = []  # Define tus réplicas aquí
@@ -0,0 +1,59 @@
+import os
+import sys
+import time
+import zmq
+
+# Módulos compartidos del panel (src/)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from aggregation import decode_gather_message, encode_aggregates, merge_window, new_window
+
+# Nodo agregador: recibe las muestras de un subárbol de clientes (o los
+# agregados de otros agregadores), las combina durante `window` segundos y
+# envía un único registro al nodo padre.
+def gather_aggregator(node_id, bind, upstream, window=1.0, timeout=2.0):
+    # bind: puerto TCP o endpoint completo (p. ej. ipc:///tmp/agg1.sock)
+    context = zmq.Context.instance()
+    socket = context.socket(zmq.REP)
+    socket.bind(bind if "://" in str(bind) else f"tcp://*:{bind}")
+
+    def connect_upstream():
+        upstream_socket = context.socket(zmq.REQ)
+        upstream_socket.setsockopt(zmq.LINGER, 0)
+        upstream_socket.connect(upstream)
+        return upstream_socket
+
+    upstream_socket = connect_upstream()
+    current = new_window()
+    window_end = time.monotonic() + window
+    try:
+        while True:
+            remaining_ms = max(0, int((window_end - time.monotonic()) * 1000))
+            if socket.poll(remaining_ms, zmq.POLLIN):
+                _, sample = decode_gather_message(socket.recv_multipart())
+                merge_window(current, sample)
+                socket.send_string("ACK")
+            if time.monotonic() < window_end:
+                continue
+            window_end = time.monotonic() + window
+            if not current["latency"].count:
+                continue
+            upstream_socket.send_multipart(encode_aggregates(current, node_id))
+            if upstream_socket.poll(int(timeout * 1000), zmq.POLLIN):
+                upstream_socket.recv()
+                print(f"Forwarded {current['latency'].count} samples upstream")
+                current = new_window()
+            else:
+                # El padre no respondió: se conserva el agregado para la siguiente ventana
+                print("Upstream timeout, keeping aggregate for next window")
+                upstream_socket.close()
+                upstream_socket = connect_upstream()
+    finally:
+        socket.close()
+        upstream_socket.close()
+
+if __name__ == "__main__":
+    node_id = sys.argv[1]
+    bind = sys.argv[2]
+    upstream = sys.argv[3] if len(sys.argv) > 3 else "tcp://localhost:5556"
+    gather_aggregator(node_id, bind, upstream)
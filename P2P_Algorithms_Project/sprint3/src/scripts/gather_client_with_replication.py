@@ -1,39 +1,42 @@
-import zlib
+import argparse
+import os
 import zmq
 import time
 import random
 import sys
-import threading
 
-def replicate_data(data, replicas):
-    for replica in replicas:
-        context = zmq.Context()
-        socket = context.socket(zmq.REQ)
-        try:
-            socket.connect(f"tcp://{replica}")
-            compressed_data = zlib.compress(data.encode())
-            socket.send(compressed_data)
-            reply = socket.recv_string()
-            print(f"Replication reply: {reply}")
-        finally:
-            socket.close()
+# Reutilizar la replicación con conexiones persistentes del Sprint 2
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', 'sprint2', 'src')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-def gather_client_with_replication(node_id, replicas):
+from replication import ReplicationPool
+from aggregation import encode_sample
+from transport import service_endpoint
+
+def gather_client_with_replication(node_id, replicas, server="tcp://localhost:5556"):
     context = zmq.Context()
     socket = context.socket(zmq.REQ)
-    socket.connect("tcp://localhost:5556")
+    # El servidor puede ser el gather raíz o un nodo agregador
+    socket.connect(server)
+    pool = ReplicationPool(replicas, context)
     while True:
         latency = random.uniform(20, 100)  # Simulating latency
         bandwidth = random.uniform(10, 100)  # Simulating bandwidth
-        message = f"{latency},{bandwidth}"
-        compressed_message = zlib.compress(message.encode())
+        # El id de nodo viaja en el mensaje para llevar el estado por nodo
+        compressed_message = encode_sample(node_id, latency, bandwidth)
         socket.send(compressed_message)
         reply = socket.recv_string()
         print(f"Received reply: {reply}")
-        threading.Thread(target=replicate_data, args=(message, replicas)).start()
+        pool.replicate(compressed_message)
         time.sleep(1)
 
 if __name__ == "__main__":
-    node_id = int(sys.argv[1])
-    replicas = sys.argv[2:]
-    gather_client_with_replication(node_id, replicas)
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("node_id", type=int)
+    arg_parser.add_argument("replicas", nargs="*")
+    arg_parser.add_argument("--transport", choices=["tcp", "ipc"], default="tcp",
+                            help="ipc for a server on the same host")
+    arg_parser.add_argument("--server", help="gather server or aggregator endpoint, overrides --transport")
+    args = arg_parser.parse_args()
+    gather_client_with_replication(args.node_id, args.replicas,
+                                   args.server or service_endpoint("gather", args.transport))
@@ -1,43 +1,75 @@
-import zlib
+import argparse
+import os
 import zmq
-import threading
 import sys
 
-data = {
-    "latency": 0,
-    "bandwidth": 0
-}
+# Reutilizar la replicación con conexiones persistentes del Sprint 2
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', 'sprint2', 'src')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-def replicate_data(data, replicas):
-    for replica in replicas:
-        context = zmq.Context.instance()
-        socket = context.socket(zmq.REQ)
-        try:
-            socket.connect(f"tcp://{replica}")
-            compressed_data = zlib.compress(data.encode())
-            socket.send(compressed_data)
-            reply = socket.recv_string()
-            print(f"Replication reply: {reply}")
-        finally:
-            socket.close()
+from replication import ReplicationPool
+from registry import REGISTRY, serve_metrics
+from batching import GatherStats
+from tracing import StageTracer
+from zerocopy import recv_frames
+from transport import service_endpoint
+from aggregation import decode_gather_message
+from ingest import MetricsIngest
 
-def gather_server_with_replication(replicas):
+# Estado por nodo y de todo el clúster; un único hilo aplica las muestras
+ingest = MetricsIngest()
+ingest.register(REGISTRY)
+
+def gather_server_with_replication(replicas, metrics_port=None, trace_every=16, zero_copy=False,
+                                   bind_endpoint="tcp://*:5556"):
     context = zmq.Context.instance()
     socket = context.socket(zmq.REP)
-    socket.bind("tcp://*:5556")
+    try:
+        socket.bind(bind_endpoint)
+    except zmq.ZMQError as e:
+        print(f"Cannot bind {bind_endpoint}: {e}")
+        socket.close()
+        return
+    pool = ReplicationPool(replicas, context)
+    ingest.start()
+    stats = GatherStats("dashboard", compression=False)
+    tracer = StageTracer(("recv", "decode", "print", "ingest", "replicate", "ack"),
+                         sample_every=trace_every, server="dashboard")
+    if metrics_port:
+        serve_metrics(metrics_port)
     try:
         while True:
-            compressed_message = socket.recv()
-            message = zlib.decompress(compressed_message).decode()
-            print(f"Received data: {message}")
-            latency, bandwidth = map(float, message.split(","))
-            data["latency"] = latency
-            data["bandwidth"] = bandwidth
-            threading.Thread(target=replicate_data, args=(message, replicas)).start()
+            tracer.begin(socket)
+            frames = recv_frames(socket, copy=not zero_copy)
+            tracer.mark("recv")
+            stats.received(frames)
+            # Muestra de un cliente o agregado de un nodo agregador
+            node, window = decode_gather_message(frames)
+            tracer.mark("decode")
+            print(f"Received data from {node or 'client'}: {window['latency'].count} samples")
+            tracer.mark("print")
+            ingest.submit(node, window)
+            tracer.mark("ingest")
+            pool.replicate(frames)
+            tracer.mark("replicate")
             socket.send_string("ACK")
+            tracer.mark("ack")
+            tracer.end()
+            stats.messages_out.inc()
     finally:
         socket.close()
 
 if __name__ == "__main__":
-    replicas = sys.argv[1:]
-    gather_server_with_replication(replicas)
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("replicas", nargs="*")
+    arg_parser.add_argument("--metrics-port", type=int)
+    arg_parser.add_argument("--trace-every", type=int, default=16,
+                            help="time the stages of 1 in N messages (0 disables)")
+    arg_parser.add_argument("--zero-copy", action="store_true",
+                            help="receive frames as memoryviews without copying them")
+    arg_parser.add_argument("--transport", choices=["tcp", "ipc"], default="tcp",
+                            help="ipc for clients, aggregators and replicas on the same host")
+    arg_parser.add_argument("--endpoint", help="endpoint to bind, overrides --transport")
+    args = arg_parser.parse_args()
+    gather_server_with_replication(args.replicas, args.metrics_port, args.trace_every, args.zero_copy,
+                                   args.endpoint or service_endpoint("gather", args.transport, bind=True))
@@ -1,13 +1,32 @@
 #!/bin/bash
 
-# Asegúrate de matar procesos anteriores
-kill $(lsof -t -i:5556) 2>/dev/null
+# Si el puerto 5556 ya está ocupado, el servidor lo indica y termina
+# (TRANSPORT=ipc usa un socket Unix en lugar de tcp)
+TRANSPORT=${TRANSPORT:-tcp}
+if [ "$TRANSPORT" = "ipc" ]; then
+    GATHER=ipc:///tmp/p2p-gather.sock
+else
+    GATHER=tcp://localhost:5556
+fi
 
 # Ejecutar el servidor Gather
-python3 scripts/gather_server_with_replication.py &
+python3 scripts/gather_server_with_replication.py --transport $TRANSPORT &
+
+# Número de nodos agregadores (0 = los clientes envían directamente al servidor)
+AGGREGATORS=${AGGREGATORS:-0}
+
+for i in $(seq 1 $AGGREGATORS)
+do
+    python3 scripts/gather_aggregator.py agg$i $((5570 + i)) $GATHER &
+done
 
 # Ejecutar varios clientes Gather
 for i in {1..5}
 do
-    python3 scripts/gather_client_with_replication.py $i &
+    if [ "$AGGREGATORS" -gt 0 ]; then
+        SERVER=tcp://localhost:$((5570 + (i % AGGREGATORS) + 1))
+    else
+        SERVER=$GATHER
+    fi
+    python3 scripts/gather_client_with_replication.py $i --server $SERVER &
 done
@@ -4,19 +4,15 @@ document.addEventListener("DOMContentLoaded", function() {
     var latencyChart = new Chart(ctxLatency, {
         type: 'line',
         data: {
-            labels: [], // Etiquetas de tiempo
-            datasets: [{
-                label: 'Latencia',
-                data: [], // Datos de latencia
-                borderColor: 'rgba(75, 192, 192, 1)',
-                backgroundColor: 'rgba(75, 192, 192, 0.2)',
-                borderWidth: 1
-            }]
+            datasets: [] // Un dataset por nodo
         },
         options: {
             scales: {
                 x: {
-                    beginAtZero: true,
+                    type: 'linear',
+                    ticks: {
+                        callback: value => new Date(value * 1000).toLocaleTimeString()
+                    },
                     title: {
                         display: true,
                         text: 'Tiempo'
@@ -38,19 +34,15 @@ document.addEventListener("DOMContentLoaded", function() {
     var bandwidthChart = new Chart(ctxBandwidth, {
         type: 'line',
         data: {
-            labels: [], // Etiquetas de tiempo
-            datasets: [{
-                label: 'Ancho de Banda',
-                data: [], // Datos de ancho de banda
-                borderColor: 'rgba(153, 102, 255, 1)',
-                backgroundColor: 'rgba(153, 102, 255, 0.2)',
-                borderWidth: 1
-            }]
+            datasets: [] // Un dataset por nodo
         },
         options: {
             scales: {
                 x: {
-                    beginAtZero: true,
+                    type: 'linear',
+                    ticks: {
+                        callback: value => new Date(value * 1000).toLocaleTimeString()
+                    },
                     title: {
                         display: true,
                         text: 'Tiempo'
@@ -67,28 +59,64 @@ document.addEventListener("DOMContentLoaded", function() {
         }
     });
 
-    // Función para actualizar los datos del gráfico
-    function updateCharts(data) {
-        const { latency, bandwidth } = data;
-        const time = new Date().toLocaleTimeString();
+    // Puntos como máximo por dataset, para que la memoria del navegador no crezca
+    const MAX_POINTS = 300;
+    const COLORS = ['75, 192, 192', '153, 102, 255', '255, 159, 64', '54, 162, 235', '255, 99, 132'];
+    const charts = { latency: latencyChart, bandwidth: bandwidthChart };
+    let lastSeq = 0;
 
-        // Actualizar gráfico de latencia
-        latencyChart.data.labels.push(time);
-        latencyChart.data.datasets[0].data.push(latency);
-        latencyChart.update();
+    function datasetFor(chart, node) {
+        let dataset = chart.data.datasets.find(d => d.label === node);
+        if (!dataset) {
+            const color = COLORS[chart.data.datasets.length % COLORS.length];
+            dataset = {
+                label: node,
+                data: [],
+                borderColor: `rgba(${color}, 1)`,
+                backgroundColor: `rgba(${color}, 0.2)`,
+                borderWidth: 1
+            };
+            chart.data.datasets.push(dataset);
+        }
+        return dataset;
+    }
 
-        // Actualizar gráfico de ancho de banda
-        bandwidthChart.data.labels.push(time);
-        bandwidthChart.data.datasets[0].data.push(bandwidth);
-        bandwidthChart.update();
+    // Función para añadir a los gráficos solo los puntos nuevos
+    function updateCharts(delta) {
+        lastSeq = delta.seq;
+        for (const [metric, nodes] of Object.entries(delta.series)) {
+            const chart = charts[metric];
+            if (!chart) continue;
+            for (const [node, points] of Object.entries(nodes)) {
+                const dataset = datasetFor(chart, node);
+                points.t.forEach((t, i) => dataset.data.push({ x: t, y: points.v[i] }));
+                if (dataset.data.length > MAX_POINTS) {
+                    dataset.data.splice(0, dataset.data.length - MAX_POINTS);
+                }
+            }
+            chart.update();
+        }
     }
 
-    // Obtener datos del servidor periódicamente
-    setInterval(() => {
-        fetch('/metrics/metrics')
+    // Cargar primero el histórico reducido con LTTB (media de cada cubo)
+    function loadHistory() {
+        return fetch(`/metrics/history?range=600&points=${MAX_POINTS}`)
             .then(response => response.json())
-            .then(data => {
-                updateCharts(data);
+            .then(history => {
+                for (const nodes of Object.values(history.series)) {
+                    for (const points of Object.values(nodes)) {
+                        points.v = points.mean;
+                    }
+                }
+                updateCharts(history);
             });
-    }, 1000);
+    }
+
+    // Recibir por Server-Sent Events los puntos posteriores a lastSeq; el
+    // servidor agrupa las ráfagas en un evento por segundo como máximo y el
+    // navegador reconecta solo enviando Last-Event-ID.
+    loadHistory().then(() => {
+        const source = new EventSource(`/metrics/stream?since=${lastSeq}`);
+        source.onmessage = event => updateCharts(JSON.parse(event.data));
+    });
 });
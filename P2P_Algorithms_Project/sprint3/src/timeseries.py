@@ -0,0 +1,204 @@
+import array
+import json
+import threading
+import time
+
+# Almacén de series temporales con memoria fija: un buffer circular
+# preasignado por métrica y nodo. Cada punto recibe un número de secuencia
+# global, de modo que el panel puede pedir solo los puntos nuevos (?since=seq).
+# Además se mantienen agregados (count/min/max/mean) a 1s, 10s, 1m y 10m para
+# consultar rangos largos sin guardar todos los puntos.
+RESOLUTIONS = {"1s": 1, "10s": 10, "1m": 60, "10m": 600}
+
+class RingBuffer:
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.seqs = array.array("q", bytes(8 * capacity))
+        self.times = array.array("d", bytes(8 * capacity))
+        self.values = array.array("d", bytes(8 * capacity))
+        self.length = 0
+        self.start = 0
+
+    def append(self, seq, timestamp, value):
+        index = (self.start + self.length) % self.capacity
+        self.seqs[index] = seq
+        self.times[index] = timestamp
+        self.values[index] = value
+        if self.length < self.capacity:
+            self.length += 1
+        else:
+            self.start = (self.start + 1) % self.capacity
+
+    def since(self, seq):
+        # Puntos con secuencia > seq en orden cronológico; la búsqueda binaria
+        # sobre el buffer circular evita recorrer los puntos ya enviados.
+        low, high = 0, self.length
+        while low < high:
+            middle = (low + high) // 2
+            if self.seqs[(self.start + middle) % self.capacity] <= seq:
+                low = middle + 1
+            else:
+                high = middle
+        indices = [(self.start + i) % self.capacity for i in range(low, self.length)]
+        return ([self.seqs[i] for i in indices], [self.times[i] for i in indices],
+                [self.values[i] for i in indices])
+
+class Rollup:
+    # Buffer circular de cubos de `resolution` segundos: inicio, count, suma, min, max
+    def __init__(self, resolution, capacity):
+        self.resolution = resolution
+        self.capacity = capacity
+        self.starts = array.array("d", bytes(8 * capacity))
+        self.counts = array.array("q", bytes(8 * capacity))
+        self.sums = array.array("d", bytes(8 * capacity))
+        self.mins = array.array("d", bytes(8 * capacity))
+        self.maxs = array.array("d", bytes(8 * capacity))
+        self.length = 0
+        self.start = 0
+
+    def add(self, timestamp, value):
+        bucket_start = timestamp - timestamp % self.resolution
+        last = (self.start + self.length - 1) % self.capacity
+        # Los puntos que llegan tarde se suman al último cubo
+        if self.length and bucket_start <= self.starts[last]:
+            self.counts[last] += 1
+            self.sums[last] += value
+            self.mins[last] = min(self.mins[last], value)
+            self.maxs[last] = max(self.maxs[last], value)
+            return
+        index = (self.start + self.length) % self.capacity
+        self.starts[index] = bucket_start
+        self.counts[index] = 1
+        self.sums[index] = value
+        self.mins[index] = value
+        self.maxs[index] = value
+        if self.length < self.capacity:
+            self.length += 1
+        else:
+            self.start = (self.start + 1) % self.capacity
+
+    def buckets(self, since_time):
+        result = {"t": [], "count": [], "mean": [], "min": [], "max": []}
+        for i in range(self.length):
+            index = (self.start + i) % self.capacity
+            if self.starts[index] < since_time:
+                continue
+            result["t"].append(self.starts[index])
+            result["count"].append(self.counts[index])
+            result["mean"].append(self.sums[index] / self.counts[index])
+            result["min"].append(self.mins[index])
+            result["max"].append(self.maxs[index])
+        return result
+
+def lttb(xs, ys, threshold):
+    # Largest-Triangle-Three-Buckets: índices de `threshold` puntos que
+    # conservan la forma visual de la serie.
+    length = len(xs)
+    if threshold >= length:
+        return list(range(length))
+    if threshold <= 2:
+        return [0, length - 1][:max(threshold, 0)]
+    every = (length - 2) / (threshold - 2)
+    selected = [0]
+    a = 0
+    for i in range(threshold - 2):
+        average_start = int((i + 1) * every) + 1
+        average_end = min(int((i + 2) * every) + 1, length)
+        average_x = sum(xs[average_start:average_end]) / (average_end - average_start)
+        average_y = sum(ys[average_start:average_end]) / (average_end - average_start)
+        range_start = int(i * every) + 1
+        range_end = int((i + 1) * every) + 1
+        ax, ay = xs[a], ys[a]
+        max_area = -1.0
+        next_a = range_start
+        for j in range(range_start, range_end):
+            area = abs((ax - average_x) * (ys[j] - ay) - (ax - xs[j]) * (average_y - ay))
+            if area > max_area:
+                max_area = area
+                next_a = j
+        selected.append(next_a)
+        a = next_a
+    selected.append(length - 1)
+    return selected
+
+class TimeSeriesStore:
+    def __init__(self, capacity=3600, rollup_capacity=3600):
+        self.capacity = capacity
+        self.rollup_capacity = rollup_capacity
+        self.series = {}
+        self.rollups = {}
+        self.seq = 0
+        # Condition en lugar de Lock: los streams SSE esperan a que llegue un punto nuevo
+        self.lock = threading.Condition()
+
+    def append(self, metric, node, value, timestamp=None):
+        if timestamp is None:
+            timestamp = time.time()
+        with self.lock:
+            key = (metric, node)
+            buffer = self.series.get(key)
+            if buffer is None:
+                buffer = self.series[key] = RingBuffer(self.capacity)
+                self.rollups[key] = {name: Rollup(resolution, self.rollup_capacity)
+                                     for name, resolution in RESOLUTIONS.items()}
+            self.seq += 1
+            buffer.append(self.seq, timestamp, value)
+            for rollup in self.rollups[key].values():
+                rollup.add(timestamp, value)
+            self.lock.notify_all()
+            return self.seq
+
+    def wait(self, seq, timeout=None):
+        # Bloquea hasta que haya puntos posteriores a seq; False si vence el timeout
+        with self.lock:
+            return self.lock.wait_for(lambda: self.seq > seq, timeout)
+
+    def pick_resolution(self, duration):
+        # La resolución más fina cuya retención cubre el rango pedido
+        for name, resolution in RESOLUTIONS.items():
+            if duration <= resolution * self.rollup_capacity:
+                return name
+        return name
+
+    def history(self, duration=3600, points=300, resolution=None, now=None):
+        if resolution is None or resolution == "auto":
+            resolution = self.pick_resolution(duration)
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"Unknown resolution: {resolution}")
+        since_time = (now if now is not None else time.time()) - duration
+        with self.lock:
+            result = {"seq": self.seq, "resolution": resolution, "series": {}}
+            for (metric, node), rollups in self.rollups.items():
+                buckets = rollups[resolution].buckets(since_time)
+                if not buckets["t"]:
+                    continue
+                selected = lttb(buckets["t"], buckets["mean"], points)
+                result["series"].setdefault(metric, {})[node] = {
+                    field: [values[i] for i in selected] for field, values in buckets.items()
+                }
+            return result
+
+    def since(self, seq=0):
+        with self.lock:
+            result = {"seq": self.seq, "series": {}}
+            for (metric, node), buffer in self.series.items():
+                seqs, times, values = buffer.since(seq)
+                if seqs:
+                    result["series"].setdefault(metric, {})[node] = {"seq": seqs, "t": times, "v": values}
+            return result
+
+def event_stream(store, since=0, interval=1.0, keepalive=15.0):
+    # Generador de Server-Sent Events: un evento por intervalo como máximo con
+    # todos los puntos llegados desde el anterior (las ráfagas se agrupan).
+    last_event = 0.0
+    while True:
+        if not store.wait(since, timeout=keepalive):
+            yield ": keepalive\n\n"
+            continue
+        delay = last_event + interval - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        delta = store.since(since)
+        since = delta["seq"]
+        last_event = time.monotonic()
+        yield f"id: {since}\ndata: {json.dumps(delta)}\n\n"
@@ -0,0 +1,60 @@
+import sys
+import os
+import random
+import unittest
+import zlib
+
+# Añadir el directorio raíz del proyecto al PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from aggregation import Aggregate, decode_gather_message, encode_aggregates, encode_sample, merge_window, new_window
+
+class TestAggregation(unittest.TestCase):
+    def test_merge_matches_single_aggregate(self):
+        rng = random.Random(0)
+        values = [rng.uniform(20, 100) for _ in range(1000)]
+        whole = Aggregate()
+        parts = [Aggregate() for _ in range(4)]
+        for i, value in enumerate(values):
+            whole.add(value)
+            parts[i % 4].add(value)
+        merged = Aggregate()
+        for part in parts:
+            merged.merge(part)
+        self.assertEqual(merged.count, whole.count)
+        self.assertAlmostEqual(merged.mean(), sum(values) / len(values))
+        self.assertEqual((merged.min, merged.max), (min(values), max(values)))
+        self.assertEqual(merged.buckets, whole.buckets)
+
+    def test_quantile_relative_error(self):
+        aggregate = Aggregate()
+        values = sorted(float(v) for v in range(1, 1001))
+        for value in values:
+            aggregate.add(value)
+        for q in (0.5, 0.9, 0.99):
+            expected = values[int(q * (len(values) - 1))]
+            self.assertLess(abs(aggregate.quantile(q) - expected) / expected, 0.02)
+
+    def test_client_sample_and_aggregate_messages(self):
+        node, window = decode_gather_message([zlib.compress(b"40.5,12.25")])
+        self.assertIsNone(node)
+        self.assertEqual(window["latency"].mean(), 40.5)
+        self.assertEqual(window["bandwidth"].mean(), 12.25)
+
+        upstream = new_window()
+        merge_window(upstream, window)
+        merge_window(upstream, decode_gather_message([zlib.compress(b"59.5,7.75")])[1])
+        node, decoded = decode_gather_message(encode_aggregates(upstream, "agg1"))
+        self.assertEqual(node, "agg1")
+        self.assertEqual(decoded["latency"].count, 2)
+        self.assertEqual(decoded["latency"].mean(), 50.0)
+        self.assertEqual(decoded["bandwidth"].max, 12.25)
+
+    def test_client_sample_carries_node_id(self):
+        node, window = decode_gather_message([encode_sample(3, 40.5, 12.25)])
+        self.assertEqual(node, "3")
+        self.assertEqual(window["latency"].mean(), 40.5)
+        self.assertEqual(window["bandwidth"].mean(), 12.25)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import sys
+import os
+import unittest
+
+# Añadir el directorio raíz del proyecto al PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from aggregation import decode_gather_message, encode_sample
+from ingest import MetricsIngest
+from timeseries import TimeSeriesStore
+
+class TestMetricsIngest(unittest.TestCase):
+    def test_per_node_and_cluster_aggregates(self):
+        store = TimeSeriesStore(capacity=100)
+        ingest = MetricsIngest(store).start()
+        for node_id, latency in ((1, 20.0), (2, 60.0), (1, 40.0)):
+            ingest.submit(*decode_gather_message([encode_sample(node_id, latency, 10.0)]), timestamp=100.0)
+        ingest.close()
+        snapshot = ingest.snapshot()
+        self.assertEqual(snapshot["updates"], 3)
+        self.assertEqual(snapshot["nodes"]["1"]["latency"]["count"], 2)
+        self.assertEqual(snapshot["nodes"]["1"]["latency"]["mean"], 30.0)
+        self.assertEqual(snapshot["nodes"]["1"]["latency"]["last"], 40.0)
+        self.assertEqual(snapshot["nodes"]["2"]["latency"]["max"], 60.0)
+        self.assertEqual(snapshot["cluster"]["latency"]["count"], 3)
+        self.assertEqual(snapshot["cluster"]["latency"]["mean"], 40.0)
+        self.assertEqual(store.since(0)["series"]["latency"]["1"]["v"], [20.0, 40.0])
+
+    def test_snapshot_is_not_mutated_by_later_updates(self):
+        ingest = MetricsIngest().start()
+        ingest.submit("a", decode_gather_message([encode_sample("a", 10.0, 1.0)])[1])
+        ingest.close()
+        before = ingest.snapshot()
+        ingest.start()
+        ingest.submit("a", decode_gather_message([encode_sample("a", 30.0, 1.0)])[1])
+        ingest.close()
+        self.assertEqual(before["nodes"]["a"]["latency"]["count"], 1)
+        self.assertEqual(ingest.snapshot()["nodes"]["a"]["latency"]["count"], 2)
+
+    def test_full_queue_drops(self):
+        ingest = MetricsIngest(queue_size=1)
+        self.assertTrue(ingest.submit("a", decode_gather_message([encode_sample("a", 1.0, 1.0)])[1]))
+        self.assertFalse(ingest.submit("a", decode_gather_message([encode_sample("a", 1.0, 1.0)])[1]))
+        self.assertEqual(ingest.dropped, 1)
+
+if __name__ == '__main__':
+    unittest.main()
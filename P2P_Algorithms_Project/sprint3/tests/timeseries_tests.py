@@ -0,0 +1,81 @@
+import sys
+import os
+import threading
+import unittest
+
+# Añadir el directorio raíz del proyecto al PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from timeseries import RingBuffer, Rollup, TimeSeriesStore, event_stream, lttb
+
+class TestTimeSeries(unittest.TestCase):
+    def test_ring_buffer_keeps_latest_points(self):
+        buffer = RingBuffer(3)
+        for seq in range(1, 6):
+            buffer.append(seq, float(seq), seq * 10.0)
+        self.assertEqual(buffer.since(0), ([3, 4, 5], [3.0, 4.0, 5.0], [30.0, 40.0, 50.0]))
+        self.assertEqual(buffer.since(4), ([5], [5.0], [50.0]))
+        self.assertEqual(buffer.since(5), ([], [], []))
+
+    def test_store_delta_queries(self):
+        store = TimeSeriesStore(capacity=10)
+        store.append("latency", "n1", 1.0, timestamp=100.0)
+        store.append("latency", "n2", 2.0, timestamp=100.5)
+        seq = store.since(0)["seq"]
+        store.append("bandwidth", "n1", 3.0, timestamp=101.0)
+        delta = store.since(seq)
+        self.assertEqual(delta["seq"], 3)
+        self.assertEqual(delta["series"], {"bandwidth": {"n1": {"seq": [3], "t": [101.0], "v": [3.0]}}})
+        self.assertEqual(store.since(3)["series"], {})
+
+    def test_rollup_buckets(self):
+        rollup = Rollup(10, 2)
+        for t, v in ((100.0, 1.0), (105.0, 3.0), (112.0, 5.0), (125.0, 7.0)):
+            rollup.add(t, v)
+        buckets = rollup.buckets(0)
+        self.assertEqual(buckets["t"], [110.0, 120.0])
+        self.assertEqual(buckets["count"], [1, 1])
+        rollup = Rollup(10, 4)
+        for t, v in ((100.0, 1.0), (105.0, 3.0), (112.0, 5.0)):
+            rollup.add(t, v)
+        buckets = rollup.buckets(0)
+        self.assertEqual(buckets, {"t": [100.0, 110.0], "count": [2, 1], "mean": [2.0, 5.0],
+                                   "min": [1.0, 5.0], "max": [3.0, 5.0]})
+
+    def test_lttb_keeps_endpoints_and_peaks(self):
+        xs = list(range(100))
+        ys = [0.0] * 100
+        ys[42] = 10.0
+        selected = lttb(xs, ys, 10)
+        self.assertEqual(len(selected), 10)
+        self.assertEqual((selected[0], selected[-1]), (0, 99))
+        self.assertIn(42, selected)
+        self.assertEqual(lttb(xs[:5], ys[:5], 10), [0, 1, 2, 3, 4])
+
+    def test_history_downsamples_and_picks_resolution(self):
+        store = TimeSeriesStore(rollup_capacity=100)
+        for i in range(2000):
+            store.append("latency", "n1", float(i % 7), timestamp=1000.0 + i)
+        history = store.history(duration=1000, points=50, now=3000.0)
+        self.assertEqual(history["resolution"], "10s")
+        series = history["series"]["latency"]["n1"]
+        self.assertLessEqual(len(series["t"]), 50)
+        self.assertEqual(store.history(duration=50, points=500, now=3000.0)["resolution"], "1s")
+        with self.assertRaises(ValueError):
+            store.history(resolution="5s")
+
+    def test_event_stream_coalesces_bursts(self):
+        store = TimeSeriesStore(capacity=100)
+        stream = event_stream(store, since=0, interval=0.2, keepalive=0.05)
+        self.assertEqual(next(stream), ": keepalive\n\n")
+        store.append("latency", "n1", 1.0)
+        self.assertTrue(next(stream).startswith("id: 1\n"))
+        store.append("latency", "n1", 2.0)
+        timer = threading.Timer(0.05, lambda: [store.append("latency", "n1", float(i)) for i in range(9)])
+        timer.start()
+        event = next(stream)
+        timer.join()
+        self.assertTrue(event.startswith("id: 11\n"), event)
+
+if __name__ == '__main__':
+    unittest.main()